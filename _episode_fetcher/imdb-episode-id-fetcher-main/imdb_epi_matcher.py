@@ -1,12 +1,27 @@
+import os
 import re
+from collections import Counter, defaultdict
 import numpy as np
 import pandas as pd
 import streamlit as st
 from rapidfuzz import process, fuzz
 
+try:
+    import pyarrow  # noqa: F401  (Parquet cache engine)
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
 # ---------- CONFIG ----------
 st.set_page_config(page_title="IMDb Series/Episodes ID Fetcher", layout="wide")
 
+BASICS_TSV = "title.basics.tsv"
+EPISODES_TSV = "title.episode.tsv"
+# Columnar cache written on first load; rebuilt when a TSV is newer than its cache
+CACHE_DIR = "imdb_cache"
+BASICS_CACHE = os.path.join(CACHE_DIR, "basics.parquet")
+EPISODES_CACHE = os.path.join(CACHE_DIR, "episodes.parquet")
+
 # ---------- HELPERS ----------
 IMDB_ID_PATTERN = re.compile(r"^tt\d{7,}$", re.IGNORECASE)
 
@@ -21,6 +36,17 @@ def normalize_title(s: str) -> str:
     s = re.sub(r'\s+', ' ', s)
     return s.strip()
 
+def normalize_titles(col: pd.Series) -> pd.Series:
+    """Vectorized normalize_title over a column (non-strings -> "")."""
+    s = col.where(col.map(lambda v: isinstance(v, str)), "").astype(object)
+    s = s.str.lower().str.strip()
+    s = s.str.replace(r'“|”|’|‚|‘|"|\'', ' ', regex=True)
+    s = s.str.replace('&', ' and ', regex=False)
+    s = s.str.replace(r'\bpart\b', 'pt', regex=True)
+    s = s.str.replace(r'[^a-z0-9\s]', ' ', regex=True)
+    s = s.str.replace(r'\s+', ' ', regex=True)
+    return s.str.strip()
+
 def parse_hint(s: str):
     if not isinstance(s, str):
         return None, None
@@ -45,175 +71,270 @@ def clickable_link(tconst):
         return ""
     return f"https://www.imdb.com/title/{tconst}"
 
-def best_fuzzy_match(query, candidates):
-    scorers = [fuzz.WRatio, fuzz.token_set_ratio, fuzz.partial_ratio]
-    best = (None, 0)
-    for scorer in scorers:
-        m = process.extractOne(query, candidates, scorer=scorer, score_cutoff=70)
-        if m and m[1] > best[1]:
-            best = (m[0], m[1])
-    return best
-
 # ---------- DATA LOADING ----------
-@st.cache_data(show_spinner=True)
-def load_data():
+def _read_tsvs():
+    """Parse the raw IMDb TSVs into compact frames (slow path, run once per dump)."""
     usecols_basics = [
         "tconst", "titleType", "primaryTitle", "originalTitle", "startYear", "endYear"
     ]
     usecols_episodes = ["tconst", "parentTconst", "seasonNumber", "episodeNumber"]
 
     basics = pd.read_csv(
-        "title.basics.tsv",
+        BASICS_TSV,
         sep="\t",
-        dtype=str,
+        dtype={"tconst": str, "titleType": "category", "primaryTitle": str, "originalTitle": str},
         na_values="\\N",
-        usecols=usecols_basics
+        usecols=usecols_basics,
+        quoting=3,
     )
     episodes = pd.read_csv(
-        "title.episode.tsv",
+        EPISODES_TSV,
         sep="\t",
         dtype=str,
         na_values="\\N",
-        usecols=usecols_episodes
+        usecols=usecols_episodes,
+        quoting=3,
     )
 
-    # Convert numeric columns
+    # Convert numeric columns (float32: NaN-able like before, half the memory)
     for c in ["startYear", "endYear"]:
-        basics[c] = pd.to_numeric(basics[c], errors="coerce")
+        basics[c] = pd.to_numeric(basics[c], errors="coerce").astype("float32")
     for c in ["seasonNumber", "episodeNumber"]:
-        episodes[c] = pd.to_numeric(episodes[c], errors="coerce")
+        episodes[c] = pd.to_numeric(episodes[c], errors="coerce").astype("float32")
+
+    # Normalized titles for matching, precomputed once
+    basics["norm_primaryTitle"] = normalize_titles(basics["primaryTitle"])
+    basics["norm_originalTitle"] = normalize_titles(basics["originalTitle"])
+
+    return basics, episodes
 
-    # Normalized titles for matching
-    basics["norm_primaryTitle"] = basics["primaryTitle"].apply(normalize_title)
-    basics["norm_originalTitle"] = basics["originalTitle"].apply(normalize_title)
+def _cache_fresh(cache_path, source_path):
+    if not os.path.exists(cache_path):
+        return False
+    if not os.path.exists(source_path):
+        return True
+    return os.path.getmtime(cache_path) >= os.path.getmtime(source_path)
 
+@st.cache_resource(show_spinner=True)
+def load_data():
+    if not PARQUET_AVAILABLE:
+        return _read_tsvs()
+
+    if _cache_fresh(BASICS_CACHE, BASICS_TSV) and _cache_fresh(EPISODES_CACHE, EPISODES_TSV):
+        basics = pd.read_parquet(BASICS_CACHE, memory_map=True)
+        episodes = pd.read_parquet(EPISODES_CACHE, memory_map=True)
+        return basics, episodes
+
+    basics, episodes = _read_tsvs()
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    for df, path in ((basics, BASICS_CACHE), (episodes, EPISODES_CACHE)):
+        tmp = path + ".tmp"
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, path)
     return basics, episodes
 
 @st.cache_data(show_spinner=False)
-def get_series_basics(basics: pd.DataFrame, include_mini=False, include_special=False):
+def get_series_basics(_basics: pd.DataFrame, include_mini=False, include_special=False):
     valid_types = {"tvSeries"}
     if include_mini:
         valid_types.add("tvMiniSeries")
     if include_special:
         valid_types.add("tvSpecial")
-    series_basics = basics[basics["titleType"].isin(valid_types)].copy()
+    series_basics = _basics[_basics["titleType"].isin(valid_types)].copy()
     return series_basics
 
 @st.cache_data(show_spinner=False)
-def get_series_episodes(episodes: pd.DataFrame, basics: pd.DataFrame, series_id: str):
-    series_episodes = episodes[episodes["parentTconst"] == series_id].copy()
+def get_series_episodes(_episodes: pd.DataFrame, _basics: pd.DataFrame, series_id: str):
+    series_episodes = _episodes[_episodes["parentTconst"] == series_id].copy()
     if series_episodes.empty:
         return pd.DataFrame()
 
     merged = series_episodes.merge(
-        basics[["tconst", "primaryTitle", "originalTitle"]],
+        _basics[["tconst", "primaryTitle", "originalTitle", "norm_primaryTitle", "norm_originalTitle"]],
         on="tconst",
         how="left",
         suffixes=("_ep", "_base"),
     )
 
-    merged["norm_primaryTitle"] = merged["primaryTitle"].apply(normalize_title)
-    merged["norm_originalTitle"] = merged["originalTitle"].apply(normalize_title)
+    merged["norm_primaryTitle"] = merged["norm_primaryTitle"].fillna("")
+    merged["norm_originalTitle"] = merged["norm_originalTitle"].fillna("")
     merged = merged.drop_duplicates(subset=["tconst"], keep="first")
     merged = merged.sort_values(["seasonNumber", "episodeNumber"], na_position="last")
     return merged
 
+FUZZY_SCORERS = (fuzz.WRatio, fuzz.token_set_ratio, fuzz.partial_ratio)
+
+def best_fuzzy_matches(queries, candidates, cutoff=70):
+    """
+    Best match per query over FUZZY_SCORERS: scores every query against every
+    candidate with one multi-threaded cdist call per scorer. Returns [(candidate_pos or None, score)].
+    """
+    best_pos = np.full(len(queries), -1, dtype=np.int64)
+    best_score = np.zeros(len(queries), dtype=np.float64)
+    if not len(queries) or not len(candidates):
+        return [(None, 0)] * len(queries)
+    for scorer in FUZZY_SCORERS:
+        scores = process.cdist(queries, candidates, scorer=scorer, score_cutoff=cutoff,
+                               dtype=np.float64, workers=-1)
+        pos = scores.argmax(axis=1)
+        top = scores[np.arange(len(queries)), pos]
+        better = (top >= cutoff) & (top > best_score)
+        best_pos[better] = pos[better]
+        best_score[better] = top[better]
+    return [(int(p) if p >= 0 else None, float(s)) for p, s in zip(best_pos, best_score)]
+
+def _result_row(title, row, score, fallback_title=""):
+    return {
+        "InputTitle": title,
+        "MatchedTitle": row.get("primaryTitle", fallback_title),
+        "seasonNumber": row.get("seasonNumber", np.nan),
+        "episodeNumber": row.get("episodeNumber", np.nan),
+        "tconst": row.get("tconst", ""),
+        "IMDb Link": clickable_link(row.get("tconst", "")),
+        "Status": "Matched",
+        "MatchScore": score
+    }
+
+def _no_match_row(title, score):
+    return {
+        "InputTitle": title,
+        "MatchedTitle": "",
+        "seasonNumber": np.nan,
+        "episodeNumber": np.nan,
+        "tconst": "",
+        "IMDb Link": "",
+        "Status": "No Match",
+        "MatchScore": int(score or 0)
+    }
+
+# Deliberate fork of the in-memory part of services/title_index.py (trigrams,
+# shortlist): this tool runs standalone and cannot import the app's services
+# package. Keep the shortlist scoring in step with that file.
+# Trigrams in more titles than this are too common to narrow a search
+MAX_POSTINGS = 20000
+
+def _trigrams(norm: str) -> set:
+    padded = f"  {norm} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class TrigramIndex:
+    """Character-trigram inverted index over normalized titles: a shortlist for the fuzzy scorers."""
+
+    def __init__(self, titles):
+        self.titles = list(titles)
+        self._postings = defaultdict(list)
+        self._gram_counts = []
+        for pos, title in enumerate(self.titles):
+            grams = _trigrams(title)
+            self._gram_counts.append(len(grams))
+            for g in grams:
+                self._postings[g].append(pos)
+
+    def shortlist(self, query: str, limit: int = 300) -> list:
+        """Positions of the titles sharing the most trigrams with query, best first."""
+        q = _trigrams(normalize_title(query))
+        grams = sorted((g for g in q if g in self._postings), key=lambda g: len(self._postings[g]))
+        if not grams:
+            return []
+        rare = [g for g in grams if len(self._postings[g]) <= MAX_POSTINGS] or grams[:1]
+        counts = Counter()
+        for g in rare:
+            counts.update(self._postings[g])
+        # Most shared trigrams first, then re-rank by Jaccard: shared / (|q| + |title| - shared)
+        top = counts.most_common(limit * 4)
+        top.sort(key=lambda kv: -kv[1] / (len(q) + self._gram_counts[kv[0]] - kv[1]))
+        return [pos for pos, _ in top[:limit]]
+
+@st.cache_resource(show_spinner=True)
+def get_series_index(_series_basics: pd.DataFrame, include_mini=False, include_special=False):
+    """Trigram index over each series' search string (built once per process)."""
+    # Build a single search string per row, preserving order with .tolist()
+    search_strings = (
+        _series_basics["primaryTitle"].fillna("") + " " +
+        _series_basics["originalTitle"].fillna("") + " " +
+        _series_basics["startYear"].fillna("").astype(str)
+    )
+    return TrigramIndex(normalize_titles(search_strings).tolist())
+
 def match_episode_list(input_lines, df_eps, min_score=70):
     results = []
     if df_eps.empty:
         return results
 
+    # Index maps over row positions, built once per episode frame
+    primary = df_eps["primaryTitle"].tolist()
+    original = df_eps["originalTitle"].tolist()
+    norm_primary = df_eps["norm_primaryTitle"].tolist()
+    norm_original = df_eps["norm_originalTitle"].tolist()
+    seasons = df_eps["seasonNumber"].to_numpy(dtype=np.float64)
+    episodes = df_eps["episodeNumber"].to_numpy(dtype=np.float64)
+    # Sort rank of each row by (season, episode), NaN last, stable like sort_values
+    order = np.lexsort((np.nan_to_num(episodes, nan=np.inf), np.nan_to_num(seasons, nan=np.inf)))
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+
     cand_map = {}
-    for idx, row in df_eps.iterrows():
-        for t in [row.get("primaryTitle"), row.get("originalTitle")]:
+    for pos in range(len(df_eps)):
+        for t in (primary[pos], original[pos]):
             if isinstance(t, str) and t:
-                cand_map.setdefault(t, set()).add(idx)
+                cand_map.setdefault(t, []).append(pos)
     candidate_titles = list(cand_map.keys())
     candidate_norms = [normalize_title(t) for t in candidate_titles]
-
+    first_norm_pos = {}
+    for i, n in enumerate(candidate_norms):
+        first_norm_pos.setdefault(n, i)
+
+    exact_map = {}
+    for pos in range(len(df_eps)):
+        for n in (norm_primary[pos], norm_original[pos]):
+            rows = exact_map.setdefault(n, [])
+            if not rows or rows[-1] != pos:
+                rows.append(pos)
+
+    # Per-line hints and exact matches; only the rest go to the batch fuzzy scorer
+    parsed = []
+    fuzzy_queries = []
     for raw in input_lines:
         title = raw.strip()
         s_hint, e_hint = parse_hint(title)
         norm_title = normalize_title(title)
-
-        df_scope = df_eps
+        scope = None
         if s_hint is not None and e_hint is not None:
-            scoped = df_eps[
-                (df_eps["seasonNumber"] == s_hint) & (df_eps["episodeNumber"] == e_hint)
-            ]
-            if not scoped.empty:
-                df_scope = scoped
-
-        exact_hits = df_scope[
-            (df_scope["norm_primaryTitle"] == norm_title)
-            | (df_scope["norm_originalTitle"] == norm_title)
-        ]
-        if not exact_hits.empty:
-            row = exact_hits.iloc[0]
-            results.append({
-                "InputTitle": title,
-                "MatchedTitle": row.get("primaryTitle", ""),
-                "seasonNumber": row.get("seasonNumber", np.nan),
-                "episodeNumber": row.get("episodeNumber", np.nan),
-                "tconst": row.get("tconst", ""),
-                "IMDb Link": clickable_link(row.get("tconst", "")),
-                "Status": "Matched",
-                "MatchScore": 100
-            })
+            hinted = np.flatnonzero((seasons == s_hint) & (episodes == e_hint))
+            if len(hinted):
+                scope = hinted
+        exact = exact_map.get(norm_title, [])
+        if scope is not None:
+            in_scope = set(scope.tolist())
+            exact = [p for p in exact if p in in_scope]
+        parsed.append((title, s_hint, e_hint, scope, exact[0] if exact else None))
+        if not exact:
+            fuzzy_queries.append(norm_title)
+
+    fuzzy = iter(best_fuzzy_matches(fuzzy_queries, candidate_norms))
+
+    for title, s_hint, e_hint, scope, exact_pos in parsed:
+        if exact_pos is not None:
+            results.append(_result_row(title, df_eps.iloc[exact_pos], 100))
             continue
 
-        match_title, score = best_fuzzy_match(norm_title, candidate_norms)
-        if match_title is None or score < min_score:
-            results.append({
-                "InputTitle": title,
-                "MatchedTitle": "",
-                "seasonNumber": np.nan,
-                "episodeNumber": np.nan,
-                "tconst": "",
-                "IMDb Link": "",
-                "Status": "No Match",
-                "MatchScore": int(score or 0)
-            })
+        match_pos, score = next(fuzzy)
+        if match_pos is None or score < min_score:
+            results.append(_no_match_row(title, score))
             continue
 
-        try:
-            pos = candidate_norms.index(match_title)
-            original_title = candidate_titles[pos]
-        except ValueError:
-            original_title = None
-
-        if original_title and original_title in cand_map:
-            idxs = list(cand_map[original_title])
-            sub = df_scope.loc[idxs] if s_hint is not None and e_hint is not None else df_eps.loc[idxs]
-            if s_hint is not None and e_hint is not None:
-                sub_pref = sub[
-                    (sub["seasonNumber"] == s_hint) & (sub["episodeNumber"] == e_hint)
-                ]
-                if not sub_pref.empty:
-                    sub = sub_pref
-            sub = sub.sort_values(["seasonNumber", "episodeNumber"], na_position="last")
-            row = sub.iloc[0]
-            results.append({
-                "InputTitle": title,
-                "MatchedTitle": row.get("primaryTitle", original_title or ""),
-                "seasonNumber": row.get("seasonNumber", np.nan),
-                "episodeNumber": row.get("episodeNumber", np.nan),
-                "tconst": row.get("tconst", ""),
-                "IMDb Link": clickable_link(row.get("tconst", "")),
-                "Status": "Matched",
-                "MatchScore": int(score)
-            })
-        else:
-            results.append({
-                "InputTitle": title,
-                "MatchedTitle": "",
-                "seasonNumber": np.nan,
-                "episodeNumber": np.nan,
-                "tconst": "",
-                "IMDb Link": "",
-                "Status": "No Match",
-                "MatchScore": int(score)
-            })
+        original_title = candidate_titles[first_norm_pos[candidate_norms[match_pos]]]
+        positions = np.array(cand_map[original_title], dtype=np.int64)
+        if s_hint is not None and e_hint is not None:
+            if scope is not None:
+                scoped = positions[np.isin(positions, scope)]
+                if len(scoped):
+                    positions = scoped
+            preferred = positions[(seasons[positions] == s_hint) & (episodes[positions] == e_hint)]
+            if len(preferred):
+                positions = preferred
+        best = positions[np.argmin(rank[positions])]
+        results.append(_result_row(title, df_eps.iloc[best], int(score), original_title))
 
     return results
 
@@ -244,17 +365,12 @@ if user_input:
             series_row = matches.iloc[0]
             series_id = series_row["tconst"]
     else:
-        # Fuzzy series search with aligned candidate list and multi-scorer aggregation
-        candidates = series_basics.copy()
-
-        # Build a single search string per row, preserving order with .tolist()
-        search_strings = (
-            candidates["primaryTitle"].fillna("") + " " +
-            candidates["originalTitle"].fillna("") + " " +
-            candidates["startYear"].fillna("").astype(str)
-        ).tolist()
-        search_norm = [normalize_title(s) for s in search_strings]
+        # Fuzzy series search: trigram shortlist, then multi-scorer aggregation on it
+        candidates = series_basics
+        series_index = get_series_index(series_basics, include_mini=include_mini, include_special=include_special)
         qnorm = normalize_title(user_input)
+        shortlist = series_index.shortlist(qnorm, limit=500)
+        search_norm = [series_index.titles[pos] for pos in shortlist]
 
         def top_matches(q, pool, limit=50, cutoff=60):
             out = []
@@ -262,9 +378,10 @@ if user_input:
                 res = process.extract(q, pool, scorer=scorer, limit=limit, score_cutoff=cutoff)
                 # res is list of (match_str, score, index)
                 out.extend(res)
-            # Deduplicate by index with max score
+            # Deduplicate by index with max score (pool index -> series_basics row)
             best = {}
             for _, score, idx in out:
+                idx = shortlist[idx]
                 best[idx] = max(best.get(idx, 0), score)
             ranked = sorted(best.items(), key=lambda x: x[1], reverse=True)
             return ranked
@@ -0,0 +1,352 @@
+"""
+Micro-benchmarks for the warmer's hot loop (not tests; nothing is asserted):
+
+    filters          classify_title over synthetic Torrentio titles (titles/s, per-title latency)
+    database         attempted/cached-quality lookups and inserts against pre-populated
+                     databases of 10k/100k/1M hashes (ops/s)
+    process_streams  a full one-shot start_app pass with the network stubbed out
+                     (streams/s, per-title latency)
+    end_to_end       a full one-shot pass (movies, series and an IMDb list) over real HTTP
+                     against benchmarks/fake_server.py with simulated latency (items/s)
+
+Usage:
+    python -m benchmarks.bench                                  # everything, writes bench_results.json
+    python -m benchmarks.bench --only filters database --sizes 10000 100000
+    python -m benchmarks.bench --compare old.json new.json      # per-metric change
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import types
+
+from benchmarks.synthetic import make_hash, make_streams
+from services import database
+from services.filters import classify_title
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+DEFAULT_OUT = "bench_results.json"
+
+
+def _latency_stats(samples_ns):
+    samples = sorted(samples_ns)
+    n = len(samples)
+    return {
+        "mean_us": statistics.fmean(samples) / 1000,
+        "p50_us": samples[n // 2] / 1000,
+        "p95_us": samples[min(n - 1, int(n * 0.95))] / 1000,
+        "p99_us": samples[min(n - 1, int(n * 0.99))] / 1000,
+    }
+
+
+def _ops(fn, args_list):
+    """ops/s of fn(*args) over args_list."""
+    started = time.perf_counter()
+    for args in args_list:
+        fn(*args)
+    elapsed = time.perf_counter() - started
+    return len(args_list) / elapsed if elapsed else 0.0
+
+
+def bench_filters(count=20_000, seed=1):
+    titles = [s["title"] for s in make_streams(count, seed=seed)]
+    samples = []
+    started = time.perf_counter()
+    for title in titles:
+        t0 = time.perf_counter_ns()
+        classify_title(title)
+        samples.append(time.perf_counter_ns() - t0)
+    elapsed = time.perf_counter() - started
+    return {"titles": count, "titles_per_sec": count / elapsed, "latency": _latency_stats(samples)}
+
+
+@contextlib.contextmanager
+def _temp_db(path):
+    old = database.DB_FILE
+    database.DB_FILE = path
+    try:
+        yield path
+    finally:
+        database.DB_FILE = old
+
+
+def populate_db(path, size, seed=2):
+    """Fresh database with `size` attempted hashes and size/10 cached-quality rows. Returns the hashes."""
+    rng = random.Random(seed)
+    hashes = [make_hash(rng) for _ in range(size)]
+    with _temp_db(path):
+        database.init_db()
+        conn = database.get_connection()
+        conn.executemany("INSERT OR IGNORE INTO attempted_hashes VALUES (?)", ((h,) for h in hashes))
+        conn.executemany(
+            "INSERT OR IGNORE INTO cached_quality (imdb_id, resolution, season) VALUES (?, ?, ?)",
+            ((f"tt{i:07d}", rng.choice([720, 1080, 2160]), rng.choice([None, 1, 2, 3])) for i in range(size // 10)),
+        )
+        conn.commit()
+        conn.close()
+    return hashes
+
+
+def bench_database(size, ops=2_000, workdir=None, seed=3):
+    rng = random.Random(seed)
+    path = os.path.join(workdir or tempfile.gettempdir(), f"bench_{size}.db")
+    if os.path.exists(path):
+        os.remove(path)
+    started = time.perf_counter()
+    hashes = populate_db(path, size)
+    populate_s = time.perf_counter() - started
+    hits = [(h,) for h in rng.sample(hashes, min(ops, len(hashes)))]
+    misses = [(make_hash(rng),) for _ in range(ops)]
+    quality = [(f"tt{rng.randrange(size // 5):07d}", rng.choice([720, 1080, 2160]), rng.choice([None, 1, 2])) for _ in range(ops)]
+    with _temp_db(path):
+        result = {
+            "populate_s": populate_s,
+            "has_attempted_hit_ops": _ops(database.has_attempted, hits),
+            "has_attempted_miss_ops": _ops(database.has_attempted, misses),
+            "has_cached_quality_ops": _ops(database.has_cached_quality, quality),
+            "mark_attempted_ops": _ops(database.mark_attempted, misses),
+        }
+    os.remove(path)
+    return result
+
+
+def bench_process_streams(items=200, streams_per_item=50, db_size=10_000, workdir=None, keep_sleeps=False, seed=4):
+    """One-shot start_app pass over `items` movies with Torrentio/RD stubbed out."""
+    import services.app as app
+
+    rng = random.Random(seed)
+    path = os.path.join(workdir or tempfile.gettempdir(), "bench_pass.db")
+    if os.path.exists(path):
+        os.remove(path)
+    pool = populate_db(path, db_size)
+    ids = [f"tt{i:07d}" for i in range(1, items + 1)]
+    streams = {imdb: make_streams(streams_per_item, seed=seed + i, hash_pool=pool) for i, imdb in enumerate(ids)}
+    call_times = []
+
+    def get_movie_streams(imdb_id, options=None):
+        call_times.append(time.perf_counter())
+        return list(streams[imdb_id])
+
+    patches = {
+        "test_connection": lambda api_key: True,
+        "get_movie_streams": get_movie_streams,
+        "is_cached": lambda api_key, h: int(h[:2], 16) < 64,
+        "add_magnet": lambda api_key, magnet: rng.random() < 0.9,
+        "get_or_create_config": lambda: {"delay_between_movies": 0, "min_seeders": 5, "min_resolution": 720},
+        "set_low_priority": lambda: None,
+    }
+    if not keep_sleeps:
+        patches["time"] = types.SimpleNamespace(**{**vars(time), "sleep": lambda s: None})
+    saved = {name: getattr(app, name) for name in patches}
+    try:
+        for name, value in patches.items():
+            setattr(app, name, value)
+        with _temp_db(path), contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            app.start_app(movies="\n".join(ids), run_mode="oneshot")
+            elapsed = time.perf_counter() - started
+    finally:
+        for name, value in saved.items():
+            setattr(app, name, value)
+        if os.path.exists(path):
+            os.remove(path)
+    per_title = [int((b - a) * 1e9) for a, b in zip(call_times, call_times[1:])]
+    total = items * streams_per_item
+    return {
+        "items": items,
+        "streams_per_item": streams_per_item,
+        "db_size": db_size,
+        "micro_sleeps": keep_sleeps,
+        "streams_per_sec": total / elapsed,
+        "items_per_sec": items / elapsed,
+        "title_latency": _latency_stats(per_title) if per_title else None,
+    }
+
+
+@contextlib.contextmanager
+def _service_urls(urls):
+    """Point the service modules at other base URLs (they read them at import time)."""
+    from services import imdb_search, imdb_series_episodes, realdebrid, torrentio
+
+    targets = [
+        (torrentio, "BASE_URL", urls["CACHEWARMER_TORRENTIO_URL"]),
+        (realdebrid, "BASE_URL", urls["CACHEWARMER_RD_URL"]),
+        (imdb_search, "IMDB_URL", urls["CACHEWARMER_IMDB_URL"]),
+        (imdb_series_episodes, "IMDB_URL", urls["CACHEWARMER_IMDB_URL"]),
+    ]
+    saved = [(module, name, getattr(module, name)) for module, name, _ in targets]
+    try:
+        for module, name, value in targets:
+            setattr(module, name, value)
+        yield
+    finally:
+        for module, name, value in saved:
+            setattr(module, name, value)
+
+
+def bench_end_to_end(movies=100, series=2, list_size=100, latency_ms=20, error_rate=0.0, workdir=None, seed=5, engine="threads", parse_workers=0):
+    """One-shot start_app pass over HTTP against a local fake server (no stubs below the transport)."""
+    import services.app as app
+    from services import parse_pool
+    from benchmarks.fake_server import Dataset, start_background
+
+    rng = random.Random(seed)
+    path = os.path.join(workdir or tempfile.gettempdir(), "bench_e2e.db")
+    if os.path.exists(path):
+        os.remove(path)
+    server = start_background(
+        dataset=Dataset(streams=40, seasons=2, episodes=6, list_size=list_size),
+        latency={"*": (latency_ms, latency_ms / 4)},
+        error_rate=error_rate,
+    )
+    host, port = server.server_address[:2]
+    movie_ids = "\n".join(f"tt{rng.randrange(10_000_000):07d}" for _ in range(movies))
+    series_ids = "\n".join(f"tt{rng.randrange(10_000_000):07d}" for _ in range(series))
+    patches = {
+        "get_or_create_config": lambda: {"delay_between_movies": 0, "min_seeders": 5, "min_resolution": 720,
+                                         "parse_workers": parse_workers, "rd_requests_per_minute": 0},
+        "set_low_priority": lambda: None,
+        "time": types.SimpleNamespace(**{**vars(time), "sleep": lambda s: None}),
+    }
+    saved = {name: getattr(app, name) for name in patches}
+    try:
+        for name, value in patches.items():
+            setattr(app, name, value)
+        with _temp_db(path), _service_urls(server.base_urls), contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            tasks_before = parse_pool.TASKS
+            app.start_app(
+                imdb_list_urls=[f"http://{host}:{port}/imdb/list/ls{seed:09d}/"] if list_size else None,
+                movies=movie_ids,
+                series_list=series_ids,
+                run_mode="oneshot",
+                api_key="bench",
+                engine=engine,
+            )
+            elapsed = time.perf_counter() - started
+            parse_tasks = parse_pool.TASKS - tasks_before
+    finally:
+        for name, value in saved.items():
+            setattr(app, name, value)
+        server.shutdown()
+        server.server_close()
+        if os.path.exists(path):
+            os.remove(path)
+    items = app.STATUS.snapshot()["items_done"]
+    requests_total = sum(v for k, v in server.stats.items() if "." not in k)
+    return {
+        "items": items,
+        "engine": engine,
+        "parse_workers": parse_workers,
+        "parse_tasks": parse_tasks,
+        "latency_ms": latency_ms,
+        "error_rate": error_rate,
+        "elapsed_s": elapsed,
+        "items_per_sec": items / elapsed if elapsed else 0.0,
+        "requests": dict(server.stats),
+        "requests_per_sec": requests_total / elapsed if elapsed else 0.0,
+        "magnets_added": len(server.added),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5).stdout.strip()
+    except Exception:
+        return None
+
+
+def _flatten(data, prefix=""):
+    out = {}
+    for key, value in data.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            out.update(_flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            out[name] = value
+    return out
+
+
+def compare(old_path, new_path):
+    with open(old_path, "r", encoding="utf-8") as f:
+        old = _flatten(json.load(f)["results"])
+    with open(new_path, "r", encoding="utf-8") as f:
+        new = _flatten(json.load(f)["results"])
+    for key in sorted(old.keys() & new.keys()):
+        a, b = old[key], new[key]
+        change = f"{(b - a) / a * 100:+7.1f}%" if a else "      -"
+        print(f"{key:<55} {a:>14.2f} {b:>14.2f} {change}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the CacheWarmer micro-benchmarks.")
+    parser.add_argument("--only", nargs="+", choices=["filters", "database", "process_streams", "end_to_end"])
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES, help="Database sizes (hashes)")
+    parser.add_argument("--titles", type=int, default=20_000, help="Titles for the filters benchmark")
+    parser.add_argument("--ops", type=int, default=2_000, help="Operations per database benchmark")
+    parser.add_argument("--items", type=int, default=200, help="Movies in the process_streams pass")
+    parser.add_argument("--latency-ms", type=float, default=20, help="Fake server latency for end_to_end")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fake server 5xx rate for end_to_end")
+    parser.add_argument("--engine", choices=["threads", "async"], default="threads", help="Engine for end_to_end")
+    parser.add_argument("--parse-workers", type=int, default=0, help="Parse worker processes for end_to_end")
+    parser.add_argument("--keep-sleeps", action="store_true", help="Keep the per-stream micro-sleeps")
+    parser.add_argument("--out", default=DEFAULT_OUT, help=f"Results JSON (default: {DEFAULT_OUT})")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two results files and exit")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return 0
+
+    selected = args.only or ["filters", "database", "process_streams", "end_to_end"]
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        if "filters" in selected:
+            results["filters"] = bench_filters(args.titles)
+            print(f"[BENCH] filters: {results['filters']['titles_per_sec']:.0f} titles/s, "
+                  f"p95 {results['filters']['latency']['p95_us']:.1f} us")
+        if "database" in selected:
+            results["database"] = {}
+            for size in args.sizes:
+                r = bench_database(size, args.ops, workdir)
+                results["database"][str(size)] = r
+                print(f"[BENCH] database {size}: hit {r['has_attempted_hit_ops']:.0f} ops/s, "
+                      f"miss {r['has_attempted_miss_ops']:.0f} ops/s, insert {r['mark_attempted_ops']:.0f} ops/s")
+        if "process_streams" in selected:
+            r = bench_process_streams(args.items, workdir=workdir, keep_sleeps=args.keep_sleeps)
+            results["process_streams"] = r
+            print(f"[BENCH] process_streams: {r['streams_per_sec']:.0f} streams/s, "
+                  f"p95 {r['title_latency']['p95_us'] / 1000:.1f} ms per title")
+        if "end_to_end" in selected:
+            r = bench_end_to_end(args.items // 2, latency_ms=args.latency_ms, error_rate=args.error_rate, workdir=workdir, engine=args.engine,
+                                 parse_workers=args.parse_workers)
+            results["end_to_end"] = r
+            print(f"[BENCH] end_to_end: {r['items']} items in {r['elapsed_s']:.1f}s "
+                  f"({r['items_per_sec']:.1f} items/s, {r['requests_per_sec']:.0f} requests/s, "
+                  f"{r['parse_tasks']} parse tasks)")
+
+    report = {
+        "meta": {
+            "timestamp": time.time(),
+            "commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"[BENCH] Results saved to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
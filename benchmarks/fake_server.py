@@ -0,0 +1,306 @@
+"""
+Local stand-in for Torrentio, Real-Debrid and IMDb, for offline end-to-end runs
+and load tests that don't burn the real RD rate limit. One server, three prefixes:
+
+    /torrentio/{options}/stream/movie/{tt}.json
+    /torrentio/{options}/stream/series/{tt}:{season}:{episode}.json
+    /rd/rest/1.0/user | /torrents/instantAvailability/{hash} | /torrents/addMagnet (POST) | /torrents
+    /imdb/list/{ls}/?page=N | /imdb/title/{tt}/episodes[?season=N] | /imdb/find?q=...
+
+Responses are generated deterministically from the requested IDs. Latency, error
+rate and 429 rate limiting are configurable per run:
+
+    python -m benchmarks.fake_server --port 8765 --latency-ms 80 --jitter-ms 40 --error-rate 0.01 --rate-limit rd=4
+    CACHEWARMER_TORRENTIO_URL=http://127.0.0.1:8765/torrentio \\
+    CACHEWARMER_RD_URL=http://127.0.0.1:8765/rd/rest/1.0 \\
+    CACHEWARMER_IMDB_URL=http://127.0.0.1:8765/imdb python main.py ids.txt
+
+`--print-ids N` writes an input file for main.py (movies, series and an IMDb list URL).
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.synthetic import make_hash, make_title
+
+SERVICES = ("torrentio", "rd", "imdb")
+LIST_PAGE_SIZE = 250
+
+
+def _seed(*parts) -> int:
+    return zlib.crc32("|".join(str(p) for p in parts).encode("utf-8"))
+
+
+def _tt(num: int) -> str:
+    return f"tt{num % 10_000_000:07d}"
+
+
+class Dataset:
+    """Sizes of the generated catalog (all content derived from IDs)."""
+
+    def __init__(self, streams=40, seasons=3, episodes=10, list_size=250, cached_ratio=0.25):
+        self.streams = streams
+        self.seasons = seasons
+        self.episodes = episodes
+        self.list_size = list_size
+        self.cached_ratio = cached_ratio
+
+    def streams_for(self, video_id: str) -> list:
+        rng = random.Random(_seed("streams", video_id))
+        out = []
+        for _ in range(self.streams):
+            title = make_title(rng)
+            out.append({"name": "Torrentio\n" + title.split(".")[-1][:10], "title": title, "infoHash": make_hash(rng)})
+        return out
+
+    def is_cached(self, info_hash: str) -> bool:
+        return (_seed("rd", info_hash) % 1000) < self.cached_ratio * 1000
+
+    def list_ids(self, list_id: str) -> list:
+        base = _seed("list", list_id)
+        return [_tt(base + i * 7919) for i in range(self.list_size)]
+
+    def episode_id(self, series_id: str, season: int, episode: int) -> str:
+        return _tt(_seed("episode", series_id, season, episode))
+
+
+class RateLimiter:
+    """Per-service token bucket; take() is False when the caller should get a 429."""
+
+    def __init__(self, limits: dict):
+        self._limits = limits
+        self._state = {}
+        self._lock = threading.Lock()
+
+    def take(self, service: str) -> bool:
+        rate = self._limits.get(service)
+        if not rate:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            tokens, last = self._state.get(service, (rate, now))
+            tokens = min(rate, tokens + (now - last) * rate)
+            if tokens < 1:
+                self._state[service] = (tokens, now)
+                return False
+            self._state[service] = (tokens - 1, now)
+            return True
+
+
+class FakeHandler(BaseHTTPRequestHandler):
+    server_version = "CacheWarmerFake/1.0"
+    protocol_version = "HTTP/1.1"
+
+    # Set on the server: dataset, latency (service -> (ms, jitter ms)), error_rate, limiter, stats, added
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def _send(self, status, body, content_type="application/json", headers=None):
+        data = body if isinstance(body, bytes) else (json.dumps(body) if content_type == "application/json" else body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _handle(self, method):
+        parts = urlsplit(self.path)
+        service, _, rest = parts.path.lstrip("/").partition("/")
+        if service not in SERVICES:
+            return self._send(404, {"error": "unknown service"})
+        srv = self.server
+        srv.count(service)
+        ms, jitter = srv.latency.get(service, srv.latency.get("*", (0, 0)))
+        if ms or jitter:
+            time.sleep(max(0.0, ms + random.uniform(-jitter, jitter)) / 1000)
+        if not srv.limiter.take(service):
+            srv.count(service + ".429")
+            return self._send(429, {"error": "too_many_requests", "error_code": 34}, headers={"Retry-After": "1"})
+        if srv.error_rate and random.random() < srv.error_rate:
+            srv.count(service + ".error")
+            return self._send(random.choice([500, 502, 503]), {"error": "injected"})
+        query = parse_qs(parts.query)
+        if method == "POST":
+            length = int(self.headers.get("Content-Length") or 0)
+            query.update(parse_qs(self.rfile.read(length).decode("utf-8")))
+        handler = getattr(self, f"_{service}")
+        return handler(method, "/" + rest, query)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    # Torrentio
+    def _torrentio(self, method, path, query):
+        m = re.search(r"/stream/(movie|series)/([^/]+)\.json$", path)
+        if not m:
+            return self._send(404, {"error": "not found"})
+        return self._send(200, {"streams": self.server.dataset.streams_for(m.group(2))})
+
+    # Real-Debrid
+    def _rd(self, method, path, query):
+        path = path.replace("/rest/1.0", "", 1)
+        if not (self.headers.get("Authorization") or "").startswith("Bearer "):
+            return self._send(401, {"error": "bad_token", "error_code": 8})
+        if path == "/user":
+            return self._send(200, {"id": 1, "username": "fake", "type": "premium"})
+        m = re.match(r"/torrents/instantAvailability/([0-9a-fA-F/]+)$", path)
+        if m:
+            out = {}
+            for h in m.group(1).lower().split("/"):
+                cached = self.server.dataset.is_cached(h) or h in self.server.added
+                out[h] = {"rd": [{"1": {"filename": "file.mkv", "filesize": 1}}]} if cached else []
+            return self._send(200, out)
+        if path == "/torrents/addMagnet" and method == "POST":
+            magnet = (query.get("magnet") or [""])[0]
+            m = re.search(r"btih:([0-9a-fA-F]{40})", magnet)
+            if not m:
+                return self._send(400, {"error": "invalid magnet"})
+            with self.server.lock:
+                self.server.added[m.group(1).lower()] = time.time()
+            return self._send(201, {"id": m.group(1)[:13].upper(), "uri": f"/torrents/info/{m.group(1)[:13]}"})
+        if path == "/torrents":
+            with self.server.lock:
+                added = list(self.server.added.items())
+            return self._send(200, [{"id": h[:13].upper(), "hash": h, "status": "downloaded",
+                                     "added": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(t))} for h, t in added])
+        return self._send(404, {"error": "unknown_ressource", "error_code": 7})
+
+    # IMDb
+    def _imdb(self, method, path, query):
+        ds = self.server.dataset
+        m = re.match(r"/list/(ls\d+)/?$", path)
+        if m:
+            ids = ds.list_ids(m.group(1))
+            page = int((query.get("page") or ["1"])[0])
+            chunk = ids[(page - 1) * LIST_PAGE_SIZE: page * LIST_PAGE_SIZE]
+            pages = -(-len(ids) // LIST_PAGE_SIZE)
+            items = "".join(f'<li><a href="/title/{tt}/?ref_=ls_t_{i}">Title {tt}</a></li>' for i, tt in enumerate(chunk))
+            nav = "".join(f'<a href="?page={p}">{p}</a>' for p in range(1, pages + 1))
+            return self._send(200, f"<html><body><div>{len(ids)} titles</div><ul>{items}</ul>{nav}</body></html>", "text/html")
+        m = re.match(r"/title/(tt\d+)/episodes/?$", path)
+        if m:
+            series_id = m.group(1)
+            season = (query.get("season") or [None])[0]
+            links = "".join(f'<a href="/title/{series_id}/episodes?season={s}">{s}</a>' for s in range(1, ds.seasons + 1))
+            eps = ""
+            if season:
+                s = int(season)
+                eps = "".join(
+                    f'<a href="/title/{ds.episode_id(series_id, s, e)}/?ref_=ttep_ep_{e}">S{s}.E{e} ∙ Episode {e}</a>'
+                    for e in range(1, ds.episodes + 1)
+                )
+            return self._send(200, f"<html><body>{links}{eps}</body></html>", "text/html")
+        if path.rstrip("/") == "/find":
+            q = (query.get("q") or [""])[0]
+            tt = _tt(_seed("find", q.lower()))
+            return self._send(200, (
+                '<html><body><section data-testid="find-results-section-title"><ul>'
+                f'<li><a href="/title/{tt}/?ref_=fn_al_tt_1">{q}</a></li></ul></section></body></html>'
+            ), "text/html")
+        return self._send(404, "<html>Not found</html>", "text/html")
+
+
+class FakeServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, dataset=None, latency=None, error_rate=0.0, rate_limits=None, verbose=False):
+        super().__init__(address, FakeHandler)
+        self.dataset = dataset or Dataset()
+        self.latency = latency or {}
+        self.error_rate = error_rate
+        self.limiter = RateLimiter(rate_limits or {})
+        self.verbose = verbose
+        self.lock = threading.Lock()
+        self.added = {}
+        self.stats = {}
+
+    def count(self, key):
+        with self.lock:
+            self.stats[key] = self.stats.get(key, 0) + 1
+
+    @property
+    def base_urls(self) -> dict:
+        """Environment variables pointing the service modules at this server."""
+        host, port = self.server_address[:2]
+        root = f"http://{host}:{port}"
+        return {
+            "CACHEWARMER_TORRENTIO_URL": f"{root}/torrentio",
+            "CACHEWARMER_RD_URL": f"{root}/rd/rest/1.0",
+            "CACHEWARMER_IMDB_URL": f"{root}/imdb",
+        }
+
+
+def start_background(port=0, **kwargs) -> FakeServer:
+    """Start a FakeServer on a daemon thread (port 0 = any free port) and return it."""
+    server = FakeServer(("127.0.0.1", port), **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _per_service(values, cast=float) -> dict:
+    """["80", "rd=200"] -> {"*": 80, "rd": 200}."""
+    out = {}
+    for value in values or []:
+        for part in value.split(","):
+            name, _, v = part.rpartition("=")
+            out[name or "*"] = cast(v)
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local fake Torrentio / Real-Debrid / IMDb server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", nargs="+", help="Mean latency, e.g. 80 or rd=200,imdb=150")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform +/- jitter around the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 5xx")
+    parser.add_argument("--rate-limit", nargs="+", help="Requests/s before 429, e.g. rd=4 or 20")
+    parser.add_argument("--streams", type=int, default=40, help="Streams per title")
+    parser.add_argument("--seasons", type=int, default=3)
+    parser.add_argument("--episodes", type=int, default=10, help="Episodes per season")
+    parser.add_argument("--list-size", type=int, default=250, help="Titles per IMDb list")
+    parser.add_argument("--cached-ratio", type=float, default=0.25, help="Share of hashes RD reports as cached")
+    parser.add_argument("--print-ids", type=int, metavar="N", help="Print N movie IDs, a few series and a list URL, then exit")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args(argv)
+
+    if args.print_ids:
+        rng = random.Random(args.print_ids)
+        for _ in range(args.print_ids):
+            print(_tt(rng.randrange(10_000_000)))
+        for _ in range(max(1, args.print_ids // 50)):
+            print(f"series:{_tt(rng.randrange(10_000_000))}")
+        print(f"# IMDb list: http://{args.host}:{args.port}/imdb/list/ls{rng.randrange(10**9):09d}/")
+        return 0
+
+    latency = {k: (v, args.jitter_ms) for k, v in _per_service(args.latency_ms).items()}
+    dataset = Dataset(args.streams, args.seasons, args.episodes, args.list_size, args.cached_ratio)
+    server = FakeServer((args.host, args.port), dataset, latency, args.error_rate,
+                        _per_service(args.rate_limit), args.verbose)
+    print(f"[INFO] Fake services listening on http://{args.host}:{args.port}")
+    for k, v in server.base_urls.items():
+        print(f"  {k}={v}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"[INFO] Requests: {json.dumps(server.stats, sort_keys=True)}")
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,191 @@
+"""
+Record one real one-shot pass into a cassette, then replay it offline to profile
+and compare builds on the exact same workload (see services/cassette.py).
+
+    python -m benchmarks.replay record pass.jsonl.gz ids.txt --list URL --manifest URL
+    python -m benchmarks.replay replay pass.jsonl.gz                      # full speed
+    python -m benchmarks.replay replay pass.jsonl.gz --timing recorded    # recorded latencies
+    python -m benchmarks.replay replay pass.jsonl.gz --profile pass.prof --out replay.json
+
+Both modes run against a fresh temporary database (unless --db is given), so the
+recording captures every request a first pass makes and a replay repeats it.
+Recording is a real pass: magnets are really added. Replays never touch the
+network; the recorded settings (minus the API key) and service base URLs are
+used instead of config.json and the environment. Bulk input files must still
+exist when replaying.
+"""
+import argparse
+import contextlib
+import cProfile
+import json
+import os
+import tempfile
+import time
+import types
+
+import services.app as app
+from benchmarks.bench import _service_urls
+from services import database, http, imdb_search, realdebrid, torrentio
+from services.cassette import Player, Recorder
+from services.config import get_or_create_config
+
+# Settings that don't belong in a cassette
+SECRET_KEYS = ("real_debrid_api_key",)
+
+
+def _base_urls() -> dict:
+    return {
+        "CACHEWARMER_TORRENTIO_URL": torrentio.BASE_URL,
+        "CACHEWARMER_RD_URL": realdebrid.BASE_URL,
+        "CACHEWARMER_IMDB_URL": imdb_search.IMDB_URL,
+    }
+
+
+@contextlib.contextmanager
+def _database(path=None):
+    """Use path, or a fresh temporary database removed afterwards."""
+    old = database.DB_FILE
+    with tempfile.TemporaryDirectory() as workdir:
+        database.DB_FILE = path or os.path.join(workdir, "replay.db")
+        try:
+            yield database.DB_FILE
+        finally:
+            database.DB_FILE = old
+
+
+@contextlib.contextmanager
+def _patched(**attrs):
+    saved = {name: getattr(app, name) for name in attrs}
+    try:
+        for name, value in attrs.items():
+            setattr(app, name, value)
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(app, name, value)
+
+
+def record(path, inputs, db=None):
+    config = get_or_create_config()
+    chosen = []
+
+    def select_catalogs(catalogs):
+        # Headless: take every catalog, as the CLI does without a picker
+        chosen[:] = [c.get("id") for c in catalogs]
+        return list(catalogs)
+
+    recorder = Recorder(path)
+    http.set_cassette(recorder)
+    started = time.perf_counter()
+    try:
+        with _database(db):
+            app.start_app(run_mode="oneshot", select_catalog_func=select_catalogs, **inputs)
+    finally:
+        http.set_cassette(None)
+    elapsed = time.perf_counter() - started
+    recorder.header.update({
+        "inputs": inputs,
+        "catalogs": chosen,
+        "base_urls": _base_urls(),
+        "config": {k: v for k, v in config.items() if k not in SECRET_KEYS},
+        "elapsed_s": elapsed,
+        "items": app.STATUS.snapshot()["items_done"],
+    })
+    count = recorder.close()
+    print(f"[INFO] Recorded {count} HTTP exchanges in {elapsed:.1f}s to {path}")
+    return recorder.header
+
+
+def replay(path, timing="fast", db=None, profile=None):
+    player = Player(path, timing)
+    header = player.header
+    config = dict(header.get("config") or {})
+    catalogs = set(header.get("catalogs") or [])
+    patches = {
+        "get_or_create_config": lambda: dict(config),
+        "set_low_priority": lambda: None,
+    }
+    if timing == "fast":
+        patches["time"] = types.SimpleNamespace(**{**vars(time), "sleep": lambda s: None})
+
+    http.set_cassette(player)
+    profiler = cProfile.Profile() if profile else None
+    try:
+        with _database(db), _patched(**patches), _service_urls(header.get("base_urls") or _base_urls()):
+            started = time.perf_counter()
+            if profiler:
+                profiler.enable()
+            app.start_app(
+                run_mode="oneshot",
+                api_key="replay",
+                select_catalog_func=lambda found: [c for c in found if c.get("id") in catalogs],
+                **header.get("inputs", {}),
+            )
+            if profiler:
+                profiler.disable()
+            elapsed = time.perf_counter() - started
+    finally:
+        http.set_cassette(None)
+    if profiler:
+        profiler.dump_stats(profile)
+    status = app.STATUS.snapshot()
+    return {
+        "cassette": path,
+        "timing": timing,
+        "elapsed_s": elapsed,
+        "recorded_elapsed_s": header.get("elapsed_s"),
+        "items": status["items_done"],
+        "recorded_items": header.get("items"),
+        "items_per_sec": status["items_done"] / elapsed if elapsed else 0.0,
+        "exchanges": header.get("exchanges"),
+        "hits": player.hits,
+        "misses": len(player.misses),
+        "added": status["added"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record a real pass to a cassette, or replay one offline.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="Run one real pass and record its HTTP exchanges")
+    rec.add_argument("cassette", help="Output file (.jsonl or .jsonl.gz)")
+    rec.add_argument("inputs", nargs="*", metavar="INPUT", help="Bulk inputs, as for main.py")
+    rec.add_argument("--series", action="store_true", help="Treat bare IMDb IDs in INPUT as series")
+    rec.add_argument("--list", dest="lists", action="append", metavar="URL", help="IMDb list URL (repeatable)")
+    rec.add_argument("--manifest", metavar="URL", help="TMDB Discover+ addon manifest URL")
+    rec.add_argument("--pages", type=int, help="Addon catalog pages to fetch")
+    rec.add_argument("--db", help="Database to use (default: a fresh temporary one)")
+
+    rep = sub.add_parser("replay", help="Replay a cassette with no network")
+    rep.add_argument("cassette")
+    rep.add_argument("--timing", choices=["fast", "recorded"], default="fast",
+                     help="fast: no waiting; recorded: sleep each exchange's recorded duration")
+    rep.add_argument("--profile", metavar="FILE", help="Write cProfile stats of the pass to FILE")
+    rep.add_argument("--out", metavar="FILE", help="Write the result JSON to FILE (compare with benchmarks.bench --compare)")
+    rep.add_argument("--db", help="Database to use (default: a fresh temporary one)")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        inputs = {
+            "imdb_list_urls": args.lists,
+            "tmdb_manifest_url": args.manifest,
+            "tmdb_catalog_pages": args.pages,
+            "bulk_inputs": args.inputs,
+            "bulk_default_kind": "series" if args.series else "movie",
+        }
+        record(args.cassette, inputs, args.db)
+        return 0
+
+    result = replay(args.cassette, args.timing, args.db, args.profile)
+    print(f"[REPLAY] {result['items']} items in {result['elapsed_s']:.2f}s "
+          f"({result['items_per_sec']:.1f} items/s; recorded {result['recorded_elapsed_s'] or 0:.1f}s), "
+          f"{result['hits']} exchanges served, {result['misses']} not in cassette")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"meta": {"timestamp": time.time()}, "results": {"replay": result}}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
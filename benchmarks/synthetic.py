@@ -0,0 +1,93 @@
+"""
+Deterministic synthetic Torrentio-style streams for benchmarks: release names with
+the 👤 seeders / 💾 size / ⚙️ provider line, singles, season packs, movie packs,
+SD and CAM junk in roughly the mix Torrentio returns.
+"""
+import random
+
+WORDS = [
+    "Dark", "Knight", "Star", "Wars", "Lost", "City", "Silent", "River", "Iron", "Crown",
+    "Last", "Kingdom", "Blue", "Planet", "Shadow", "Empire", "Night", "Storm", "Golden", "Road",
+]
+GROUPS = ["YIFY", "RARBG", "FGT", "NTb", "FLUX", "SPARKS", "GalaxyRG", "TGx", "EVO", "NOGRP"]
+PROVIDERS = ["ThePirateBay", "YTS", "1337x", "EZTV", "TorrentGalaxy", "RARBG"]
+SOURCES = ["BluRay", "WEB-DL", "WEBRip", "HDTV", "REMUX"]
+CODECS = ["x264", "x265", "HEVC", "AVC", "H.264"]
+
+# (kind, weight)
+KINDS = [
+    ("movie", 40),
+    ("episode", 25),
+    ("season_pack", 12),
+    ("multi_season_pack", 4),
+    ("movie_pack", 4),
+    ("sd", 8),
+    ("cam", 5),
+    ("no_resolution", 2),
+]
+
+
+def _name(rng, n=2):
+    return ".".join(rng.sample(WORDS, n))
+
+
+def _info_line(rng, size_gb):
+    seeders = int(rng.paretovariate(1.2) * 3)
+    size = f"{size_gb:.2f} GB" if size_gb >= 1 else f"{size_gb * 1024:.0f} MB"
+    return f"👤 {seeders} 💾 {size} ⚙️ {rng.choice(PROVIDERS)}"
+
+
+def make_title(rng, kind=None):
+    """One Torrentio stream title (two lines) of the given (or a random) kind."""
+    if kind is None:
+        kind = rng.choices([k for k, _ in KINDS], weights=[w for _, w in KINDS])[0]
+    res = rng.choice(["720p", "1080p", "1080p", "2160p"])
+    tail = f"{res}.{rng.choice(SOURCES)}.{rng.choice(CODECS)}-{rng.choice(GROUPS)}"
+    year = rng.randint(1970, 2025)
+    if kind == "movie":
+        name = f"{_name(rng)}.{year}.{tail}"
+        size = rng.uniform(0.7, 60)
+    elif kind == "episode":
+        name = f"{_name(rng)}.S{rng.randint(1, 12):02d}E{rng.randint(1, 24):02d}.{tail}"
+        size = rng.uniform(0.2, 6)
+    elif kind == "season_pack":
+        name = f"{_name(rng)}.S{rng.randint(1, 12):02d}.COMPLETE.{tail}"
+        size = rng.uniform(5, 80)
+    elif kind == "multi_season_pack":
+        lo = rng.randint(1, 5)
+        name = f"{_name(rng)}.S{lo:02d}-S{lo + rng.randint(1, 6):02d}.{tail}"
+        size = rng.uniform(30, 300)
+    elif kind == "movie_pack":
+        name = f"{_name(rng)}.Trilogy.Collection.{tail}"
+        size = rng.uniform(10, 120)
+    elif kind == "sd":
+        name = f"{_name(rng)}.{year}.DVDRip.XviD-{rng.choice(GROUPS)}"
+        size = rng.uniform(0.6, 1.5)
+    elif kind == "cam":
+        name = f"{_name(rng)}.{year}.HDCAM.x264-{rng.choice(GROUPS)}"
+        size = rng.uniform(0.8, 2)
+    else:
+        name = f"{_name(rng)}.{year}.{rng.choice(SOURCES)}-{rng.choice(GROUPS)}"
+        size = rng.uniform(0.5, 4)
+    return f"{name}\n{_info_line(rng, size)}"
+
+
+def make_hash(rng):
+    return "%040x" % rng.getrandbits(160)
+
+
+def make_streams(count, seed=1, hash_pool=None):
+    """
+    count stream dicts {"name", "title", "infoHash"}. hash_pool: reuse hashes from this
+    list for about a third of the streams (overlap like packs across episodes).
+    """
+    rng = random.Random(seed)
+    streams = []
+    for _ in range(count):
+        title = make_title(rng)
+        if hash_pool and rng.random() < 0.33:
+            info_hash = rng.choice(hash_pool)
+        else:
+            info_hash = make_hash(rng)
+        streams.append({"name": "Torrentio", "title": title, "infoHash": info_hash})
+    return streams
@@ -1,4 +1,46 @@
+import argparse
+import multiprocessing
+
 from services.app import start_app
+from services.database import init_db
+from services.run_history import report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run CacheWarmer without the GUI. Settings come from config.json.",
+        epilog="Bulk inputs take one entry per line: tt0133093, series:tt0944947 or tt0944947:1:3 "
+               "(IMDb URLs also work; blank lines and # comments are skipped).",
+    )
+    parser.add_argument("inputs", nargs="*", metavar="INPUT",
+                        help="File (.txt or .gz), URL of a plain-text list, or - for stdin")
+    parser.add_argument("--series", action="store_true", help="Treat bare IMDb IDs in INPUT as series")
+    parser.add_argument("--list", dest="lists", action="append", metavar="URL", help="IMDb list URL (repeatable)")
+    parser.add_argument("--manifest", metavar="URL", help="TMDB Discover+ addon manifest URL")
+    parser.add_argument("--pages", type=int, help="Addon catalog pages to fetch")
+    parser.add_argument("--run-mode", choices=["oneshot", "loop", "interval", "scheduled"], help="Overrides config run_mode")
+    parser.add_argument("--repeat-minutes", type=int, help="Minutes between passes in interval mode")
+    parser.add_argument("--engine", choices=["threads", "async"],
+                        help="Overrides config engine; async needs httpx (pip install \"httpx[http2,brotli]\")")
+    parser.add_argument("--history", type=int, nargs="?", const=20, metavar="RUNS",
+                        help="Report the last RUNS passes (default 20): throughput, hit rates, slowest titles; then exit")
+    return parser.parse_args(argv)
+
 
 if __name__ == "__main__":
-    start_app()
+    multiprocessing.freeze_support()
+    args = parse_args()
+    if args.history is not None:
+        init_db()
+        report(args.history)
+        raise SystemExit(0)
+    start_app(
+        imdb_list_urls=args.lists,
+        tmdb_manifest_url=args.manifest,
+        tmdb_catalog_pages=args.pages,
+        run_mode=args.run_mode,
+        repeat_minutes=args.repeat_minutes,
+        bulk_inputs=args.inputs,
+        bulk_default_kind="series" if args.series else "movie",
+        engine=args.engine,
+    )
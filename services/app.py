@@ -1,20 +1,26 @@
-from services.realdebrid import test_connection, is_cached, add_magnet
-from services.torrentio import get_movie_streams, get_episode_streams
-from services.database import init_db, has_attempted, mark_attempted, has_cached_quality, mark_cached_quality
-from services.filters import (
-    extract_seeders,
-    is_blacklisted,
-    extract_resolution,
-    extract_size_mb,
-    is_large_pack,
-    extract_seasons_from_title,
-)
+from services.realdebrid import test_connection, is_cached, add_magnet, is_cached_async, add_magnet_async
+from services.torrentio import get_movie_streams, get_episode_streams, build_config, get_movie_streams_async, get_episode_streams_async
+from services.http import CircuitOpenError, blocked_hosts, set_circuit_limits, set_host_rate
+from services.database import init_db, has_attempted, mark_attempted, has_cached_quality, mark_cached_quality, mark_source_checked
+from services.filters import classify_title
 from services.config import get_or_create_config
 import time
-from services.imdb_search import search_imdb_id
-from services.imdb_list_titles import extract_imdb_ids_from_list, extract_titles_from_list
-from services.imdb_series_episodes import get_all_episodes, get_series_id
-from services.stremio_addon import extract_catalog_ids
+from services.imdb_series_episodes import get_series_id
+from services.stremio_addon import iter_catalog_items
+from services.planner import season_targets, season_satisfied, iter_source_diff
+from services.sources import (
+    PRIORITY_NEW, PRIORITY_MANUAL, PRIORITY_RECHECK, WORK_QUEUE_SIZE, WorkQueue,
+    iter_bulk_items, iter_lines, iter_movie_ids, iter_list_ids, iter_season_jobs, unique,
+)
+from services.hash_memo import HashMemo
+from services.status import RunStatus, format_duration
+from services.scheduler import Scheduler, queue_priority
+from services.run_history import RunRecorder, summary_line
+from services.engine import ASYNC_CONCURRENCY, ENGINES, drive, run_async_pass
+from services import async_http, parse_pool, realdebrid
+from services.async_http import ASYNC_HOST_CONNECTIONS
+from urllib.parse import urlparse
+import asyncio
 import ctypes
 import os
 import gc
@@ -36,13 +42,12 @@ def set_low_priority():
 
 
 STOP_REQUESTED = False
-# Tray tooltip state (read by ui.py)
-TRAY_RUNNING = False
-TRAY_CURRENT_ITEM = ""
+# Live run status (read by ui.py for the status panel and tray tooltip)
+STATUS = RunStatus()
 APP_VERSION = "0.2.1"
 
 
-def start_app(imdb_list_urls=None, movies=None, series_list=None, tmdb_manifest_url=None, tmdb_catalog_pages=None, run_mode=None, repeat_minutes=None, api_key=None, select_catalog_func=None):
+def start_app(imdb_list_urls=None, movies=None, series_list=None, tmdb_manifest_url=None, tmdb_catalog_pages=None, run_mode=None, repeat_minutes=None, api_key=None, select_catalog_func=None, bulk_inputs=None, bulk_default_kind="movie", engine=None):
     """
     imdb_list_urls: list of IMDb list URLs (or None)
     movies: list of IMDb IDs or movie titles, one per line (or None)
@@ -53,13 +58,15 @@ def start_app(imdb_list_urls=None, movies=None, series_list=None, tmdb_manifest_
     repeat_minutes: used when run_mode == "interval"
     api_key: Real-Debrid API Key (overrides config)
     select_catalog_func: Function to select catalog if multiple exist
+    bulk_inputs: file paths, "-" (stdin) or URLs of plain-text ID lists (or None); see services.sources
+    bulk_default_kind: "movie" or "series", for bare IMDb IDs in bulk inputs
+    engine: "threads" (default) or "async" (overrides config; see services.engine)
     """
     init_db()
     set_low_priority() # Optimize thread priority for background usage
-    global STOP_REQUESTED, TRAY_RUNNING, TRAY_CURRENT_ITEM
+    global STOP_REQUESTED
     STOP_REQUESTED = False
-    TRAY_RUNNING = False
-    TRAY_CURRENT_ITEM = ""
+    STATUS.reset()
 
     print(f"[INFO] CacheWarmer v{APP_VERSION} booting...")
 
@@ -68,11 +75,16 @@ def start_app(imdb_list_urls=None, movies=None, series_list=None, tmdb_manifest_
         api_key = config.get("real_debrid_api_key", "")
     mode = run_mode if run_mode is not None else config.get("run_mode", "oneshot")
     interval_mins = repeat_minutes if repeat_minutes is not None else config.get("repeat_minutes", 60)
+    engine = engine if engine is not None else config.get("engine", "threads")
+    if engine not in ENGINES:
+        print(f"[WARN] Unknown engine {engine!r}; using threads.")
+        engine = "threads"
+    elif engine == "async" and not async_http.AVAILABLE:
+        print('[WARN] The async engine needs httpx (pip install "httpx[http2,brotli]"); using threads.')
+        engine = "threads"
 
     if not test_connection(api_key):
         print("[ERROR] Real-Debrid connection failed.")
-        TRAY_RUNNING = False
-        TRAY_CURRENT_ITEM = ""
         return
 
     print("[INFO] Real-Debrid connection successful!")
@@ -81,218 +93,565 @@ def start_app(imdb_list_urls=None, movies=None, series_list=None, tmdb_manifest_
     # Load Inputs (from UI text boxes only, no .txt files)
     # ------------------------
 
-    imdb_list = []
+    resolver_workers = config.get("resolver_workers", 4)
+    negative_ttl = config.get("resolver_negative_ttl_hours", 72)
+    index_dir = config.get("imdb_index_dir", "imdb_index")
+    index_max_age = config.get("imdb_index_max_age_days", 30)
+    recheck_hours = config.get("source_recheck_hours", 24)
+    list_urls = list(iter_lines(imdb_list_urls))
+    manifest_url = (tmdb_manifest_url or "").strip()
+    try:
+        pages = int(tmdb_catalog_pages) if tmdb_catalog_pages is not None else 5
+    except ValueError:
+        pages = 5
+    # Catalogs picked on the first pass are reused so later passes don't prompt again
+    chosen_catalogs = []
 
-    # Movies/IDs from UI "Movies (IMDb IDs)" box
-    if movies is not None:
-        for line in movies if isinstance(movies, list) else movies.strip().splitlines():
-            line = line.strip()
-            if line:
-                imdb_list.append(line)
+    bulk_inputs = list(bulk_inputs or [])
+    if not list_urls and not manifest_url and not bulk_inputs and not any(iter_lines(movies)) and not any(iter_lines(series_list)):
+        print("[ERROR] No input sources found!")
+        print("[ERROR] Add IMDb list URL(s), Movies (IMDb IDs), and/or Series (IMDb IDs or URLs) in the UI.")
+        return
 
-    # IMDb list URLs from UI "IMDb List URL(s)" box
-    if imdb_list_urls is not None:
-        urls = imdb_list_urls if isinstance(imdb_list_urls, list) else [u.strip() for u in imdb_list_urls.strip().splitlines() if u.strip()]
-        for url in urls:
+    def remember_catalogs(catalogs):
+        selected = select_catalog_func(catalogs) if select_catalog_func else None
+        if selected:
+            chosen_catalogs[:] = [c.get("id") for c in (selected if isinstance(selected, list) else [selected])]
+        return selected
+
+    def iter_diffed(source, items, label, read_status):
+        """(priority, (imdb_id, kind)) for new and due items of a list/catalog; logs the churn."""
+        stats = {}
+        for item, is_new in iter_source_diff(source, items, recheck_hours, stats, read_status):
+            yield (PRIORITY_NEW if is_new else PRIORITY_RECHECK), item
+        if stats:
+            print(f"[INFO] {label}: {stats['added']} new, {stats['removed']} removed, "
+                  f"{stats['due']} due for re-check, {stats['unchanged']} skipped.")
+            if not read_status.get("complete"):
+                print(f"[WARN] {label} was not read completely; its missing items are kept.")
+
+    # Readers yield (priority, (imdb_id, kind)) for one input source as it streams
+    def read_movies():
+        for imdb in iter_movie_ids(iter_lines(movies), resolver_workers, negative_ttl, index_dir):
+            yield PRIORITY_MANUAL, (imdb, "movie")
+
+    def read_series(series_id):
+        yield PRIORITY_MANUAL, (series_id, "series")
+
+    def read_bulk(source):
+        for item in iter_bulk_items([source], bulk_default_kind):
             if STOP_REQUESTED:
-                break
-            print("[INFO] Reading IMDb list:", url)
-            ids = extract_imdb_ids_from_list(url)
-            if ids:
-                print(f"[INFO] Found IMDb IDs: {len(ids)}")
-                imdb_list.extend(ids)
-            else:
-                titles = extract_titles_from_list(url)
-                print(f"[INFO] Found titles (fallback): {len(titles)}")
-                for title in titles:
-                    if STOP_REQUESTED:
-                        break
-                    imdb = search_imdb_id(title)
-                    if imdb:
-                        imdb_list.append(imdb)
-                    time.sleep(0.1)
-
-    # TMDB Discover+ Addon
-    if tmdb_manifest_url is not None and tmdb_manifest_url.strip():
-        if STOP_REQUESTED:
-            pass
-        else:
-            print("[INFO] Reading TMDB Discover+ addon catalog:", tmdb_manifest_url)
-            pages = 5
-            try:
-                pages = int(tmdb_catalog_pages) if tmdb_catalog_pages is not None else 5
-            except ValueError:
-                pages = 5
-            
-            addon_ids = extract_catalog_ids(tmdb_manifest_url, max_pages=pages, stop_check=lambda: STOP_REQUESTED, select_catalog_func=select_catalog_func)
-            if addon_ids:
-                print(f"[INFO] Found {len(addon_ids)} IDs from TMDB addon")
-                imdb_list.extend(addon_ids)
-            else:
-                print("[WARN] No IDs found from TMDB addon (or stopped)")
+                return
+            yield PRIORITY_MANUAL, item
 
-    imdb_list = list(set(imdb_list))
+    def read_list(url):
+        read_status = {}
+        ids = iter_list_ids(url, config.get("list_cache_hours", 6), resolver_workers, negative_ttl, index_dir, read_status)
+        yield from iter_diffed(f"list:{url}", ((imdb, "movie") for imdb in ids), "IMDb list", read_status)
 
-    # Series: expand each series into (series_id, season, episode) and fetch episode list from IMDb
-    episode_jobs = []
-    if series_list is not None:
-        lines = series_list if isinstance(series_list, list) else series_list.strip().splitlines()
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            print(f"[INFO] Fetching episodes for series: {line}")
-            series_id = get_series_id(line)
-            if not series_id:
-                print("  [WARN] Invalid series ID/URL, skipping.")
+    def read_catalog():
+        # TMDB Discover+ Addon (series catalogs are expanded like the Series box)
+        print("[INFO] Reading TMDB Discover+ addon catalog:", manifest_url)
+        read_status = {}
+        items = iter_catalog_items(
+            manifest_url,
+            max_pages=pages,
+            stop_check=lambda: STOP_REQUESTED,
+            select_catalog_func=remember_catalogs,
+            catalog_ids=config.get("tmdb_catalog_ids") or chosen_catalogs or None,
+            status=read_status,
+        )
+        yield from iter_diffed(f"catalog:{manifest_url}", items, "TMDB addon", read_status)
+
+    # (source key, reader, args) in input order; keys name sources in "source_schedules"
+    sources = []
+    if any(iter_lines(movies)):
+        sources.append(("movies", read_movies, ()))
+    for line in iter_lines(series_list):
+        series_id = get_series_id(line) or line
+        sources.append((f"series:{series_id}", read_series, (series_id,)))
+    for source in bulk_inputs:
+        sources.append((f"bulk:{source}", read_bulk, (source,)))
+    for url in list_urls:
+        sources.append((f"list:{url}", read_list, (url,)))
+    if manifest_url:
+        sources.append((f"catalog:{manifest_url}", read_catalog, ()))
+
+    def iter_sources(selected=None, scheduler=None):
+        """
+        (priority, (imdb_id, kind)) from every input (or the `selected` source keys), in
+        input order, as each source streams. With a scheduler, source priorities come first.
+        """
+        for key, reader, args in sources:
+            if STOP_REQUESTED:
+                return
+            if selected is not None and key not in selected:
                 continue
-            eps = get_all_episodes(line)
-            if not eps:
-                print("  [WARN] No episodes found, skipping.")
+            if scheduler is None:
+                yield from reader(*args)
+            else:
+                source_priority = scheduler.priority(key)
+                for priority, item in reader(*args):
+                    yield queue_priority(source_priority, priority), item
+
+    def iter_work(selected=None, scheduler=None):
+        """
+        Work items for one pass: sources deduplicated on the fly, series expanded per
+        season, consecutive single episodes of the same season grouped into one job.
+        """
+        pending = None  # (priority, series_id, season, [episode, ...])
+        for priority, (item_id, kind) in unique(iter_sources(selected, scheduler), key=lambda x: x[1]):
+            if STOP_REQUESTED:
+                return
+            if kind == "episode":
+                series_id, season, episode = item_id
+                if pending and pending[1:3] == (series_id, season):
+                    pending[3].append(episode)
+                    continue
+                if pending:
+                    yield pending[0], ("season", pending[1], pending[2], pending[3], False)
+                pending = (priority, series_id, season, [episode])
                 continue
-            for row in eps:
-                episode_jobs.append((series_id, row["season"], row["episode"]))
-            print(f"  [INFO] Found {len(eps)} episodes.")
+            if pending:
+                yield pending[0], ("season", pending[1], pending[2], pending[3], False)
+                pending = None
+            if kind == "series":
+                for job in iter_season_jobs(item_id, config.get("episode_cache_hours", 24), index_dir, index_max_age):
+                    yield priority, job
+            else:
+                yield priority, ("movie", item_id)
+        if pending and not STOP_REQUESTED:
+            yield pending[0], ("season", pending[1], pending[2], pending[3], False)
 
-    if not imdb_list and not episode_jobs:
-        print("[ERROR] No input sources found!")
-        print("[ERROR] Add IMDb list URL(s), Movies (IMDb IDs), and/or Series (IMDb IDs or URLs) in the UI.")
-        TRAY_RUNNING = False
-        TRAY_CURRENT_ITEM = ""
-        return
+    STATUS.set_running(True)
+    # Server-side quality/provider filtering and per-quality limit
+    torrentio_options = build_config(config)
+    print(f"[INFO] Torrentio options: {torrentio_options}")
+
+    # Per-pass memo: each infoHash is parsed, DB-checked and RD-checked at most once per pass
+    memo = HashMemo(config.get("hash_memo_size", 50000))
+    # Per-pass totals and per-item outcomes in the runs/run_items tables
+    history = RunRecorder(mode, APP_VERSION)
+    # Fail fast on dead upstreams; their items wait in a retry queue (see run_one_pass)
+    set_circuit_limits(
+        config.get("circuit_failures", 5),
+        config.get("circuit_cooldown_seconds", 60),
+        config.get("circuit_max_cooldown_seconds", 900),
+    )
+    # Real-Debrid request budget, shared by both engines' HTTP clients (0 = no cap)
+    set_host_rate(urlparse(realdebrid.BASE_URL).netloc.lower(), config.get("rd_requests_per_minute", 240) / 60)
+    # IMDb page parsing and title classification on worker processes (0 = inline)
+    parse_pool.configure(
+        config.get("parse_workers", 0),
+        config.get("parse_chunk_size", parse_pool.PARSE_CHUNK_SIZE),
+        config.get("parse_min_titles", parse_pool.PARSE_MIN_TITLES),
+        config.get("parse_min_bytes", parse_pool.PARSE_MIN_BYTES),
+    )
+    deferred = []  # (work item, host)
+    # Series with an episode Torrentio could not answer this pass: not marked checked
+    unchecked_series = set()
+
+    def defer(item, error):
+        print(f"[WARN] {error}; deferring {item[0]} {item[1]} to the retry queue")
+        deferred.append((item, error.host))
+        STATUS.set_depth("retry", len(deferred))
+        history.fail("deferred")
+
+    # Processing steps below are generators yielding I/O operations (see services/engine);
+    # database calls are yielded as ("db", fn, *args) so the async engine runs them off its loop
+    def mark_hash_attempted(info_hash):
+        yield "db", mark_attempted, info_hash
+        memo.entry(info_hash, count=False)["attempted"] = True
 
-    TRAY_RUNNING = True
+    def hash_cached(info_hash):
+        """RD availability, remembered for the pass. None (unknown) is not remembered."""
+        rec = memo.entry(info_hash, count=False)
+        if "cached" not in rec:
+            with history.stage("rd_check"):
+                cached = yield "rd_check", info_hash
+            STATUS.rd_call(cached=bool(cached))
+            history.count("rd_checks")
+            if cached is None:
+                STATUS.error("rd")
+                history.fail("rd_unknown")
+                return None
+            if cached:
+                history.count("cached_hits")
+            rec["cached"] = cached
+        return rec["cached"]
 
-    def process_streams(content_imdb_id, streams, season=None):
-        """content_imdb_id: movie tt... or series tt...; season=None for movies."""
+    def process_streams(content_imdb_id, streams, season=None, packs_first=False):
+        """
+        content_imdb_id: movie tt... or series tt...; season=None for movies.
+        packs_first: try season packs covering `season` before single episodes.
+        Returns the set of resolutions that had eligible (unattempted) streams.
+        """
         candidates = {}
         pack_candidates = {}
-        for s in streams:
-            # Micro-sleep to yield CPU to foreground apps (makes app 'invisible')
-            time.sleep(0.005)
+        available = set()
+        history.count("streams", len(streams))
+        with history.stage("filter"):
+            batch = {}
+            if parse_pool.enabled():
+                # Titles not parsed yet this pass go to the parse workers as one batch, if it is big enough
+                fresh = {}
+                for s in streams:
+                    info_hash = s.get("infoHash")
+                    if info_hash and "parsed" not in (memo.peek(info_hash) or {}):
+                        fresh.setdefault(info_hash, s.get("title", ""))
+                if parse_pool.enabled(len(fresh)):
+                    batch = dict(zip(fresh, (yield "classify", list(fresh.values()))))
+            for s in streams:
+                # Micro-sleep to yield CPU to foreground apps (makes app 'invisible')
+                yield "sleep", 0.005
             
-            title = s.get("title", "")
-            info_hash = s.get("infoHash")
-            if not info_hash or has_attempted(info_hash) or is_blacklisted(title):
-                continue
-            seeders = extract_seeders(title)
-            if seeders < config.get("min_seeders", 5):
-                continue
-            resolution = extract_resolution(title)
-            if resolution < config.get("min_resolution", 720):
-                continue
-            if has_cached_quality(content_imdb_id, resolution, season):
-                continue
-            size = extract_size_mb(title)
-            entry = {"title": title, "hash": info_hash, "seeders": seeders, "size": size}
-            if is_large_pack(title):
-                if season is not None:
-                    seasons_in_title = extract_seasons_from_title(title)
-                    if seasons_in_title and all(
-                        has_cached_quality(content_imdb_id, resolution, s) for s in seasons_in_title
-                    ):
-                        continue
-                pack_candidates.setdefault(resolution, []).append(entry)
-            else:
-                candidates.setdefault(resolution, []).append(entry)
+                title = s.get("title", "")
+                info_hash = s.get("infoHash")
+                if not info_hash:
+                    continue
+                rec = memo.entry(info_hash)
+                if "parsed" not in rec:
+                    rec["parsed"] = batch.get(info_hash) or classify_title(title)
+                parsed = rec["parsed"]
+                if parsed["blacklisted"] or rec.get("added") is False:
+                    continue
+                if "attempted" not in rec:
+                    rec["attempted"] = yield "db", has_attempted, info_hash
+                if rec["attempted"]:
+                    continue
+                seeders = parsed["seeders"]
+                if seeders < config.get("min_seeders", 5):
+                    continue
+                resolution = parsed["resolution"]
+                if resolution < config.get("min_resolution", 720):
+                    continue
+                available.add(resolution)
+                if (yield "db", has_cached_quality, content_imdb_id, resolution, season):
+                    continue
+                entry = {"title": title, "hash": info_hash, "seeders": seeders, "size": parsed["size"], "parsed": parsed}
+                if parsed["large_pack"]:
+                    if season is not None:
+                        seasons_in_title = parsed["seasons"]
+                        if seasons_in_title and (yield "db", lambda: all(
+                            has_cached_quality(content_imdb_id, resolution, s) for s in seasons_in_title
+                        )):
+                            continue
+                    pack_candidates.setdefault(resolution, []).append(entry)
+                else:
+                    candidates.setdefault(resolution, []).append(entry)
+        history.count("candidates", sum(map(len, candidates.values())) + sum(map(len, pack_candidates.values())))
+
+        if packs_first and season is not None and config.get("allow_packs_fallback", True):
+            season_packs = {}
+            for group in (candidates, pack_candidates):
+                for resolution, items in group.items():
+                    for item in items:
+                        if item["parsed"]["season_pack"] and season in item["parsed"]["seasons"]:
+                            season_packs.setdefault(resolution, []).append(item)
+            if not (yield from add_packs(content_imdb_id, season_packs, season)):
+                return available
 
         for resolution, items in sorted(candidates.items(), key=lambda x: -x[0]):
-            if has_cached_quality(content_imdb_id, resolution, season):
+            if (yield "db", has_cached_quality, content_imdb_id, resolution, season):
                 continue
             items.sort(key=lambda x: (-x["seeders"], x["size"]))
             added = 0
             for item in items:
                 if STOP_REQUESTED:
-                    return
+                    return available
                 if added >= config.get("max_per_quality", 1):
                     break
-                cached = is_cached(api_key, item["hash"])
+                if memo.entry(item["hash"], count=False).get("attempted"):
+                    continue
+                cached = yield from hash_cached(item["hash"])
                 if cached is None:
                     continue
                 if cached:
-                    mark_attempted(item["hash"])
+                    yield from mark_hash_attempted(item["hash"])
                     continue
                 magnet = f"magnet:?xt=urn:btih:{item['hash']}"
                 title_safe = (item["title"] or "").encode("ascii", "replace").decode("ascii")
                 print(f"[INFO] Auto adding {resolution}p: {title_safe}")
-                if add_magnet(api_key, magnet):
-                    mark_attempted(item["hash"])
-                    mark_cached_quality(content_imdb_id, resolution, season)
+                with history.stage("rd_add"):
+                    ok = yield "rd_add", magnet
+                STATUS.rd_call()
+                memo.entry(item["hash"], count=False)["added"] = ok
+                if not ok:
+                    history.fail("add_failed")
+                if ok:
+                    STATUS.magnet_added()
+                    history.count("added")
+                    yield from mark_hash_attempted(item["hash"])
+                    yield "db", mark_cached_quality, content_imdb_id, resolution, season
                     added += 1
         if config.get("allow_packs_fallback", True) and not candidates:
-            for resolution, items in sorted(pack_candidates.items(), key=lambda x: -x[0]):
-                if has_cached_quality(content_imdb_id, resolution, season):
-                    continue
-                items.sort(key=lambda x: (-x["seeders"], x["size"]))
-                added = 0
-                for item in items:
-                    if STOP_REQUESTED or added >= config.get("max_per_quality", 1):
-                        break
-                    cached = is_cached(api_key, item["hash"])
-                    if cached is None or cached:
-                        if cached:
-                            mark_attempted(item["hash"])
-                        continue
-                    title_safe = (item["title"] or "").encode("ascii", "replace").decode("ascii")
-                    print(f"[INFO] Auto adding pack {resolution}p: {title_safe}")
-                    if add_magnet(api_key, f"magnet:?xt=urn:btih:{item['hash']}"):
-                        mark_attempted(item["hash"])
-                        seasons_in_title = extract_seasons_from_title(item["title"] or "")
-                        if seasons_in_title and season is not None:
-                            for s in seasons_in_title:
-                                mark_cached_quality(content_imdb_id, resolution, s)
-                        else:
-                            mark_cached_quality(content_imdb_id, resolution, season)
-                        added += 1
-
-    def run_one_pass():
-        """Process all movies then all episodes once. Crash containment per item."""
-        global TRAY_CURRENT_ITEM
-        for imdb in imdb_list:
-            if STOP_REQUESTED:
-                return
-            try:
-                TRAY_CURRENT_ITEM = f"movie: {imdb}"
-                print(f"\n[INFO] Processing movie: {imdb}")
-                streams = get_movie_streams(imdb)[:50]
-                print(f"[INFO] Found {len(streams)} streams (limit 50)")
-                process_streams(imdb, streams, season=None)
-                print("[INFO] Waiting before next item...\n")
-                del streams
-                gc.collect()
-                time.sleep(config.get("delay_between_movies", 5))
-            except Exception as e:
-                print(f"[ERROR] Error processing movie {imdb}: {e}")
+            yield from add_packs(content_imdb_id, pack_candidates, season)
+        return available
+
+    def add_packs(content_imdb_id, pack_candidates, season):
+        """Add the best packs per resolution; marks every season a pack covers. False if stopped."""
+        for resolution, items in sorted(pack_candidates.items(), key=lambda x: -x[0]):
+            if (yield "db", has_cached_quality, content_imdb_id, resolution, season):
                 continue
+            items.sort(key=lambda x: (-x["seeders"], x["size"]))
+            added = 0
+            for item in items:
+                if STOP_REQUESTED:
+                    return False
+                if added >= config.get("max_per_quality", 1):
+                    break
+                rec = memo.entry(item["hash"], count=False)
+                if rec.get("attempted") or rec.get("added") is False:
+                    continue
+                cached = yield from hash_cached(item["hash"])
+                if cached is None or cached:
+                    if cached:
+                        yield from mark_hash_attempted(item["hash"])
+                    continue
+                title_safe = (item["title"] or "").encode("ascii", "replace").decode("ascii")
+                print(f"[INFO] Auto adding pack {resolution}p: {title_safe}")
+                with history.stage("rd_add"):
+                    ok = yield "rd_add", f"magnet:?xt=urn:btih:{item['hash']}"
+                STATUS.rd_call()
+                rec["added"] = ok
+                if not ok:
+                    history.fail("add_failed")
+                if ok:
+                    STATUS.magnet_added()
+                    history.count("added")
+                    yield from mark_hash_attempted(item["hash"])
+                    seasons_in_title = item["parsed"]["seasons"]
+                    if seasons_in_title and season is not None:
+                        for s in seasons_in_title:
+                            yield "db", mark_cached_quality, content_imdb_id, resolution, s
+                    else:
+                        yield "db", mark_cached_quality, content_imdb_id, resolution, season
+                    added += 1
+        return True
+
+    def process_movie(imdb):
+        """False if deferred to the retry queue."""
+        history.start_item(imdb)
+        try:
+            STATUS.set_item(f"movie: {imdb}")
+            print(f"\n[INFO] Processing movie: {imdb}")
+            with history.stage("fetch"):
+                streams = yield "movie_streams", imdb
+            fetched = streams is not None
+            streams = (streams or [])[:50]
+            print(f"[INFO] Found {len(streams)} streams (limit 50)")
+            yield from process_streams(imdb, streams, season=None)
+            if fetched:
+                yield "db", mark_source_checked, [imdb]
+            else:
+                # Left unchecked so a list/catalog re-read treats it as due again
+                history.fail("fetch_failed")
+            print("[INFO] Waiting before next item...\n")
+            del streams
+            with history.stage("wait"):
+                yield "sleep", config.get("delay_between_movies", 5)
+        except CircuitOpenError as e:
+            defer(("movie", imdb), e)
+            history.end_item()
+            return False
+        except Exception as e:
+            print(f"[ERROR] Error processing movie {imdb}: {e}")
+            STATUS.error("movie")
+            history.fail("error")
+        history.end_item()
+        return True
 
-        for series_id, season, episode in episode_jobs:
+    def process_season(series_id, season, episodes, last_season):
+        """
+        Season-pack-first: probe the season's first episode (packs first), then skip
+        the remaining episodes once the season is cached at every target resolution.
+        False if deferred to the retry queue.
+        """
+        packs_first = config.get("season_pack_first", True)
+        seen_resolutions = set()
+        history.start_item(series_id, season)
+        for i, episode in enumerate(episodes):
+            STATUS.set_depth("season", len(episodes) - i)
             if STOP_REQUESTED:
-                return
+                history.end_item()
+                return True
+            if packs_first and (yield "db", season_satisfied, series_id, season, season_targets(config, seen_resolutions)):
+                print(f"[INFO] Season {season} of {series_id} satisfied, skipping {len(episodes) - i} episode(s).")
+                break
             try:
-                TRAY_CURRENT_ITEM = f"S{season}E{episode}: {series_id}"
+                STATUS.set_item(f"S{season}E{episode}: {series_id}")
                 print(f"\n[INFO] Processing series S{season}E{episode}: {series_id}")
-                streams = get_episode_streams(series_id, season, episode)[:50]
+                with history.stage("fetch"):
+                    streams = yield "episode_streams", series_id, season, episode
+                if streams is None:
+                    unchecked_series.add(series_id)
+                    history.fail("fetch_failed")
+                streams = (streams or [])[:50]
                 print(f"[INFO] Found {len(streams)} streams (limit 50)")
-                process_streams(series_id, streams, season=season)
+                seen_resolutions |= yield from process_streams(series_id, streams, season=season, packs_first=packs_first and i == 0)
                 print("[INFO] Waiting before next episode...\n")
                 del streams
-                gc.collect()
-                time.sleep(config.get("delay_between_movies", 5))
+                with history.stage("wait"):
+                    yield "sleep", config.get("delay_between_movies", 5)
+            except CircuitOpenError as e:
+                # The rest of the season waits for the host; the series is marked checked once it's done
+                defer(("season", series_id, season, episodes[i:], last_season), e)
+                STATUS.set_depth("season", 0)
+                history.end_item()
+                return False
             except Exception as e:
                 print(f"[ERROR] Error processing S{season}E{episode} {series_id}: {e}")
+                STATUS.error("episode")
+                history.fail("error")
                 continue
+        STATUS.set_depth("season", 0)
+        history.end_item()
+        if last_season and series_id not in unchecked_series:
+            yield "db", mark_source_checked, [series_id]
+        return True
+
+    def item_steps(item):
+        return process_movie(item[1]) if item[0] == "movie" else process_season(*item[1:])
+
+    # Blocking I/O for the "threads" engine; run_async_pass gets async equivalents
+    blocking_io = {
+        "movie_streams": lambda imdb: get_movie_streams(imdb, torrentio_options),
+        "episode_streams": lambda series_id, season, episode: get_episode_streams(series_id, season, episode, torrentio_options),
+        "rd_check": lambda info_hash: is_cached(api_key, info_hash),
+        "rd_add": lambda magnet: add_magnet(api_key, magnet),
+        "classify": parse_pool.classify_titles,
+        "db": lambda fn, *args: fn(*args),
+        "sleep": lambda seconds: time.sleep(seconds),
+    }
+
+    def async_io(client):
+        async def sleep(seconds):
+            await asyncio.sleep(seconds)
+
+        return {
+            "movie_streams": lambda imdb: get_movie_streams_async(client, imdb, torrentio_options),
+            "episode_streams": lambda series_id, season, episode: get_episode_streams_async(
+                client, series_id, season, episode, torrentio_options),
+            "rd_check": lambda info_hash: is_cached_async(client, api_key, info_hash),
+            "rd_add": lambda magnet: add_magnet_async(client, api_key, magnet),
+            "classify": parse_pool.classify_titles_async,
+            # sqlite calls block; run them on the default thread pool
+            "db": lambda fn, *args: asyncio.to_thread(fn, *args),
+            "sleep": sleep,
+        }
+
+    pass_number = 0
+
+    def counted(work_items):
+        """Pass-through that reports queued items and the end of the sources to STATUS."""
+        for entry in work_items:
+            STATUS.item_queued()
+            yield entry
+        STATUS.mark_sources_done()
+
+    def run_one_pass(selected=None, scheduler=None):
+        """
+        Re-read every source (or the `selected` source keys) and process its work items as
+        they stream in (sources are read on a background thread). Crash containment per
+        item. Returns items processed.
+        """
+        nonlocal pass_number
+        pass_number += 1
+        memo.clear()
+        STATUS.start_pass(pass_number)
+        history.start_pass(pass_number)
+        done = 0
+        deferred.clear()
+        unchecked_series.clear()
+        work = WorkQueue(counted(iter_work(selected, scheduler)), stop_check=lambda: STOP_REQUESTED, maxsize=config.get("work_queue_size", WORK_QUEUE_SIZE))
+        STATUS.set_depth("work", work.qsize)
+
+        def item_finished(item, completed):
+            nonlocal done
+            if completed:
+                done += 1
+                STATUS.item_done()
+            STATUS.set_memo_hits(memo.hits)
+
+        def process(item):
+            item_finished(item, drive(item_steps(item), blocking_io))
+
+        def retry_deferred(blocked):
+            """Re-run deferred items whose host is past its cooldown (the first one probes it)."""
+            ready = [entry for entry in deferred if entry[1] not in blocked]
+            if not ready:
+                return
+            deferred[:] = [entry for entry in deferred if entry[1] in blocked]
+            STATUS.set_depth("retry", len(deferred))
+            print(f"[INFO] Retrying {len(ready)} deferred item(s)...")
+            for i, (item, _) in enumerate(ready):
+                if STOP_REQUESTED:
+                    deferred.extend(ready[i:])
+                    break
+                process(item)
+
+        if engine == "async":
+            # Deferred items are retried below, once the pass's work queue is drained
+            run_async_pass(
+                work, item_steps, async_io, item_finished,
+                stop_check=lambda: STOP_REQUESTED,
+                concurrency=config.get("async_concurrency", ASYNC_CONCURRENCY),
+                client_options={
+                    "host_connections": config.get("async_host_connections", ASYNC_HOST_CONNECTIONS),
+                    "host_limits": config.get("async_host_limits"),
+                },
+            )
+        else:
+            for item in work:
+                process(item)
+                if deferred:
+                    retry_deferred(blocked_hosts())
+
+        # Wait out open circuits (each wait ends in a probe) for up to circuit_retry_minutes
+        deadline = time.time() + config.get("circuit_retry_minutes", 30) * 60
+        while deferred and not STOP_REQUESTED:
+            blocked = blocked_hosts()
+            wait = min((blocked.get(host, 0) for _, host in deferred), default=0)
+            if time.time() + wait > deadline:
+                print(f"[WARN] {len(deferred)} deferred item(s) left for the next pass (upstream still failing).")
+                break
+            if wait > 0:
+                hosts = sorted({host for _, host in deferred})
+                print(f"[INFO] {len(deferred)} item(s) waiting for {', '.join(hosts)}, "
+                      f"retrying in {format_duration(wait)}...")
+                sleep_unless_stopped(int(wait) + 1)
+                blocked = blocked_hosts()
+            if not STOP_REQUESTED:
+                retry_deferred(blocked)
+        STATUS.set_depth("retry", None)
+        STATUS.set_item("")
+        # Once per pass: the memo and the pass's stream lists are garbage now
+        gc.collect()
+        # Recorded even when nothing completed: deferred and failed items are part of the history
+        print(summary_line(pass_number, history.finish_pass(stopped=STOP_REQUESTED)))
+        return done
 
     # ------------------------
     # Run mode
     # ------------------------
+    def sleep_unless_stopped(seconds):
+        for _ in range(int(seconds)):
+            if STOP_REQUESTED:
+                break
+            time.sleep(1)
+
     try:
         if mode == "oneshot":
-            run_one_pass()
+            if not run_one_pass() and not STOP_REQUESTED:
+                print("[INFO] Nothing new or due for a re-check in the inputs.")
             print("Run complete (one-shot).")
             return
         if mode == "loop":
             while not STOP_REQUESTED:
-                run_one_pass()
+                if not run_one_pass() and not STOP_REQUESTED:
+                    # Nothing changed in the sources; don't re-fetch them in a tight loop
+                    print("[INFO] Nothing new or due, checking sources again in 1 minute...")
+                    sleep_unless_stopped(60)
                 if STOP_REQUESTED:
                     break
                 print("Loop: starting next pass...\n")
@@ -308,17 +667,35 @@ def start_app(imdb_list_urls=None, movies=None, series_list=None, tmdb_manifest_
                 except (TypeError, ValueError):
                     mins = 60
                 print(f"[INFO] Next run in {mins} minutes...\n")
-                for _ in range(mins * 60):
+                sleep_unless_stopped(mins * 60)
+            print("[INFO] Stopped.")
+            return
+        if mode == "scheduled":
+            # Each source re-read on its own cadence (see services/scheduler)
+            scheduler = Scheduler([key for key, _, _ in sources], config)
+            while not STOP_REQUESTED:
+                due = scheduler.due()
+                if due:
+                    started = time.time()
+                    print(f"[INFO] Sources due: {', '.join(due)}")
+                    run_one_pass(set(due), scheduler)
                     if STOP_REQUESTED:
                         break
-                    time.sleep(1)
+                    # Cadence counts from the start of the read; failed reads wait for their next slot too
+                    for key in due:
+                        scheduler.mark_run(key, started)
+                    continue
+                when, key = scheduler.next_due()
+                wait = max(1, int(when - time.time()) + 1)
+                print(f"[INFO] Next source due: {key} in {format_duration(wait)}\n")
+                sleep_unless_stopped(wait)
             print("[INFO] Stopped.")
             return
         run_one_pass()
         print("[INFO] Run complete.")
     finally:
-        TRAY_RUNNING = False
-        TRAY_CURRENT_ITEM = ""
+        parse_pool.shutdown()
+        STATUS.set_running(False)
 
 
 def request_stop():
@@ -0,0 +1,107 @@
+"""
+Async counterpart of services.http for the "async" engine: one httpx.AsyncClient
+with connection pooling, HTTP/2 where the server supports it (needs the `h2`
+package) and gzip/brotli decoding (brotli needs the `brotli` package), so
+thousands of requests can be in flight on one thread.
+
+httpx is optional (pip install "httpx[http2,brotli]"); AVAILABLE is False without it.
+Per-host limits: ASYNC_HOST_LIMITS / config "async_host_limits", else the polite
+limits in services.http.HOST_LIMITS (IMDb), else "async_host_connections".
+Request spacing and rate caps (services.http.HOST_RATES), circuit breakers and
+cassettes are shared with services.http.
+"""
+import asyncio
+import importlib.util
+import time
+from urllib.parse import urlparse
+
+from services import http
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+AVAILABLE = httpx is not None
+HTTP2 = AVAILABLE and importlib.util.find_spec("h2") is not None
+BROTLI = importlib.util.find_spec("brotli") is not None or importlib.util.find_spec("brotlicffi") is not None
+
+ASYNC_HOST_CONNECTIONS = 64
+# host -> max requests in flight (Real-Debrid rate-limits per account)
+ASYNC_HOST_LIMITS = {
+    "api.real-debrid.com": 8,
+}
+
+
+class AsyncHTTP:
+    """Shared AsyncClient plus per-host concurrency/spacing. Use as `async with AsyncHTTP() as client`."""
+
+    def __init__(self, host_connections: int = ASYNC_HOST_CONNECTIONS, host_limits: dict = None, timeout: float = 20):
+        if not AVAILABLE:
+            raise RuntimeError('The async engine needs httpx: pip install "httpx[http2,brotli]"')
+        self.host_connections = max(1, int(host_connections))
+        self.host_limits = {**ASYNC_HOST_LIMITS, **(host_limits or {})}
+        self.timeout = timeout
+        self._hosts = {}
+        self._client = None
+
+    async def __aenter__(self):
+        self._client = httpx.AsyncClient(
+            http2=HTTP2,
+            timeout=self.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=None, max_keepalive_connections=self.host_connections * 4),
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._client.aclose()
+
+    def _host(self, host: str) -> dict:
+        state = self._hosts.get(host)
+        if state is None:
+            if host in self.host_limits:
+                limit = self.host_limits[host]
+            else:
+                limit = http.HOST_LIMITS.get(host, (self.host_connections, 0.0))[0]
+            state = {"semaphore": asyncio.Semaphore(limit)}
+            self._hosts[host] = state
+        return state
+
+    async def _wait_turn(self, host: str):
+        # Start slots come from services.http, so both clients share the host's spacing
+        delay = http.next_start_delay(host)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def request(self, method: str, url: str, headers=None, data=None, timeout=None):
+        """httpx.Response (or a replayed requests.Response); raises CircuitOpenError like http.request."""
+        cassette = http.active_cassette()
+        if cassette is not None and cassette.replaying:
+            response, duration = cassette.lookup(method, url, data)
+            if cassette.timing == "recorded" and duration:
+                await asyncio.sleep(duration)
+            return response
+        host = urlparse(url).netloc.lower()
+        http.check_circuit(host)
+        state = self._host(host)
+        async with state["semaphore"]:
+            await self._wait_turn(host)
+            started = time.monotonic()
+            ok = False
+            try:
+                response = await self._client.request(
+                    method, url, headers=headers, data=data, timeout=timeout or self.timeout
+                )
+                ok = response.status_code < 500
+            finally:
+                http.record_result(host, ok)
+        if cassette is not None:
+            cassette.record(method, url, data, started, response)
+        return response
+
+    async def get(self, url: str, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs):
+        return await self.request("POST", url, **kwargs)
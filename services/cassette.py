@@ -0,0 +1,149 @@
+"""
+HTTP record/replay at the transport level (services.http.request).
+
+A cassette is a gzip'd JSON-lines file: one header line (the inputs and settings
+of the recorded pass) followed by one line per exchange:
+
+    {"t": start offset s, "d": duration s, "m": method, "u": url, "k": body key,
+     "s": status, "ct": content type, "b": body text | "b64": base64 body}
+
+Authorization headers are never written. On replay, requests are matched by
+method + URL + form body; repeats of the same request are served in recorded
+order (the last response is reused once they run out). A request that was not
+recorded raises requests.ConnectionError, which the services already treat as a
+network failure.
+"""
+import base64
+import gzip
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from http.client import responses as REASONS
+from urllib.parse import urlencode
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+CASSETTE_VERSION = 1
+
+
+def request_key(method: str, url: str, data=None) -> str:
+    body = ""
+    if isinstance(data, dict):
+        body = urlencode(sorted(data.items()))
+    elif isinstance(data, (str, bytes)):
+        body = data.decode("utf-8", "replace") if isinstance(data, bytes) else data
+    return f"{method.upper()} {url} {body}".rstrip()
+
+
+def _open(path, mode):
+    if str(path).endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class Recorder:
+    """Collects exchanges made through services.http and writes them on close()."""
+
+    replaying = False
+
+    def __init__(self, path: str, header: dict = None):
+        self.path = path
+        self.header = dict(header or {})
+        self._started = time.monotonic()
+        self._entries = []
+        self._lock = threading.Lock()
+
+    def record(self, method, url, data, started, response: requests.Response):
+        content = response.content
+        entry = {
+            "t": round(started - self._started, 4),
+            "d": round(time.monotonic() - started, 4),
+            "m": method.upper(),
+            "u": url,
+            "k": request_key(method, url, data),
+            "s": response.status_code,
+            "ct": response.headers.get("Content-Type", ""),
+        }
+        try:
+            entry["b"] = content.decode("utf-8")
+        except UnicodeDecodeError:
+            entry["b64"] = base64.b64encode(content).decode("ascii")
+        with self._lock:
+            self._entries.append(entry)
+
+    def close(self):
+        with self._lock:
+            entries = sorted(self._entries, key=lambda e: e["t"])
+        header = {"version": CASSETTE_VERSION, "recorded_at": time.time(), "exchanges": len(entries), **self.header}
+        with _open(self.path, "w") as f:
+            f.write(json.dumps(header, ensure_ascii=False) + "\n")
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+        return len(entries)
+
+
+class Player:
+    """
+    Serves recorded responses. timing="fast" returns immediately; "recorded"
+    sleeps each exchange's recorded duration, so concurrency and politeness
+    behave as they did live.
+    """
+
+    replaying = True
+
+    def __init__(self, path: str, timing: str = "fast"):
+        if timing not in ("fast", "recorded"):
+            raise ValueError(f"Unknown replay timing: {timing}")
+        self.path = path
+        self.timing = timing
+        self._responses = defaultdict(deque)
+        self._last = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = []
+        with _open(path, "r") as f:
+            self.header = json.loads(f.readline() or "{}")
+            if self.header.get("version") != CASSETTE_VERSION:
+                raise ValueError(f"Unsupported cassette version: {self.header.get('version')}")
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._responses[entry["k"]].append(entry)
+
+    def play(self, method, url, data=None) -> requests.Response:
+        response, duration = self.lookup(method, url, data)
+        if self.timing == "recorded" and duration:
+            time.sleep(duration)
+        return response
+
+    def lookup(self, method, url, data=None):
+        """(response, recorded duration) without waiting; raises ConnectionError if not recorded."""
+        key = request_key(method, url, data)
+        with self._lock:
+            queue = self._responses.get(key)
+            if queue:
+                entry = queue.popleft()
+                self._last[key] = entry
+            else:
+                entry = self._last.get(key)
+            if entry is None:
+                self.misses.append(key)
+            else:
+                self.hits += 1
+        if entry is None:
+            raise requests.ConnectionError(f"Not in cassette: {key}")
+        return self._response(entry), entry["d"]
+
+    @staticmethod
+    def _response(entry) -> requests.Response:
+        response = requests.Response()
+        response.status_code = entry["s"]
+        response.reason = REASONS.get(entry["s"], "")
+        response.url = entry["u"]
+        response.headers = CaseInsensitiveDict({"Content-Type": entry.get("ct", "")})
+        response.encoding = "utf-8"
+        response._content = base64.b64decode(entry["b64"]) if "b64" in entry else entry.get("b", "").encode("utf-8")
+        response._content_consumed = True
+        return response
@@ -31,7 +31,18 @@ def get_or_create_config():
         "min_resolution": 720,
         "delay_between_movies": 5,
         "max_per_quality": 1,
+        "torrentio_providers": [],
+        "torrentio_limit": 10,
         "allow_packs_fallback": True,
+        "season_pack_first": True,
+        "hash_memo_size": 50000,
+        "episode_cache_hours": 24,
+        "imdb_index_dir": "imdb_index",
+        "imdb_index_max_age_days": 30,
+        "list_cache_hours": 6,
+        "source_recheck_hours": 24,
+        "resolver_workers": 4,
+        "resolver_negative_ttl_hours": 72,
         "run_mode": "oneshot",
         "repeat_minutes": 60,
     }
@@ -1,4 +1,6 @@
+import json
 import sqlite3
+import time
 
 DB_FILE = "cachewarmer.db"
 
@@ -27,9 +29,124 @@ def init_db():
         )
     """)
 
+    # Episode lists scraped from IMDb, refreshed after a TTL (see imdb_series_episodes)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS series_episodes (
+            series_id TEXT NOT NULL,
+            season INTEGER NOT NULL,
+            episode INTEGER NOT NULL,
+            episode_id TEXT NOT NULL,
+            PRIMARY KEY (series_id, season, episode)
+        )
+    """)
+    # ended = 1 once the series has finished airing (its episode list is not expected to change)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS series_cache (
+            series_id TEXT PRIMARY KEY,
+            fetched_at REAL NOT NULL,
+            ended INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    if "ended" not in [row[1] for row in cur.execute("PRAGMA table_info(series_cache)")]:
+        cur.execute("ALTER TABLE series_cache ADD COLUMN ended INTEGER NOT NULL DEFAULT 0")
+
+    # IMDb list URL -> comma-joined IDs, refreshed after a TTL (see imdb_list_titles)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS list_cache (
+            url TEXT PRIMARY KEY,
+            ids TEXT NOT NULL,
+            fetched_at REAL NOT NULL
+        )
+    """)
+
+    # Title resolver cache: (normalized title, year or 0) -> tt... (NULL = not found);
+    # expires_at is set for answers that may change (ambiguous titles), else NULL
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS title_ids (
+            norm_title TEXT NOT NULL,
+            year INTEGER NOT NULL,
+            imdb_id TEXT,
+            resolved_at REAL NOT NULL,
+            expires_at REAL,
+            PRIMARY KEY (norm_title, year)
+        )
+    """)
+    if "expires_at" not in [row[1] for row in cur.execute("PRAGMA table_info(title_ids)")]:
+        cur.execute("ALTER TABLE title_ids ADD COLUMN expires_at REAL")
+
+    # Stremio addon tmdb:... -> tt... mapping (imdb_id NULL = addon had no IMDb ID)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS tmdb_imdb_map (
+            tmdb_id TEXT NOT NULL,
+            type TEXT NOT NULL,
+            imdb_id TEXT,
+            resolved_at REAL NOT NULL,
+            PRIMARY KEY (tmdb_id, type)
+        )
+    """)
+
+    # Last snapshot of each input source (IMDb list, addon catalog) for pass-to-pass diffing
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS source_items (
+            source TEXT NOT NULL,
+            item_id TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            first_seen REAL NOT NULL,
+            last_checked REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (source, item_id)
+        )
+    """)
+
+    # Last time each input source was read in the "scheduled" run mode (see services/scheduler)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS source_runs (
+            source TEXT PRIMARY KEY,
+            last_run REAL NOT NULL
+        )
+    """)
+
+    # One row per pass (see services/run_history); failures and stage timings as JSON
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            started_at REAL NOT NULL,
+            finished_at REAL,
+            pass_number INTEGER NOT NULL,
+            mode TEXT,
+            version TEXT,
+            items INTEGER NOT NULL DEFAULT 0,
+            streams INTEGER NOT NULL DEFAULT 0,
+            candidates INTEGER NOT NULL DEFAULT 0,
+            rd_checks INTEGER NOT NULL DEFAULT 0,
+            cached_hits INTEGER NOT NULL DEFAULT 0,
+            added INTEGER NOT NULL DEFAULT 0,
+            failures TEXT,
+            stages TEXT,
+            stopped INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    # Per-item outcomes of a run (season is NULL for movies)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS run_items (
+            run_id INTEGER NOT NULL,
+            item_id TEXT NOT NULL,
+            season INTEGER,
+            duration_ms INTEGER NOT NULL,
+            fetch_ms INTEGER NOT NULL,
+            rd_ms INTEGER NOT NULL,
+            streams INTEGER NOT NULL,
+            candidates INTEGER NOT NULL,
+            cached_hits INTEGER NOT NULL,
+            added INTEGER NOT NULL,
+            outcome TEXT NOT NULL
+        )
+    """)
+
     # Indexes for performance
     cur.execute("CREATE INDEX IF NOT EXISTS idx_attempted_hash ON attempted_hashes(info_hash)")
     cur.execute("CREATE INDEX IF NOT EXISTS idx_cached_quality ON cached_quality(imdb_id, resolution, season)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_source_item ON source_items(item_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_run_items ON run_items(run_id)")
 
     conn.commit()
     conn.close()
@@ -92,3 +209,278 @@ def mark_cached_quality(imdb_id: str, resolution: int, season=None):
     )
     conn.commit()
     conn.close()
+
+
+def get_cached_episodes(series_id: str):
+    """Return (episodes, fetched_at, ended) for a cached series, or (None, None, False) if never cached."""
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute("SELECT fetched_at, ended FROM series_cache WHERE series_id=?", (series_id,))
+    row = cur.fetchone()
+    if row is None:
+        conn.close()
+        return None, None, False
+    cur.execute(
+        "SELECT season, episode, episode_id FROM series_episodes WHERE series_id=? ORDER BY season, episode",
+        (series_id,),
+    )
+    eps = [{"season": s, "episode": e, "episode_id": ep_id} for s, e, ep_id in cur.fetchall()]
+    conn.close()
+    return eps, row[0], bool(row[1])
+
+
+def save_series_episodes(series_id: str, episodes: list, seasons, ended: bool = False):
+    """Replace the cached rows of the given seasons and stamp the series as fresh (and whether it has ended)."""
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.executemany(
+        "DELETE FROM series_episodes WHERE series_id=? AND season=?",
+        [(series_id, s) for s in seasons],
+    )
+    cur.executemany(
+        "INSERT OR REPLACE INTO series_episodes (series_id, season, episode, episode_id) VALUES (?, ?, ?, ?)",
+        [(series_id, r["season"], r["episode"], r["episode_id"]) for r in episodes],
+    )
+    cur.execute(
+        "INSERT OR REPLACE INTO series_cache (series_id, fetched_at, ended) VALUES (?, ?, ?)",
+        (series_id, time.time(), int(ended)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def get_cached_list(url: str):
+    """Return (ids, fetched_at) for a cached IMDb list URL, or (None, None)."""
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute("SELECT ids, fetched_at FROM list_cache WHERE url=?", (url,))
+    row = cur.fetchone()
+    conn.close()
+    if row is None:
+        return None, None
+    return [i for i in row[0].split(",") if i], row[1]
+
+
+def save_cached_list(url: str, ids: list):
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute(
+        "INSERT OR REPLACE INTO list_cache (url, ids, fetched_at) VALUES (?, ?, ?)",
+        (url, ",".join(ids), time.time()),
+    )
+    conn.commit()
+    conn.close()
+
+
+def get_title_id(norm_title: str, year: int):
+    """Return (imdb_id or None, resolved_at, expires_at or None) from the resolver cache, or None if never resolved."""
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT imdb_id, resolved_at, expires_at FROM title_ids WHERE norm_title=? AND year=?",
+        (norm_title, year),
+    )
+    row = cur.fetchone()
+    conn.close()
+    return row
+
+
+def save_title_id(norm_title: str, year: int, imdb_id, expires_at: float = None):
+    """Cache a resolved title; imdb_id=None records a negative result. expires_at: re-resolve after this."""
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute(
+        "INSERT OR REPLACE INTO title_ids (norm_title, year, imdb_id, resolved_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+        (norm_title, year, imdb_id, time.time(), expires_at),
+    )
+    conn.commit()
+    conn.close()
+
+
+def get_tmdb_mappings(keys) -> dict:
+    """{(tmdb_id, type): (imdb_id or None, resolved_at)} for the cached keys among `keys`."""
+    conn = get_connection()
+    cur = conn.cursor()
+    out = {}
+    for tmdb_id, media_type in keys:
+        cur.execute(
+            "SELECT imdb_id, resolved_at FROM tmdb_imdb_map WHERE tmdb_id=? AND type=?",
+            (tmdb_id, media_type),
+        )
+        row = cur.fetchone()
+        if row is not None:
+            out[(tmdb_id, media_type)] = row
+    conn.close()
+    return out
+
+
+def save_tmdb_mappings(mappings: dict):
+    """Store {(tmdb_id, type): imdb_id or None}."""
+    if not mappings:
+        return
+    now = time.time()
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.executemany(
+        "INSERT OR REPLACE INTO tmdb_imdb_map (tmdb_id, type, imdb_id, resolved_at) VALUES (?, ?, ?, ?)",
+        [(tmdb_id, media_type, imdb_id, now) for (tmdb_id, media_type), imdb_id in mappings.items()],
+    )
+    conn.commit()
+    conn.close()
+
+
+def get_source_snapshot(source: str) -> dict:
+    """{item_id: (kind, first_seen, last_checked)} from the last stored snapshot of `source`."""
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute("SELECT item_id, kind, first_seen, last_checked FROM source_items WHERE source=?", (source,))
+    out = {row[0]: row[1:] for row in cur.fetchall()}
+    conn.close()
+    return out
+
+
+def save_source_snapshot(source: str, added: list, removed: list):
+    """Apply a diff to the stored snapshot: insert added [(item_id, kind)], drop removed item_ids."""
+    if not added and not removed:
+        return
+    now = time.time()
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.executemany(
+        "INSERT OR IGNORE INTO source_items (source, item_id, kind, first_seen, last_checked) VALUES (?, ?, ?, ?, 0)",
+        [(source, item_id, kind, now) for item_id, kind in added],
+    )
+    cur.executemany(
+        "DELETE FROM source_items WHERE source=? AND item_id=?",
+        [(source, item_id) for item_id in removed],
+    )
+    conn.commit()
+    conn.close()
+
+
+def mark_source_checked(item_ids):
+    """Record that these items were processed now (in every source that lists them)."""
+    if not item_ids:
+        return
+    now = time.time()
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.executemany("UPDATE source_items SET last_checked=? WHERE item_id=?", [(now, i) for i in item_ids])
+    conn.commit()
+    conn.close()
+
+
+def get_source_runs(sources) -> dict:
+    """{source: last_run} for the given source keys that have been read before."""
+    conn = get_connection()
+    cur = conn.cursor()
+    out = {}
+    for source in sources:
+        cur.execute("SELECT last_run FROM source_runs WHERE source=?", (source,))
+        row = cur.fetchone()
+        if row is not None:
+            out[source] = row[0]
+    conn.close()
+    return out
+
+
+def save_source_run(source: str, when: float):
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute("INSERT OR REPLACE INTO source_runs (source, last_run) VALUES (?, ?)", (source, when))
+    conn.commit()
+    conn.close()
+
+
+def start_run(pass_number: int, mode: str, version: str) -> int:
+    """Insert a runs row for a pass that is starting; returns its id."""
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute(
+        "INSERT INTO runs (started_at, pass_number, mode, version) VALUES (?, ?, ?, ?)",
+        (time.time(), pass_number, mode, version),
+    )
+    run_id = cur.lastrowid
+    conn.commit()
+    conn.close()
+    return run_id
+
+
+def save_run_items(run_id: int, rows: list):
+    """rows: (item_id, season, duration_ms, fetch_ms, rd_ms, streams, candidates, cached_hits, added, outcome)."""
+    if not rows:
+        return
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.executemany(
+        "INSERT INTO run_items (run_id, item_id, season, duration_ms, fetch_ms, rd_ms, streams, candidates, "
+        "cached_hits, added, outcome) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [(run_id, *row) for row in rows],
+    )
+    conn.commit()
+    conn.close()
+
+
+def finish_run(run_id: int, totals: dict, stopped: bool = False):
+    """Store a pass's totals (see run_history.RunRecorder.totals)."""
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute(
+        "UPDATE runs SET finished_at=?, items=?, streams=?, candidates=?, rd_checks=?, cached_hits=?, added=?, "
+        "failures=?, stages=?, stopped=? WHERE id=?",
+        (
+            time.time(), totals["items"], totals["streams"], totals["candidates"], totals["rd_checks"],
+            totals["cached_hits"], totals["added"], json.dumps(totals["failures"]), json.dumps(totals["stages"]),
+            int(stopped), run_id,
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+
+def get_recent_runs(limit: int = 20) -> list:
+    """Finished runs, newest first, as dicts (failures/stages decoded)."""
+    conn = get_connection()
+    conn.row_factory = sqlite3.Row
+    cur = conn.cursor()
+    cur.execute("SELECT * FROM runs WHERE finished_at IS NOT NULL ORDER BY id DESC LIMIT ?", (limit,))
+    runs = []
+    for row in cur.fetchall():
+        run = dict(row)
+        run["failures"] = json.loads(run["failures"] or "{}")
+        run["stages"] = json.loads(run["stages"] or "{}")
+        runs.append(run)
+    conn.close()
+    return runs
+
+
+def get_slowest_items(run_ids, limit: int = 10) -> list:
+    """[(item_id, season, runs, avg_ms, max_ms)] over the given runs, slowest average first."""
+    run_ids = list(run_ids)
+    if not run_ids:
+        return []
+    conn = get_connection()
+    cur = conn.cursor()
+    marks = ",".join("?" * len(run_ids))
+    cur.execute(
+        f"SELECT item_id, season, COUNT(*), AVG(duration_ms), MAX(duration_ms) FROM run_items "
+        f"WHERE run_id IN ({marks}) GROUP BY item_id, season ORDER BY AVG(duration_ms) DESC LIMIT ?",
+        (*run_ids, limit),
+    )
+    rows = cur.fetchall()
+    conn.close()
+    return rows
+
+
+def get_outcome_counts(run_ids) -> dict:
+    """{outcome: count} over the given runs."""
+    run_ids = list(run_ids)
+    if not run_ids:
+        return {}
+    conn = get_connection()
+    cur = conn.cursor()
+    marks = ",".join("?" * len(run_ids))
+    cur.execute(f"SELECT outcome, COUNT(*) FROM run_items WHERE run_id IN ({marks}) GROUP BY outcome", run_ids)
+    out = dict(cur.fetchall())
+    conn.close()
+    return out
@@ -0,0 +1,92 @@
+"""
+Execution engines for the per-item processing in services.app.
+
+Processing steps are generators that yield I/O operations as tuples
+(op, *args) and receive each result back, e.g.
+
+    streams = yield "movie_streams", imdb_id
+    cached = yield "rd_check", info_hash
+    done = yield "db", has_attempted, info_hash     # blocking call, run off the event loop
+
+so the same selection logic runs on either engine:
+
+    threads  drive() calls the blocking services, one item at a time
+    async    run_async_pass() runs many items as asyncio tasks over one
+             services.async_http client (thousands of requests in flight)
+
+An exception raised by an operation is thrown back into the step at its yield.
+"""
+import asyncio
+
+from services.async_http import AsyncHTTP
+
+ENGINES = ("threads", "async")
+ASYNC_CONCURRENCY = 200
+
+
+def drive(steps, io: dict):
+    """Run a step generator to completion with blocking I/O functions {op: fn}; returns its result."""
+    result, error = None, None
+    while True:
+        try:
+            op = steps.throw(error) if error is not None else steps.send(result)
+        except StopIteration as done:
+            return done.value
+        try:
+            result, error = io[op[0]](*op[1:]), None
+        except Exception as e:
+            result, error = None, e
+
+
+async def drive_async(steps, io: dict):
+    """Like drive(), with coroutine functions {op: async fn}."""
+    result, error = None, None
+    while True:
+        try:
+            op = steps.throw(error) if error is not None else steps.send(result)
+        except StopIteration as done:
+            return done.value
+        try:
+            result, error = await io[op[0]](*op[1:]), None
+        except Exception as e:
+            result, error = None, e
+
+
+def run_async_pass(work, steps_for, make_io, on_done, stop_check, concurrency=ASYNC_CONCURRENCY, client_options=None):
+    """
+    Process the work items of one pass concurrently on a fresh event loop.
+    steps_for(item) -> step generator; make_io(client) -> {op: async fn};
+    on_done(item, result) is called on the loop thread as each item finishes.
+    """
+    asyncio.run(_run(work, steps_for, make_io, on_done, stop_check, max(1, int(concurrency)), client_options or {}))
+
+
+async def _run(work, steps_for, make_io, on_done, stop_check, concurrency, client_options):
+    items = iter(work)
+    slots = asyncio.Semaphore(concurrency)
+    tasks = set()
+
+    async def process(item):
+        try:
+            result = await drive_async(steps_for(item), io)
+        except Exception as e:
+            print(f"[ERROR] Error processing {item[0]} {item[1]}: {e}")
+            result = None
+        finally:
+            slots.release()
+        on_done(item, result)
+
+    async with AsyncHTTP(**client_options) as client:
+        io = make_io(client)
+        while not stop_check():
+            await slots.acquire()
+            # The work queue blocks while sources are still streaming; wait for it off the loop
+            item = await asyncio.to_thread(next, items, None)
+            if item is None:
+                slots.release()
+                break
+            task = asyncio.create_task(process(item))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
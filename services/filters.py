@@ -83,6 +83,16 @@ def extract_seasons_from_title(title: str) -> list:
     return sorted(out) if out else []
 
 
+def is_season_pack(title: str) -> bool:
+    """
+    True if the title names whole season(s) rather than a single episode:
+    Show S01 1080p, Show Season 1-3 -> True; Show S01E02, Show 1x02 -> False.
+    """
+    if not extract_seasons_from_title(title):
+        return False
+    return not re.search(r"\bS\d{1,2}\s*E\d{1,3}|\b\d{1,2}x\d{2,3}\b|\bEpisode\s+\d+", title, re.I)
+
+
 def is_large_pack(title: str) -> bool:
     t = title.lower()
 
@@ -111,5 +121,14 @@ def is_large_pack(title: str) -> bool:
     return any(b in t for b in bad_signals)
 
 
-
-
+def classify_title(title: str) -> dict:
+    """Parse every field the stream filter uses from one title (memoized per infoHash)."""
+    return {
+        "blacklisted": is_blacklisted(title),
+        "seeders": extract_seeders(title),
+        "resolution": extract_resolution(title),
+        "size": extract_size_mb(title),
+        "large_pack": is_large_pack(title),
+        "seasons": extract_seasons_from_title(title),
+        "season_pack": is_season_pack(title),
+    }
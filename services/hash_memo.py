@@ -0,0 +1,48 @@
+"""
+Per-pass memo keyed by infoHash. The same hash shows up under every episode of a
+series (packs) and across overlapping lists; this keeps its parsed title, DB state,
+RD availability verdict and add outcome so each is computed once per pass.
+"""
+from collections import OrderedDict
+
+
+class HashMemo:
+    """LRU-bounded dict of infoHash -> record (parsed, attempted, cached, added)."""
+
+    def __init__(self, max_size: int = 50000):
+        self.max_size = max(1, int(max_size))
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def entry(self, info_hash: str, count: bool = True) -> dict:
+        """
+        Get (or create) the record for a hash and mark it most recently used.
+        count=False for follow-up lookups of a hash already looked up for this
+        stream, so hits/misses reflect streams whose hash was seen before.
+        """
+        rec = self._entries.get(info_hash)
+        if rec is not None:
+            self._entries.move_to_end(info_hash)
+            if count:
+                self.hits += 1
+            return rec
+        if count:
+            self.misses += 1
+        rec = {}
+        self._entries[info_hash] = rec
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return rec
+
+    def peek(self, info_hash: str):
+        """The record for a hash or None, without creating it or counting a hit/miss."""
+        return self._entries.get(info_hash)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
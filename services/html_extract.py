@@ -0,0 +1,108 @@
+"""
+Selective HTML extraction for IMDb pages: precompiled regexes pull only the anchors
+and headings we need straight from the raw page (str or bytes) without building a
+document tree. Text follows BeautifulSoup's get_text(strip=True): each text node is
+entity-decoded and stripped, then joined without separators.
+"""
+import html
+import re
+
+# Script/style bodies and comments are matched first so markup inside them is skipped
+_SKIP = r"<script\b.*?</script\s*>|<style\b.*?</style\s*>|<!--.*?-->"
+_ANCHOR = _SKIP + r"|<a\b([^>]*)>(.*?)</a\s*>"
+_HREF = r"""\bhref\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>"']+))"""
+_TAG = r"<!--.*?-->|<[^>]*>"
+_LI_START = r"<li\b"
+_LI_END = r"</li\s*>"
+
+_PATTERNS = {}
+
+
+def _pattern(name: str, source: str, binary: bool, flags=re.I | re.S):
+    key = (name, binary)
+    pat = _PATTERNS.get(key)
+    if pat is None:
+        pat = re.compile(source.encode() if binary else source, flags)
+        _PATTERNS[key] = pat
+    return pat
+
+
+def _decode(value) -> str:
+    if isinstance(value, bytes):
+        return value.decode("utf-8", "replace")
+    return value
+
+
+def _text(inner) -> str:
+    binary = isinstance(inner, bytes)
+    parts = _pattern("tag", _TAG, binary).split(inner)
+    out = []
+    for part in parts:
+        t = html.unescape(_decode(part)).strip()
+        if t:
+            out.append(t)
+    return "".join(out)
+
+
+def _href(attrs):
+    m = _pattern("href", _HREF, isinstance(attrs, bytes)).search(attrs)
+    if not m:
+        return None
+    value = next(g for g in m.groups() if g is not None)
+    return html.unescape(_decode(value))
+
+
+def iter_anchors(page, href_prefix: str | None = None, href_contains: str | None = None):
+    """
+    Yield (href, text) for every <a href=...> in the page, in document order.
+    href_prefix / href_contains: cheap filters applied before the text is decoded.
+    """
+    binary = isinstance(page, bytes)
+    for m in _pattern("anchor", _ANCHOR, binary).finditer(page):
+        if m.group(1) is None:
+            continue
+        href = _href(m.group(1))
+        if href is None:
+            continue
+        if href_prefix is not None and not href.startswith(href_prefix):
+            continue
+        if href_contains is not None and href_contains not in href:
+            continue
+        yield href, _text(m.group(2))
+
+
+def iter_tag_text(page, tag: str):
+    """Yield the stripped text of every <tag>...</tag> element."""
+    binary = isinstance(page, bytes)
+    pat = _pattern(f"tag:{tag}", _SKIP + rf"|<{tag}\b[^>]*>(.*?)</{tag}\s*>", binary)
+    for m in pat.finditer(page):
+        if m.group(1) is not None:
+            yield _text(m.group(1))
+
+
+def section_by_testid(page, testid: str):
+    """Return the raw markup of the first <section data-testid="..."> (None if absent)."""
+    binary = isinstance(page, bytes)
+    pat = _pattern(
+        f"section:{testid}",
+        rf"""<section\b[^>]*\bdata-testid\s*=\s*["']{re.escape(testid)}["'][^>]*>(.*?)</section\s*>""",
+        binary,
+    )
+    m = pat.search(page)
+    return m.group(1) if m else None
+
+
+def iter_list_items(page):
+    """Yield the markup of each <li> up to its </li> or the next <li> (nested items split off)."""
+    binary = isinstance(page, bytes)
+    starts = [m.start() for m in _pattern("li", _LI_START, binary).finditer(page)]
+    end_pat = _pattern("li_end", _LI_END, binary)
+    for i, start in enumerate(starts):
+        end = starts[i + 1] if i + 1 < len(starts) else len(page)
+        close = end_pat.search(page, start, end)
+        yield page[start:close.start() if close else end]
+
+
+def first_anchor(page):
+    """(href, text) of the first anchor with an href, or None."""
+    return next(iter_anchors(page), None)
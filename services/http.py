@@ -0,0 +1,221 @@
+"""
+Shared HTTP layer: one pooled session plus per-host politeness limits
+(max concurrent requests and minimum spacing) for parallel fetches.
+
+HOST_RATES caps requests per second per host (Real-Debrid allows 250 a minute
+per account). Request starts are spaced by next_start_delay(), which
+services.async_http uses too, so the sync and async clients share one budget.
+
+Service base URLs can be pointed elsewhere (e.g. benchmarks/fake_server.py) with
+CACHEWARMER_TORRENTIO_URL, CACHEWARMER_RD_URL and CACHEWARMER_IMDB_URL.
+
+set_cassette() routes every request through a services.cassette Recorder or
+Player (see benchmarks/replay.py).
+
+Each host also has a circuit breaker. After CIRCUIT_FAILURES consecutive failures
+(connection errors, timeouts, 5xx) the host is open and requests to it raise
+CircuitOpenError at once instead of waiting for timeouts. After a cooldown
+(doubling on every failed probe, up to CIRCUIT_MAX_COOLDOWN) one request is let
+through as a probe (half-open); it closes the circuit again if it succeeds.
+"""
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+
+DEFAULT_HOST_LIMIT = 4
+CIRCUIT_FAILURES = 5
+CIRCUIT_COOLDOWN = 60.0
+CIRCUIT_MAX_COOLDOWN = 900.0
+# host -> (max concurrent requests, min seconds between request starts)
+HOST_LIMITS = {
+    "www.imdb.com": (3, 0.2),
+}
+# host -> max requests per second, across every client
+HOST_RATES = {
+    "api.real-debrid.com": 4.0,
+}
+
+_session = requests.Session()
+_lock = threading.Lock()
+_host_state = {}
+_cassette = None
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """A request was refused because the host's circuit is open (it is failing)."""
+
+    def __init__(self, host: str, retry_at: float):
+        super().__init__(f"{host} is failing, circuit open for another {max(0, int(retry_at - time.monotonic()))}s")
+        self.host = host
+        self.retry_at = retry_at
+
+
+def base_url(service: str, default: str) -> str:
+    """Base URL for a service: $CACHEWARMER_<SERVICE>_URL if set, else default."""
+    return os.environ.get(f"CACHEWARMER_{service}_URL", default).rstrip("/")
+
+
+def set_cassette(cassette):
+    """Record to / replay from a cassette (None = plain network)."""
+    global _cassette
+    _cassette = cassette
+
+
+def set_circuit_limits(failures: int = CIRCUIT_FAILURES, cooldown: float = CIRCUIT_COOLDOWN,
+                       max_cooldown: float = CIRCUIT_MAX_COOLDOWN):
+    """Failures before a host's circuit opens, and its first/maximum open time in seconds."""
+    global CIRCUIT_FAILURES, CIRCUIT_COOLDOWN, CIRCUIT_MAX_COOLDOWN
+    with _lock:
+        CIRCUIT_FAILURES = max(1, int(failures))
+        CIRCUIT_COOLDOWN = max(1.0, float(cooldown))
+        CIRCUIT_MAX_COOLDOWN = max(CIRCUIT_COOLDOWN, float(max_cooldown))
+
+
+def set_host_limit(host: str, max_concurrent: int, min_interval: float = 0.0):
+    """Override the politeness limit for a host (applies to requests made afterwards)."""
+    with _lock:
+        HOST_LIMITS[host] = (max(1, int(max_concurrent)), max(0.0, float(min_interval)))
+        _host_state.pop(host, None)
+
+
+def set_host_rate(host: str, per_second: float):
+    """Cap a host's request rate (0 = no cap; applies to requests made afterwards)."""
+    with _lock:
+        HOST_RATES[host] = max(0.0, float(per_second or 0))
+        _host_state.pop(host, None)
+
+
+def _state_for(host: str) -> dict:
+    with _lock:
+        state = _host_state.get(host)
+        if state is None:
+            limit, interval = HOST_LIMITS.get(host, (DEFAULT_HOST_LIMIT, 0.0))
+            rate = HOST_RATES.get(host)
+            if rate:
+                interval = max(interval, 1.0 / rate)
+            state = {
+                "semaphore": threading.BoundedSemaphore(limit),
+                "interval": interval,
+                "next_start": 0.0,
+                # Circuit breaker: "closed", "open" or "half_open"
+                "circuit": "closed",
+                "failures": 0,
+                "cooldown": CIRCUIT_COOLDOWN,
+                "open_until": 0.0,
+            }
+            _host_state[host] = state
+        return state
+
+
+def _reserve_start(state: dict) -> float:
+    """Claim the host's next start slot; seconds to wait for it."""
+    if not state["interval"]:
+        return 0.0
+    with _lock:
+        now = time.monotonic()
+        start = max(now, state["next_start"])
+        state["next_start"] = start + state["interval"]
+    return start - now
+
+
+def _wait_turn(state: dict):
+    """Space request starts to the host's min interval / rate."""
+    delay = _reserve_start(state)
+    if delay > 0:
+        time.sleep(delay)
+
+
+def next_start_delay(host: str) -> float:
+    """Claim a start slot on `host` for another transport (services.async_http); seconds to wait."""
+    return _reserve_start(_state_for(host))
+
+
+def _enter_circuit(host: str, state: dict):
+    """Raise CircuitOpenError unless the host may be called (closed, or this is the half-open probe)."""
+    with _lock:
+        if state["circuit"] == "closed":
+            return
+        now = time.monotonic()
+        if state["circuit"] == "open" and now >= state["open_until"]:
+            state["circuit"] = "half_open"
+            print(f"[INFO] Probing {host} (circuit half-open)")
+            return
+        raise CircuitOpenError(host, max(state["open_until"], now + 1.0))
+
+
+def _record_outcome(host: str, state: dict, ok: bool):
+    with _lock:
+        if ok:
+            if state["circuit"] != "closed":
+                print(f"[INFO] {host} recovered, circuit closed")
+            state.update(circuit="closed", failures=0, cooldown=CIRCUIT_COOLDOWN)
+            return
+        state["failures"] += 1
+        if state["circuit"] == "half_open":
+            state["cooldown"] = min(state["cooldown"] * 2, CIRCUIT_MAX_COOLDOWN)
+        elif state["circuit"] == "open" or state["failures"] < CIRCUIT_FAILURES:
+            return
+        state["circuit"] = "open"
+        state["open_until"] = time.monotonic() + state["cooldown"]
+        print(f"[WARN] {host} is failing ({state['failures']} errors in a row), "
+              f"circuit open for {int(state['cooldown'])}s")
+
+
+def check_circuit(host: str):
+    """Raise CircuitOpenError if `host` may not be called now (for other transports, e.g. services.async_http)."""
+    _enter_circuit(host, _state_for(host))
+
+
+def record_result(host: str, ok: bool):
+    _record_outcome(host, _state_for(host), ok)
+
+
+def active_cassette():
+    return _cassette
+
+
+def blocked_hosts() -> dict:
+    """{host: seconds until a probe is allowed} for hosts that are open or being probed."""
+    now = time.monotonic()
+    with _lock:
+        return {
+            host: max(state["open_until"] - now, 1.0) if state["circuit"] == "half_open" else state["open_until"] - now
+            for host, state in _host_state.items()
+            if state["circuit"] == "half_open" or (state["circuit"] == "open" and state["open_until"] > now)
+        }
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    """
+    Send a request through the shared session under the host's politeness limit and
+    circuit breaker. Raises CircuitOpenError while the host's circuit is open.
+    """
+    cassette = _cassette
+    if cassette is not None and cassette.replaying:
+        return cassette.play(method, url, kwargs.get("data"))
+    host = urlparse(url).netloc.lower()
+    state = _state_for(host)
+    _enter_circuit(host, state)
+    with state["semaphore"]:
+        _wait_turn(state)
+        started = time.monotonic()
+        ok = False
+        try:
+            response = _session.request(method, url, **kwargs)
+            ok = response.status_code < 500
+        finally:
+            _record_outcome(host, state, ok)
+    if cassette is not None:
+        cassette.record(method, url, kwargs.get("data"), started, response)
+    return response
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
@@ -0,0 +1,346 @@
+"""
+Offline IMDb dataset index built from the official TSV dumps
+(https://datasets.imdbws.com/ title.basics.tsv[.gz] and title.episode.tsv[.gz]).
+
+The build step writes compact fixed-width binary files that are memory-mapped at
+lookup time, so episode enumeration needs no network and no parsing:
+
+    episodes.bin  sorted (parentTconst, season, episode, tconst) records
+    titles.bin    sorted (tconst, titleType code, startYear, endYear) records
+    titles_trigram.*  memory-mapped trigram index over series/movie titles (services.title_index)
+    meta.json     titleType names, record counts, build time
+
+Build:   python -m services.imdb_dataset build title.basics.tsv.gz title.episode.tsv.gz
+Lookup:  python -m services.imdb_dataset episodes tt0944947
+Search:  python -m services.imdb_dataset search "game of thrones"
+"""
+import argparse
+import gzip
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+
+from services.title_index import TrigramIndex, normalize
+
+INDEX_DIR = "imdb_index"
+FORMAT_VERSION = 2
+# An index older than this may miss new episodes of running series (see DatasetIndex.is_older_than)
+INDEX_MAX_AGE_DAYS = 30
+
+# parentTconst, season, episode, tconst (numeric parts of tt IDs)
+EPISODE_RECORD = struct.Struct("<IHHI")
+# tconst, titleType code, startYear, endYear (0 = unknown / still running)
+TITLE_RECORD = struct.Struct("<IBHH")
+
+# Title types searchable through the trigram index (offline title resolver)
+TITLE_INDEX_TYPES = ("tvSeries", "tvMiniSeries", "movie", "tvMovie")
+
+_MAX_U16 = 0xFFFF
+_index = None
+_title_index = None
+_index_lock = threading.Lock()
+
+
+def _tconst_num(value: str):
+    """'tt0944947' -> 944947; None for \\N or malformed values."""
+    if not value or not value.startswith("tt"):
+        return None
+    try:
+        return int(value[2:])
+    except ValueError:
+        return None
+
+
+def _format_tconst(num: int) -> str:
+    return f"tt{num:07d}"
+
+
+def _int_or_none(value: str):
+    if not value or value == "\\N":
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def _open_tsv(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def _iter_rows(path: str, columns: list):
+    """Yield the requested columns of each TSV row, streaming the file line by line."""
+    with _open_tsv(path) as f:
+        header = f.readline().rstrip("\n").split("\t")
+        idx = [header.index(c) for c in columns]
+        for line in f:
+            parts = line.rstrip("\n").split("\t")
+            if len(parts) < len(header):
+                continue
+            yield [parts[i] for i in idx]
+
+
+def _write_atomic(path: str, chunks):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(tmp, path)
+
+
+def build_index(basics_path: str, episodes_path: str, out_dir: str = INDEX_DIR) -> dict:
+    """Convert the IMDb TSV dumps into the binary index. Returns the written meta dict."""
+    os.makedirs(out_dir, exist_ok=True)
+    started = time.time()
+
+    # Episodes: pack each record into one int so the sort runs on a flat list of ints
+    keys = []
+    for tconst, parent, season, episode in _iter_rows(
+        episodes_path, ["tconst", "parentTconst", "seasonNumber", "episodeNumber"]
+    ):
+        t, p = _tconst_num(tconst), _tconst_num(parent)
+        s, e = _int_or_none(season), _int_or_none(episode)
+        if t is None or p is None or s is None or e is None:
+            continue
+        if not (0 <= s <= _MAX_U16 and 0 <= e <= _MAX_U16):
+            continue
+        keys.append((p << 64) | (s << 48) | (e << 32) | t)
+    keys.sort()
+    episode_count = len(keys)
+    _write_atomic(
+        os.path.join(out_dir, "episodes.bin"),
+        (
+            EPISODE_RECORD.pack(k >> 64, (k >> 48) & _MAX_U16, (k >> 32) & _MAX_U16, k & 0xFFFFFFFF)
+            for k in keys
+        ),
+    )
+    del keys
+    print(f"[INFO] Indexed {episode_count} episodes.")
+
+    # Titles: tconst -> (type, start year, end year); series/movie names also go to the trigram index
+    type_codes = {}
+    keys = []
+    names = []
+    payloads = []
+    for tconst, ttype, title, year, end in _iter_rows(
+        basics_path, ["tconst", "titleType", "primaryTitle", "startYear", "endYear"]
+    ):
+        t = _tconst_num(tconst)
+        if t is None:
+            continue
+        code = type_codes.setdefault(ttype, len(type_codes))
+        if code > 0xFF:
+            continue
+        y = _int_or_none(year) or 0
+        y = y if 0 <= y <= _MAX_U16 else 0
+        ey = _int_or_none(end) or 0
+        keys.append((t << 40) | (code << 32) | (y << 16) | (ey if 0 <= ey <= _MAX_U16 else 0))
+        if ttype in TITLE_INDEX_TYPES:
+            norm = normalize(title)
+            if norm:
+                names.append(norm)
+                payloads.append([t, y, ttype])
+    keys.sort()
+    title_count = len(keys)
+    _write_atomic(
+        os.path.join(out_dir, "titles.bin"),
+        (TITLE_RECORD.pack(k >> 40, (k >> 32) & 0xFF, (k >> 16) & _MAX_U16, k & _MAX_U16) for k in keys),
+    )
+    del keys
+    print(f"[INFO] Indexed {title_count} titles.")
+    TrigramIndex(names, payloads).save(os.path.join(out_dir, "titles_trigram"))
+    print(f"[INFO] Trigram-indexed {len(names)} series/movie titles.")
+    del names, payloads
+
+    meta = {
+        "version": FORMAT_VERSION,
+        "built_at": time.time(),
+        "episodes": episode_count,
+        "titles": title_count,
+        "title_types": sorted(type_codes, key=type_codes.get),
+    }
+    _write_atomic(os.path.join(out_dir, "meta.json"), [json.dumps(meta, indent=2).encode("utf-8")])
+    print(f"[INFO] IMDb index built in {time.time() - started:.1f}s -> {out_dir}")
+    return meta
+
+
+class DatasetIndex:
+    """Read-only view over a built index; lookups are binary searches over mmapped records."""
+
+    def __init__(self, index_dir: str = INDEX_DIR):
+        with open(os.path.join(index_dir, "meta.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported IMDb index version: {self.meta.get('version')} (rebuild it)")
+        self.index_dir = index_dir
+        self.title_types = self.meta["title_types"]
+        self.built_at = self.meta.get("built_at") or 0
+        self._age_warned = False
+        self._episodes = self._map(os.path.join(index_dir, "episodes.bin"))
+        self._titles = self._map(os.path.join(index_dir, "titles.bin"))
+
+    @staticmethod
+    def _map(path: str):
+        f = open(path, "rb")
+        if os.fstat(f.fileno()).st_size == 0:
+            f.close()
+            return b""
+        m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        f.close()
+        return m
+
+    @staticmethod
+    def _lower_bound(buf, record: struct.Struct, key: int) -> int:
+        """First record index whose leading field is >= key."""
+        lo, hi = 0, len(buf) // record.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if struct.unpack_from("<I", buf, mid * record.size)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def episodes(self, series_id: str) -> list[dict]:
+        """Episodes of a series as [{season, episode, episode_id}], sorted; [] if unknown."""
+        parent = _tconst_num((series_id or "").lower())
+        if parent is None:
+            return []
+        size = EPISODE_RECORD.size
+        i = self._lower_bound(self._episodes, EPISODE_RECORD, parent)
+        out = []
+        n = len(self._episodes) // size
+        while i < n:
+            p, season, episode, tconst = EPISODE_RECORD.unpack_from(self._episodes, i * size)
+            if p != parent:
+                break
+            out.append({"season": season, "episode": episode, "episode_id": _format_tconst(tconst)})
+            i += 1
+        return out
+
+    def is_older_than(self, max_age_days) -> bool:
+        """True if the index was built more than max_age_days ago (never for 0/None); warns once."""
+        if not max_age_days:
+            return False
+        age_days = (time.time() - self.built_at) / 86400
+        if age_days <= max_age_days:
+            return False
+        if not self._age_warned:
+            self._age_warned = True
+            print(f"[WARN] IMDb index in {self.index_dir} is {age_days:.0f} days old; running series are "
+                  f"fetched live until it is rebuilt from fresh dumps.")
+        return True
+
+    def title_info(self, tconst: str):
+        """(titleType, startYear or None, endYear or None) for a tt..., or None if not in the index."""
+        num = _tconst_num((tconst or "").lower())
+        if num is None:
+            return None
+        i = self._lower_bound(self._titles, TITLE_RECORD, num)
+        if i * TITLE_RECORD.size >= len(self._titles):
+            return None
+        t, code, year, end_year = TITLE_RECORD.unpack_from(self._titles, i * TITLE_RECORD.size)
+        if t != num:
+            return None
+        return self.title_types[code], (year or None), (end_year or None)
+
+
+def load_index(index_dir: str = INDEX_DIR):
+    """Shared DatasetIndex for index_dir, or None if no index has been built there."""
+    global _index
+    with _index_lock:
+        if _index is not None and _index[0] == index_dir:
+            return _index[1]
+        if not os.path.exists(os.path.join(index_dir, "meta.json")):
+            return None
+        try:
+            idx = DatasetIndex(index_dir)
+        except Exception as e:
+            print(f"[WARN] Could not open IMDb index in {index_dir}: {e}")
+            idx = None
+        # Remembered even when unusable so the warning is printed once
+        _index = (index_dir, idx)
+        return idx
+
+
+def load_title_index(index_dir: str = INDEX_DIR):
+    """Shared TrigramIndex of series/movie titles (payload [tconst num, year, type]), or None."""
+    global _title_index
+    with _index_lock:
+        if _title_index is not None and _title_index[0] == index_dir:
+            return _title_index[1]
+        try:
+            idx = TrigramIndex.load(os.path.join(index_dir, "titles_trigram"))
+        except Exception as e:
+            print(f"[WARN] Could not open IMDb title index in {index_dir}: {e}")
+            idx = None
+        if idx is None and os.path.exists(os.path.join(index_dir, "titles_trigram.json")):
+            print(f"[WARN] IMDb title index in {index_dir} is from an older version; rebuild it to resolve titles offline.")
+            # Remembered so the warning is printed once
+            _title_index = (index_dir, None)
+        if idx is not None:
+            _title_index = (index_dir, idx)
+        return idx
+
+
+def search_titles(query: str, types=None, limit: int = 10, index_dir: str = INDEX_DIR):
+    """Offline fuzzy title search: [(tt..., year or None, type, score)] best first."""
+    idx = load_title_index(index_dir)
+    if idx is None:
+        return []
+    out = []
+    for pos, score in idx.search(query, limit=limit * 5 if types else limit):
+        t, year, ttype = idx.payloads[pos]
+        if types and ttype not in types:
+            continue
+        out.append((_format_tconst(t), year or None, ttype, score))
+    return out[:limit]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query the offline IMDb dataset index.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    b = sub.add_parser("build", help="Build the index from IMDb TSV dumps (.tsv or .tsv.gz)")
+    b.add_argument("basics", help="title.basics.tsv[.gz]")
+    b.add_argument("episodes", help="title.episode.tsv[.gz]")
+    b.add_argument("--out", default=INDEX_DIR, help=f"Index directory (default: {INDEX_DIR})")
+    e = sub.add_parser("episodes", help="List the indexed episodes of a series")
+    e.add_argument("series_id")
+    e.add_argument("--index", default=INDEX_DIR)
+    s = sub.add_parser("search", help="Fuzzy-search series/movie titles offline")
+    s.add_argument("query")
+    s.add_argument("--index", default=INDEX_DIR)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        build_index(args.basics, args.episodes, args.out)
+        return 0
+    if args.command == "search":
+        started = time.perf_counter()
+        results = search_titles(args.query, index_dir=args.index)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        for tconst, year, ttype, score in results:
+            print(f"{tconst}  {year or '----'}  {ttype:<12}  {score:5.1f}")
+        print(f"[INFO] {len(results)} results in {elapsed_ms:.1f} ms")
+        return 0
+    idx = load_index(args.index)
+    if idx is None:
+        print(f"[ERROR] No IMDb index in {args.index}. Run the build command first.")
+        return 1
+    idx.is_older_than(INDEX_MAX_AGE_DAYS)
+    started = time.perf_counter()
+    eps = idx.episodes(args.series_id)
+    elapsed_us = (time.perf_counter() - started) * 1e6
+    for row in eps:
+        print(f"S{row['season']:02d}E{row['episode']:02d}  {row['episode_id']}")
+    print(f"[INFO] {len(eps)} episodes, {idx.title_info(args.series_id)}, lookup {elapsed_us:.0f} us")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
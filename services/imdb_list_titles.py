@@ -1,6 +1,11 @@
 import re
-import requests
-from bs4 import BeautifulSoup
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from services import http, parse_pool
+from services.database import get_cached_list, save_cached_list
+from services.html_extract import iter_anchors, iter_list_items, iter_tag_text
 
 # Browser-like User-Agent so IMDb returns full HTML (not a minimal JS shell)
 HEADERS = {
@@ -9,47 +14,159 @@ HEADERS = {
     "Accept-Language": "en-US,en;q=0.9",
 }
 
+LIST_PAGE_WORKERS = 4
+# IMDb shows a fixed number of titles per list page
+LIST_PAGE_SIZE = 250
+MAX_LIST_PAGES = 100
+_TITLE_ID = re.compile(r"/title/(tt\d+)(?:/|\?)")
+# Classes of the list's own entries (other <li>s hold navigation and recommendations)
+_LIST_ITEM_CLASSES = ("ipc-metadata-list-summary-item", "lister-item")
+LIST_CACHE_TTL_HOURS = 6
+
+
+def _page_url(url: str, page: int) -> str:
+    """Same list URL with ?page=N set (other query params kept)."""
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query) if k != "page"]
+    if page > 1:
+        query.append(("page", str(page)))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def _text(page) -> str:
+    return page.decode("utf-8", "replace") if isinstance(page, bytes) else page
+
+
+def _ids_from_page(html) -> list:
+    """IMDb IDs of the list's entries in page order (str or raw bytes), duplicates removed."""
+    html = _text(html)
+    items = list(iter_list_items(html))
+    entries = [item for item in items if any(c in item[:300] for c in _LIST_ITEM_CLASSES)] or items
+    # First /title/tt... link of each entry (sidebar and recommendation links are not entries)
+    ids = [m.group(1) for m in (_TITLE_ID.search(item) for item in entries) if m]
+    if not ids:
+        # Layouts without <li> entries: every title link on the page
+        ids = _TITLE_ID.findall(html)
+    return list(dict.fromkeys(ids))
+
+
+def _list_total(html: str) -> int | None:
+    """The list's title count as shown on the page, if any."""
+    total = re.search(r"([\d,]+)\s+titles", html) or re.search(r'"total"\s*:\s*(\d+)', html)
+    return int(total.group(1).replace(",", "")) if total else None
+
+
+def _page_count(html: str, total: int | None) -> int:
+    """Number of list pages, from pagination links and/or the list's total title count."""
+    pages = [int(p) for p in re.findall(r"[?&;]page=(\d+)", html)]
+    count = max(pages) if pages else 1
+    if total:
+        count = max(count, -(-total // LIST_PAGE_SIZE))
+    return min(count, MAX_LIST_PAGES)
+
+
+def _first_page(page) -> tuple:
+    """(IDs, page count, total titles or None) from the raw first page."""
+    html = _text(page)
+    total = _list_total(html)
+    return _ids_from_page(html), _page_count(html, total), total
+
+
+def _fetch_page(url: str, page: int) -> bytes:
+    r = http.get(_page_url(url, page), headers=HEADERS, timeout=20)
+    r.raise_for_status()
+    return r.content
+
+
+def _fetch_page_ids(url: str, page: int) -> list:
+    # Parsed on a worker process when the parse pool is on (services.parse_pool)
+    return parse_pool.call(_ids_from_page, _fetch_page(url, page))
+
+
+def iter_imdb_ids_from_list(url: str, ttl_hours: float = LIST_CACHE_TTL_HOURS, max_workers: int = LIST_PAGE_WORKERS,
+                            status: dict = None):
+    """
+    Yield IMDb IDs (tt...) from every page of a list, in list order, as pages arrive.
+    Page 1 is read first to find the page count; the rest are fetched concurrently.
+    Complete results are cached for ttl_hours.
+    status, if given, receives "complete": False when a page could not be read
+    (the IDs yielded are then partial, or a stale cached copy).
+    """
+    status = {} if status is None else status
+    status["complete"] = False
+    url = url.strip()
+    cached, fetched_at = get_cached_list(url)
+    if cached and time.time() - fetched_at < ttl_hours * 3600:
+        yield from cached
+        status["complete"] = True
+        return
 
-def extract_imdb_ids_from_list(url: str):
-    """Extract IMDb IDs (tt...) directly from a list page. Most reliable method."""
     try:
-        r = requests.get(url.strip(), headers=HEADERS, timeout=20)
-        r.raise_for_status()
-        html = r.text
-        # Match /title/tt1234567/ or /title/tt1234567? in the page
-        ids = re.findall(r"/title/(tt\d+)(?:/|\?)", html)
-        # Preserve order, remove duplicates
-        seen = set()
-        unique = []
-        for i in ids:
-            if i not in seen:
-                seen.add(i)
-                unique.append(i)
-        return unique
+        first_ids, pages, total = parse_pool.call(_first_page, _fetch_page(url, 1))
     except Exception as e:
         print("IMDb list ID parse error:", e)
-        return []
+        if cached:
+            yield from cached
+        return
+
+    if total and total > pages * LIST_PAGE_SIZE:
+        print(f"[WARN] IMDb list has {total} titles; reading only the first {pages} pages.")
+    seen = set()
+    collected = []
+    for i in first_ids:
+        seen.add(i)
+        collected.append(i)
+        yield i
+
+    complete = True
+    if pages > 1:
+        print(f"[INFO] IMDb list has {pages} pages, fetching...")
+        pool = ThreadPoolExecutor(max_workers=max(1, max_workers))
+        try:
+            futures = [pool.submit(_fetch_page_ids, url, page) for page in range(2, pages + 1)]
+            for page, fut in enumerate(futures, start=2):
+                try:
+                    page_ids = fut.result()
+                except Exception as e:
+                    print(f"IMDb list page {page} error:", e)
+                    complete = False
+                    continue
+                new_ids = [i for i in page_ids if i not in seen]
+                if not new_ids:
+                    # Past the real end of the list (page count overestimated)
+                    break
+                for i in new_ids:
+                    seen.add(i)
+                    collected.append(i)
+                    yield i
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    if complete and total and len(collected) < total and pages < MAX_LIST_PAGES:
+        print(f"[WARN] IMDb list shows {total} titles but only {len(collected)} were read; not caching it.")
+        complete = False
+    if complete and collected:
+        save_cached_list(url, collected)
+    status["complete"] = complete
 
 
 def extract_titles_from_list(url: str):
     """Extract movie titles from list page (fallback when IDs not used)."""
     try:
-        r = requests.get(url.strip(), headers=HEADERS, timeout=20)
+        r = http.get(url.strip(), headers=HEADERS, timeout=20)
         r.raise_for_status()
-        soup = BeautifulSoup(r.text, "lxml")
+        page = r.content
 
         titles = []
 
         # Method 1: List item title anchors
-        for a in soup.select("a[href^='/title/tt']"):
-            text = a.get_text(strip=True)
+        for _, text in iter_anchors(page, href_prefix="/title/tt"):
             if text and len(text) < 120:
                 titles.append(text)
 
         # Method 2: Fallback - h3 tags
         if not titles:
-            for h3 in soup.find_all("h3"):
-                text = h3.get_text(strip=True)
+            for text in iter_tag_text(page, "h3"):
                 if text and len(text) < 120:
                     titles.append(text)
 
@@ -1,33 +1,137 @@
 import requests
-from bs4 import BeautifulSoup
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 
+from services import http
+from services.database import get_title_id, save_title_id
+from services.imdb_dataset import INDEX_DIR, search_titles
+from services.html_extract import first_anchor, iter_list_items, section_by_testid
+
+IMDB_URL = http.base_url("IMDB", "https://www.imdb.com")
 HEADERS = {
     "User-Agent": "Mozilla/5.0"
 }
 
-def search_imdb_id(title: str):
-    try:
-        url = f"https://www.imdb.com/find?q={requests.utils.quote(title)}&s=all"
-        r = requests.get(url, headers=HEADERS, timeout=15)
-        soup = BeautifulSoup(r.text, "lxml")
+RESOLVER_WORKERS = 4
+# "Not found" answers are retried after this long; found IDs never expire,
+# except live answers for titles the offline index finds ambiguous (no year given)
+NEGATIVE_TTL_HOURS = 72
+AMBIGUOUS_TTL_HOURS = 24 * 7
+# Offline (dataset index) matches must score at least this to be trusted
+OFFLINE_MIN_SCORE = 90
+MOVIE_TYPES = ("movie", "tvMovie")
 
-        # IMDb search result rows
-        results = soup.select("section[data-testid='find-results-section-title'] li")
 
-        for item in results:
-            link = item.find("a", href=True)
-            if not link:
-                continue
+def _search(title: str):
+    """Live IMDb search. Returns tt... or None if no title result; raises on HTTP errors."""
+    url = f"{IMDB_URL}/find?q={requests.utils.quote(title)}&s=all"
+    r = http.get(url, headers=HEADERS, timeout=15)
+    r.raise_for_status()
+    section = section_by_testid(r.content, "find-results-section-title")
+    if section is None:
+        return None
 
-            href = link["href"]
+    # IMDb search result rows
+    for item in iter_list_items(section):
+        link = first_anchor(item)
+        if not link:
+            continue
 
-            if "/title/" in href:
-                match = re.search(r"/title/(tt\d+)", href)
-                if match:
-                    return match.group(1)
+        href = link[0]
 
-    except Exception:
-        pass
+        if "/title/" in href:
+            match = re.search(r"/title/(tt\d+)", href)
+            if match:
+                return match.group(1)
 
     return None
+
+
+def parse_imdb_id(text: str):
+    """tt... from a raw ID or IMDb URL, else None."""
+    m = re.search(r"(tt\d{7,})", text or "", re.I)
+    return m.group(1).lower() if m else None
+
+
+def normalize_title(title: str) -> str:
+    t = (title or "").lower().strip()
+    t = t.replace("&", " and ")
+    t = re.sub(r"[^\w\s]", " ", t)
+    return re.sub(r"\s+", " ", t).strip()
+
+
+def split_title_year(text: str):
+    """'The Matrix (1999)' / 'The Matrix 1999' -> ('The Matrix', 1999); no year -> (text, None)."""
+    text = (text or "").strip()
+    m = re.match(r"^(.*?)[\s.]*[(\[]?((?:19|20)\d{2})[)\]]?$", text)
+    if m and m.group(1).strip():
+        return m.group(1).strip(), int(m.group(2))
+    return text, None
+
+
+def offline_matches(title: str, year=None, types=MOVIE_TYPES, index_dir: str = INDEX_DIR) -> list:
+    """
+    tt... IDs from the offline dataset index (services.imdb_dataset) scoring at least
+    OFFLINE_MIN_SCORE, best first; a given year must match within 1. [] without an index.
+    """
+    out = []
+    for tconst, found_year, _, score in search_titles(title, types=types, limit=20, index_dir=index_dir):
+        if score < OFFLINE_MIN_SCORE:
+            break
+        if year is None or (found_year and abs(found_year - year) <= 1):
+            out.append(tconst)
+    return out
+
+
+def resolve_imdb_id(text: str, negative_ttl_hours: float = NEGATIVE_TTL_HOURS, index_dir: str = INDEX_DIR):
+    """
+    Title (optionally with year) -> tt..., via the persistent resolver cache, then
+    a confident offline dataset index match, then a live IMDb search.
+    Raw IDs/URLs are returned as-is. Lookup errors are not cached.
+    """
+    imdb_id = parse_imdb_id(text)
+    if imdb_id:
+        return imdb_id
+    title, year = split_title_year(text)
+    norm = normalize_title(title)
+    if not norm:
+        return None
+    cached = get_title_id(norm, year or 0)
+    now = time.time()
+    if cached is not None:
+        cached_id, resolved_at, expires_at = cached
+        if expires_at is not None:
+            if now < expires_at:
+                return cached_id
+        elif cached_id or now - resolved_at < negative_ttl_hours * 3600:
+            return cached_id
+    matches = offline_matches(title, year, index_dir=index_dir)
+    # Trusted with a year, or without one only if there is a single candidate
+    # ("Dune" or "Home" alone name several films; those go to the live search)
+    if matches and (year is not None or len(matches) == 1):
+        save_title_id(norm, year or 0, matches[0])
+        return matches[0]
+    try:
+        imdb_id = _search(f"{title} {year}" if year else title)
+    except Exception as e:
+        print(f"[WARN] IMDb search failed for '{text}': {e}")
+        return None
+    # Several offline candidates: IMDb's top hit may change (a remake, a new release)
+    expires_at = now + AMBIGUOUS_TTL_HOURS * 3600 if len(matches) > 1 and imdb_id else None
+    save_title_id(norm, year or 0, imdb_id, expires_at)
+    return imdb_id
+
+
+def resolve_imdb_ids(texts, max_workers: int = RESOLVER_WORKERS, negative_ttl_hours: float = NEGATIVE_TTL_HOURS,
+                     index_dir: str = INDEX_DIR):
+    """
+    Resolve many titles, concurrently for cache misses. Returns resolved tt... IDs
+    in input order (unresolved titles are dropped).
+    """
+    texts = [t for t in texts if t and t.strip()]
+    if not texts:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        results = pool.map(lambda t: resolve_imdb_id(t, negative_ttl_hours, index_dir), texts)
+        return [r for r in results if r]
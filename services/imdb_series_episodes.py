@@ -1,11 +1,35 @@
 """
-Fetch all episode IDs for an IMDb TV series by scraping the series episode pages.
-No TSV/dataset files required.
+Fetch all episode IDs for an IMDb TV series. Uses the offline dataset index
+(services.imdb_dataset) when one is built and knows the series, unless the index is
+old and the series was still running when it was built; otherwise scrapes the
+series episode pages. Season pages are fetched concurrently (politeness
+limits live in services.http) and parsed lists are cached in the database.
+Finished series (an end year on the episodes page, or a latest episode that
+aired long ago) are refreshed rarely and their last season is not re-fetched.
 """
+import datetime
 import re
-import requests
 import time
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+
+from services import http, parse_pool
+from services.html_extract import iter_anchors
+from services.database import get_cached_episodes, save_series_episodes
+from services.imdb_dataset import INDEX_DIR, INDEX_MAX_AGE_DAYS, load_index
+
+IMDB_URL = http.base_url("IMDB", "https://www.imdb.com")
+SEASON_WORKERS = 4
+# Cached episode lists older than this are refreshed (latest season(s) only)
+EPISODE_CACHE_TTL_HOURS = 24
+# Finished series are refreshed this rarely (only to notice a revival)
+ENDED_CACHE_TTL_HOURS = 24 * 30
+# A series whose latest episode aired longer ago than this counts as finished
+ENDED_AFTER_DAYS = 365
+_MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+# Episode air dates as shown on season pages, e.g. "Sun, Sep 29, 2013"
+_AIR_DATE = re.compile(r"\b(?:Mon|Tue|Wed|Thu|Fri|Sat|Sun), (" + "|".join(_MONTHS) + r") (\d{1,2}), (\d{4})\b")
+# Page title of a finished series, e.g. "Breaking Bad (TV Series 2008–2013) - Episode list - IMDb"
+_YEAR_RANGE = re.compile(r"<title>[^<]*?\b\d{4}\s*(?:–|-|&ndash;|&#8211;)\s*(\d{4})\b[^<]*</title>", re.I)
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
@@ -27,73 +51,149 @@ def _extract_series_id(series_input: str) -> str | None:
     return get_series_id(series_input)
 
 
-def _get_season_numbers(series_id: str) -> list[int]:
-    """Fetch main episodes page and parse season links (e.g. ?season=1)."""
-    url = f"https://www.imdb.com/title/{series_id}/episodes"
+def _get_season_listing(series_id: str) -> tuple | None:
+    """Fetch main episodes page: (season numbers from ?season=N links, end year or None). None on error."""
+    url = f"{IMDB_URL}/title/{series_id}/episodes"
     try:
-        r = requests.get(url, headers=HEADERS, timeout=20)
+        r = http.get(url, headers=HEADERS, timeout=20)
         r.raise_for_status()
-        # Links like /title/tt0944947/episodes?season=1
-        seasons = re.findall(r"[?&]season=(\d+)", r.text)
-        nums = sorted(set(int(x) for x in seasons if x.isdigit()))
-        return nums if nums else [1]  # default to season 1 if none found
+        return _parse_season_numbers(r.text), _parse_end_year(r.text)
     except Exception:
-        return [1]
+        return None
+
+
+def _parse_end_year(html: str) -> int | None:
+    m = _YEAR_RANGE.search(html)
+    return int(m.group(1)) if m else None
+
+
+def _parse_season_numbers(html: str) -> list[int]:
+    # Links like /title/tt0944947/episodes?season=1
+    seasons = re.findall(r"[?&]season=(\d+)", html)
+    nums = sorted(set(int(x) for x in seasons if x.isdigit()))
+    return nums if nums else [1]  # default to season 1 if none found
+
 
+def _parse_episodes_from_season_page(html) -> list[dict]:
+    """Parse one season page (str or raw bytes): (season, episode, episode_id)."""
+    return _episode_rows(_episode_records(html))
 
-def _parse_episodes_from_season_page(html: str) -> list[dict]:
-    """Parse one season page: (season, episode, episode_id)."""
-    soup = BeautifulSoup(html, "lxml")
+
+def _episode_rows(records) -> list[dict]:
+    return [{"season": s, "episode": e, "episode_id": ep_id} for s, e, ep_id in records]
+
+
+def _episode_records(html) -> list[tuple]:
+    """(season, episode, episode_id) tuples: the compact form returned by parse workers."""
     out = []
     # Episode links have ref_=ttep_ep in href; link text often "S1.E1 ∙ Title"
-    for a in soup.find_all("a", href=True):
-        href = a.get("href", "")
-        if "ttep_ep" not in href:
-            continue
+    for href, text in iter_anchors(html, href_contains="ttep_ep"):
         m = re.search(r"/title/(tt\d+)(?:/|\?)", href)
         if not m:
             continue
         ep_id = m.group(1).lower()
-        text = a.get_text(strip=True) or ""
         se = re.search(r"S(\d{1,2})\.E(\d{1,3})\b", text, re.I)
         if not se:
             continue
-        season_num = int(se.group(1))
-        ep_num = int(se.group(2))
-        out.append({"season": season_num, "episode": ep_num, "episode_id": ep_id})
+        out.append((int(se.group(1)), int(se.group(2)), ep_id))
     return out
 
 
-def get_all_episodes(series_input: str) -> list[dict]:
+def _season_records(html) -> tuple:
+    """(episode records, latest air date as (year, month, day) or None) of one season page."""
+    text = html.decode("utf-8", "replace") if isinstance(html, bytes) else html
+    dates = [(int(y), _MONTHS.index(mon) + 1, int(d)) for mon, d, y in _AIR_DATE.findall(text)]
+    return _episode_records(text), max(dates, default=None)
+
+
+def _fetch_season(series_id: str, season: int) -> tuple | None:
+    """Fetch and parse one season page: (rows, latest air date or None). None on error (so it is not cached as empty)."""
+    url = f"{IMDB_URL}/title/{series_id}/episodes?season={season}"
+    try:
+        r = http.get(url, headers=HEADERS, timeout=20)
+        r.raise_for_status()
+        # Parsed on a worker process when the parse pool is on (services.parse_pool)
+        records, last_aired = parse_pool.call(_season_records, r.content)
+        return _episode_rows(records), last_aired
+    except Exception as e:
+        print("IMDb series page error:", e)
+        return None
+
+
+def _index_is_current(index, series_id: str, max_age_days) -> bool:
+    """False if the index is older than max_age_days and the series had no end year when it was built."""
+    if not index.is_older_than(max_age_days):
+        return True
+    info = index.title_info(series_id)
+    return info is not None and info[2] is not None
+
+
+def get_all_episodes(series_input: str, ttl_hours: float = EPISODE_CACHE_TTL_HOURS, index_dir: str = INDEX_DIR,
+                     index_max_age_days: float = INDEX_MAX_AGE_DAYS) -> list[dict]:
     """
     Get all episodes for a series. Returns list of
     { "season": int, "episode": int, "episode_id": "tt..." }.
     series_input: IMDb series ID (tt0944947) or full series URL.
+    ttl_hours: serve the cached list if younger than this; when stale, only the
+    latest cached season and any new seasons are re-fetched (finished series:
+    ENDED_CACHE_TTL_HOURS, and only new seasons).
+    index_dir: offline dataset index consulted first (no network) if it exists.
+    index_max_age_days: past this age the index is only trusted for finished series;
+    running ones go through the cache / live fetch (the index list is the fallback).
     """
     series_id = _extract_series_id(series_input)
     if not series_id:
         return []
 
-    seasons = _get_season_numbers(series_id)
-    all_eps = []
-    seen = set()
-
-    for season in seasons:
-        time.sleep(1.0) # Be polite to IMDb and save CPU
-        url = f"https://www.imdb.com/title/{series_id}/episodes?season={season}"
-        try:
-            r = requests.get(url, headers=HEADERS, timeout=20)
-            r.raise_for_status()
-            for row in _parse_episodes_from_season_page(r.text):
-                key = (row["season"], row["episode"], row["episode_id"])
-                if key not in seen:
-                    seen.add(key)
-                    all_eps.append(row)
-        except Exception as e:
-            print("IMDb series page error:", e)
+    index_eps = []
+    index = load_index(index_dir)
+    if index is not None:
+        index_eps = index.episodes(series_id)
+        if index_eps and _index_is_current(index, series_id, index_max_age_days):
+            return index_eps
+
+    cached, fetched_at, ended = get_cached_episodes(series_id)
+    if cached and time.time() - fetched_at < (ENDED_CACHE_TTL_HOURS if ended else ttl_hours) * 3600:
+        return cached
+
+    listing = _get_season_listing(series_id)
+    if listing is None:
+        if cached or index_eps:
+            return cached or index_eps
+        seasons = [1]
+    else:
+        seasons, end_year = listing
+        ended = end_year is not None
+    last_season = max(seasons)
+    if cached:
+        latest = max(r["season"] for r in cached)
+        # A finished series' latest cached season is complete; only seasons added since are fetched
+        seasons = [s for s in seasons if s > latest or (s == latest and not ended)]
+
+    pages = []
+    if seasons:
+        with ThreadPoolExecutor(max_workers=SEASON_WORKERS) as pool:
+            pages = list(pool.map(lambda season: _fetch_season(series_id, season), seasons))
+
+    fetched = {}
+    fetched_seasons = []
+    cutoff = datetime.date.today() - datetime.timedelta(days=ENDED_AFTER_DAYS)
+    for season, page in zip(seasons, pages):
+        if page is None:
             continue
-
+        rows, last_aired = page
+        fetched_seasons.append(season)
+        for row in rows:
+            fetched[(row["season"], row["episode"])] = row
+        if season == last_season and last_aired and datetime.date(*last_aired) < cutoff:
+            ended = True
+    if fetched_seasons or not seasons:
+        save_series_episodes(series_id, list(fetched.values()), fetched_seasons, ended)
+
+    merged = {(r["season"], r["episode"]): r for r in (cached or [])}
+    for season in fetched_seasons:
+        merged = {k: v for k, v in merged.items() if k[0] != season}
+    merged.update(fetched)
+    all_eps = list(merged.values())
     all_eps.sort(key=lambda x: (x["season"], x["episode"]))
-    return all_eps
-
-
+    return all_eps or index_eps
@@ -0,0 +1,48 @@
+"""
+Rotating log file written on a background thread. Console-style text (print
+fragments) is split into lines and handed to a QueueHandler; a QueueListener
+thread does the file I/O, so writers never block on disk.
+"""
+import logging
+import logging.handlers
+import queue
+import threading
+
+LOG_FILE = "cachewarmer.log"
+LOG_MAX_MB = 5
+LOG_BACKUPS = 3
+
+
+class LineLog:
+    """Collects text fragments into lines and logs each complete line to a rotating file."""
+
+    def __init__(self, path: str = LOG_FILE, max_mb: float = LOG_MAX_MB, backups: int = LOG_BACKUPS):
+        handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=int(max_mb * 1024 * 1024), backupCount=backups, encoding="utf-8", delay=True
+        )
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        self._queue = queue.SimpleQueue()
+        self._listener = logging.handlers.QueueListener(self._queue, handler)
+        self._logger = logging.getLogger(f"cachewarmer.file.{id(self)}")
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+        self._logger.addHandler(logging.handlers.QueueHandler(self._queue))
+        self._partial = ""
+        self._lock = threading.Lock()
+        self._listener.start()
+
+    def write(self, text: str):
+        with self._lock:
+            lines = (self._partial + text).split("\n")
+            self._partial = lines.pop()
+        for line in lines:
+            if line.strip():
+                self._logger.info(line.rstrip("\r"))
+
+    def close(self):
+        """Flush the pending partial line and stop the writer thread."""
+        with self._lock:
+            rest, self._partial = self._partial, ""
+        if rest.strip():
+            self._logger.info(rest)
+        self._listener.stop()
@@ -0,0 +1,156 @@
+"""
+Optional process pool for the CPU-heavy parsing: IMDb season and list pages
+(raw bytes in, compact tuples out) and stream title classification (batches of
+titles in, one tuple per title out). Without it that work shares one GIL with
+every other thread; with it, parsing throughput scales with cores.
+
+Config: "parse_workers" (0 = parse inline, the default; "auto" = one per CPU
+core but one), "parse_chunk_size" (titles per task) and "parse_min_titles" /
+"parse_min_bytes": smaller batches and pages are parsed inline, where they cost
+less than the round trip to a worker. The title threshold (16) is low enough that
+one item's Torrentio results (a few dozen titles with the default
+torrentio_limit) already go to the workers. TASKS counts work sent to
+the pool (see benchmarks/bench.py).
+Workers are started with spawn (as on Windows) when first needed, so entry
+scripts must be guarded by `if __name__ == "__main__"` and call
+multiprocessing.freeze_support(). If the pool breaks, parsing falls back to
+inline for the rest of the run.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from services.filters import classify_title
+
+PARSE_WORKERS = 0
+PARSE_CHUNK_SIZE = 32
+# Work smaller than this stays inline
+PARSE_MIN_TITLES = 16
+PARSE_MIN_BYTES = 64 * 1024
+# classify_title() fields, in the order of a classify record
+CLASSIFY_FIELDS = ("blacklisted", "seeders", "resolution", "size", "large_pack", "seasons", "season_pack")
+
+_lock = threading.Lock()
+_pool = None
+# Tasks submitted to the pool since start
+TASKS = 0
+
+
+def configure(workers=PARSE_WORKERS, chunk_size: int = PARSE_CHUNK_SIZE,
+              min_titles: int = PARSE_MIN_TITLES, min_bytes: int = PARSE_MIN_BYTES):
+    """Worker processes (0 = inline, "auto" = CPU cores - 1), titles per classify task and the pool thresholds."""
+    global PARSE_WORKERS, PARSE_CHUNK_SIZE, PARSE_MIN_TITLES, PARSE_MIN_BYTES
+    if workers == "auto":
+        workers = (os.cpu_count() or 2) - 1
+    workers = max(0, int(workers or 0))
+    with _lock:
+        if workers != PARSE_WORKERS:
+            _shutdown_locked()
+        PARSE_WORKERS = workers
+        PARSE_CHUNK_SIZE = max(1, int(chunk_size or PARSE_CHUNK_SIZE))
+        PARSE_MIN_TITLES = max(1, int(min_titles))
+        PARSE_MIN_BYTES = max(0, int(min_bytes))
+
+
+def enabled(titles: int = None) -> bool:
+    """Pool on (and, given a batch size, worth using for that many titles)."""
+    return PARSE_WORKERS > 0 and (titles is None or titles >= PARSE_MIN_TITLES)
+
+
+def shutdown():
+    with _lock:
+        _shutdown_locked()
+
+
+def _shutdown_locked():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _get_pool():
+    global _pool
+    with _lock:
+        if _pool is None and PARSE_WORKERS > 0:
+            _pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+            print(f"[INFO] Parsing on {PARSE_WORKERS} worker process(es)")
+        return _pool
+
+
+def _count(tasks: int):
+    global TASKS
+    with _lock:
+        TASKS += tasks
+
+
+def _broken(e):
+    global PARSE_WORKERS
+    print(f"[WARN] Parse worker pool failed ({e}); parsing inline from now on.")
+    with _lock:
+        _shutdown_locked()
+        PARSE_WORKERS = 0
+
+
+def call(fn, page):
+    """fn(page) on a worker process (fn must be a module-level function), or inline for small pages."""
+    pool = _get_pool() if len(page) >= PARSE_MIN_BYTES else None
+    if pool is None:
+        return fn(page)
+    _count(1)
+    try:
+        return pool.submit(fn, page).result()
+    except BrokenProcessPool as e:
+        _broken(e)
+        return fn(page)
+
+
+def classify_records(titles) -> list:
+    """One classify record (a tuple in CLASSIFY_FIELDS order) per title. Runs on a worker."""
+    out = []
+    for title in titles:
+        parsed = classify_title(title)
+        out.append(tuple(parsed[field] for field in CLASSIFY_FIELDS))
+    return out
+
+
+def _chunks(titles: list) -> list:
+    size = PARSE_CHUNK_SIZE
+    return [titles[i:i + size] for i in range(0, len(titles), size)]
+
+
+def _expand(chunks) -> list:
+    return [dict(zip(CLASSIFY_FIELDS, record)) for chunk in chunks for record in chunk]
+
+
+def classify_titles(titles) -> list:
+    """classify_title() for each title, in order; chunks of parse_chunk_size run in parallel."""
+    titles = list(titles)
+    pool = _get_pool() if enabled(len(titles)) else None
+    if pool is None:
+        return [classify_title(title) for title in titles]
+    chunks = _chunks(titles)
+    _count(len(chunks))
+    try:
+        return _expand(pool.map(classify_records, chunks))
+    except BrokenProcessPool as e:
+        _broken(e)
+        return [classify_title(title) for title in titles]
+
+
+async def classify_titles_async(titles) -> list:
+    titles = list(titles)
+    pool = _get_pool() if enabled(len(titles)) else None
+    if pool is None:
+        return [classify_title(title) for title in titles]
+    chunks = _chunks(titles)
+    _count(len(chunks))
+    try:
+        futures = [asyncio.wrap_future(pool.submit(classify_records, chunk)) for chunk in chunks]
+        return _expand(await asyncio.gather(*futures))
+    except BrokenProcessPool as e:
+        _broken(e)
+        return [classify_title(title) for title in titles]
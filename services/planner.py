@@ -0,0 +1,78 @@
+"""
+Series planning: group episode jobs per season and decide when a season is done,
+so satisfied seasons don't cost one Torrentio/RD round-trip per remaining episode.
+
+Source diffing: compare a fetched list/catalog with its stored snapshot so repeat
+passes only process new items plus unchanged ones that are due for a re-check.
+"""
+import time
+
+from services.database import has_cached_quality, get_source_snapshot, save_source_snapshot
+
+
+def group_episode_jobs(episode_jobs):
+    """
+    Group (series_id, season, episode) jobs into season groups, keeping input order.
+    Returns list of (series_id, season, [episode, ...]).
+    """
+    groups = {}
+    for series_id, season, episode in episode_jobs:
+        groups.setdefault((series_id, season), []).append(episode)
+    return [(series_id, season, eps) for (series_id, season), eps in groups.items()]
+
+
+def season_targets(config: dict, available) -> list:
+    """
+    Resolutions a season must be cached at before its remaining episodes are skipped.
+    Uses config "target_resolutions" when set, else the resolutions seen in probe results.
+    """
+    explicit = config.get("target_resolutions")
+    if explicit:
+        return sorted(int(r) for r in explicit)
+    return sorted(available)
+
+
+def season_satisfied(series_id: str, season: int, targets) -> bool:
+    """True if the season is already cached at every target resolution."""
+    if not targets:
+        return False
+    return all(has_cached_quality(series_id, r, season) for r in targets)
+
+
+def iter_source_diff(source: str, items, recheck_hours: float, stats: dict = None, read_status: dict = None):
+    """
+    Stream a source's items [(item_id, kind)] against its stored snapshot, yielding
+    (item, is_new) for new items and for unchanged items not processed within
+    recheck_hours (0 = always due), in source order. Duplicates are dropped.
+    New items are stored as they are seen; removed ones are dropped once the source
+    is exhausted, unless it was interrupted or read_status (filled in by the source
+    reader) says the read was not complete: a failed or partial fetch would otherwise
+    drop the missing items and bring them back as new on the next good read.
+    stats, if given, receives added/due/removed/unchanged counts.
+    """
+    snapshot = get_source_snapshot(source)
+    cutoff = time.time() - recheck_hours * 3600
+    seen = set()
+    added = 0
+    due = 0
+    complete = False
+    try:
+        for item in items:
+            if item[0] in seen:
+                continue
+            seen.add(item[0])
+            if item[0] not in snapshot:
+                # Stored before it is yielded so processing can mark it checked
+                save_source_snapshot(source, [item], [])
+                added += 1
+                yield item, True
+            elif snapshot[item[0]][2] <= cutoff:
+                due += 1
+                yield item, False
+        complete = read_status is None or read_status.get("complete", False)
+    finally:
+        removed = [item_id for item_id in snapshot if item_id not in seen] if complete else []
+        save_source_snapshot(source, [], removed)
+        if stats is not None:
+            stats.update(added=added, due=due, removed=len(removed),
+                         unchanged=len(seen) - added - due)
@@ -1,6 +1,48 @@
-import requests
+import asyncio
+import time
 
-BASE_URL = "https://api.real-debrid.com/rest/1.0"
+from services import http
+
+BASE_URL = http.base_url("RD", "https://api.real-debrid.com/rest/1.0")
+# Rate-limited (429) answers, and server errors on GETs, are retried, waiting
+# Retry-After or RETRY_BACKOFF seconds doubled per attempt. A POST that got a 5xx
+# may still have been applied (addMagnet), so it fails and the item is retried
+# next pass. The request rate itself is capped in services.http (HOST_RATES,
+# config "rd_requests_per_minute").
+RETRIES = 3
+RETRY_BACKOFF = 1.0
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+
+def _should_retry(method: str, response) -> bool:
+    status = response.status_code
+    return status == 429 or (method == "GET" and status in RETRY_STATUS)
+
+
+def _retry_delay(response, attempt: int) -> float:
+    try:
+        return max(0.0, float(response.headers.get("Retry-After")))
+    except (TypeError, ValueError):
+        return RETRY_BACKOFF * 2 ** attempt
+
+
+def _request(method: str, url: str, api_key: str, **kwargs):
+    """RD API request, retried with backoff while the answer is 429 (or 5xx for a GET)."""
+    headers = {"Authorization": f"Bearer {api_key}"}
+    for attempt in range(RETRIES + 1):
+        response = http.request(method, url, headers=headers, **kwargs)
+        if not _should_retry(method, response) or attempt == RETRIES:
+            return response
+        time.sleep(_retry_delay(response, attempt))
+
+
+async def _request_async(client, method: str, url: str, api_key: str, **kwargs):
+    headers = {"Authorization": f"Bearer {api_key}"}
+    for attempt in range(RETRIES + 1):
+        response = await client.request(method, url, headers=headers, **kwargs)
+        if not _should_retry(method, response) or attempt == RETRIES:
+            return response
+        await asyncio.sleep(_retry_delay(response, attempt))
 
 
 def test_connection(api_key: str) -> bool:
@@ -9,7 +51,7 @@ def test_connection(api_key: str) -> bool:
     }
 
     try:
-        response = requests.get(
+        response = http.get(
             f"{BASE_URL}/user",
             headers=headers,
             timeout=10
@@ -26,36 +68,33 @@ def test_connection(api_key: str) -> bool:
         return False
 
 def is_cached(api_key: str, info_hash: str) -> bool | None:
-    headers = {
-        "Authorization": f"Bearer {api_key}"
-    }
-
+    """True/False, or None when RD could not answer (error status after retries)."""
     url = f"{BASE_URL}/torrents/instantAvailability/{info_hash}"
 
     try:
-        response = requests.get(url, headers=headers, timeout=20)
+        response = _request("GET", url, api_key, timeout=20)
+        response.raise_for_status()
         data = response.json()
 
         return info_hash in data and len(data[info_hash]) > 0
 
+    except http.CircuitOpenError:
+        raise
     except Exception as e:
         print("RD cache check error:", e)
         return None   # UNKNOWN
 
 
 def add_magnet(api_key: str, magnet: str) -> bool:
-    headers = {
-        "Authorization": f"Bearer {api_key}"
-    }
-
     data = {
         "magnet": magnet
     }
 
     try:
-        response = requests.post(
+        response = _request(
+            "POST",
             f"{BASE_URL}/torrents/addMagnet",
-            headers=headers,
+            api_key,
             data=data,
             timeout=10
         )
@@ -66,6 +105,41 @@ def add_magnet(api_key: str, magnet: str) -> bool:
             print("RD add magnet error:", response.text)
             return False
 
+    except http.CircuitOpenError:
+        raise
+    except Exception as e:
+        print("RD add magnet exception:", e)
+        return False
+
+
+# Async variants for the "async" engine; `client` is a services.async_http.AsyncHTTP
+
+
+async def is_cached_async(client, api_key: str, info_hash: str) -> bool | None:
+    url = f"{BASE_URL}/torrents/instantAvailability/{info_hash}"
+    try:
+        response = await _request_async(client, "GET", url, api_key, timeout=20)
+        response.raise_for_status()
+        data = response.json()
+        return info_hash in data and len(data[info_hash]) > 0
+    except http.CircuitOpenError:
+        raise
+    except Exception as e:
+        print("RD cache check error:", e)
+        return None   # UNKNOWN
+
+
+async def add_magnet_async(client, api_key: str, magnet: str) -> bool:
+    try:
+        response = await _request_async(
+            client, "POST", f"{BASE_URL}/torrents/addMagnet", api_key, data={"magnet": magnet}, timeout=10
+        )
+        if response.status_code == 201:
+            return True
+        print("RD add magnet error:", response.text)
+        return False
+    except http.CircuitOpenError:
+        raise
     except Exception as e:
         print("RD add magnet exception:", e)
         return False
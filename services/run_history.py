@@ -0,0 +1,194 @@
+"""
+Per-pass run history: services.app reports each item's streams, candidates,
+RD hits, adds, failures and stage timings to a RunRecorder, which writes one
+`runs` row per pass and compact `run_items` rows (buffered, flushed in batches).
+report() prints trends across recent runs (`python main.py --history`).
+"""
+import statistics
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from services.database import (
+    finish_run, get_outcome_counts, get_recent_runs, get_slowest_items, save_run_items, start_run,
+)
+from services.status import format_duration
+
+# run_items rows buffered before a write
+FLUSH_EVERY = 50
+# A run this much slower (items/min) than the median of the previous ones is flagged
+REGRESSION_RATIO = 0.8
+STAGES = ("fetch", "filter", "rd_check", "rd_add", "wait")
+
+
+class RunRecorder:
+    """
+    Collects one pass at a time. The current item is context-local: one per thread,
+    and one per asyncio task when the async engine runs items concurrently.
+    """
+
+    def __init__(self, mode: str, version: str, flush_every: int = FLUSH_EVERY):
+        self.mode = mode
+        self.version = version
+        self.flush_every = flush_every
+        self.run_id = None
+        self._current = ContextVar("run_item", default=None)
+        self._rows = []
+
+    @property
+    def _item(self):
+        return self._current.get()
+
+    @_item.setter
+    def _item(self, item):
+        self._current.set(item)
+
+    def start_pass(self, number: int):
+        self.run_id = start_run(number, self.mode, self.version)
+        self._started = time.perf_counter()
+        self._rows = []
+        self.totals = {
+            "items": 0, "streams": 0, "candidates": 0, "rd_checks": 0, "cached_hits": 0, "added": 0,
+            "failures": {}, "stages": {stage: 0.0 for stage in STAGES},
+        }
+
+    def start_item(self, item_id: str, season=None):
+        self._item = {
+            "item_id": item_id, "season": season, "started": time.perf_counter(),
+            "streams": 0, "candidates": 0, "rd_checks": 0, "cached_hits": 0, "added": 0,
+            "failures": 0, "error": False, "deferred": False, "stages": dict.fromkeys(STAGES, 0.0),
+        }
+
+    def count(self, field: str, n: int = 1):
+        """Bump streams / candidates / rd_checks / cached_hits / added for the current item and the pass."""
+        if self._item is not None:
+            self._item[field] += n
+        self.totals[field] += n
+
+    def fail(self, reason: str):
+        """Record a failure (rd_unknown, add_failed, fetch_failed, error, deferred, ...)."""
+        if self._item is not None:
+            self._item["failures"] += 1
+            self._item["error"] = self._item["error"] or reason in ("error", "fetch_failed")
+            self._item["deferred"] = self._item["deferred"] or reason == "deferred"
+        self.totals["failures"][reason] = self.totals["failures"].get(reason, 0) + 1
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.totals["stages"][name] += elapsed
+            if self._item is not None:
+                self._item["stages"][name] += elapsed
+
+    @staticmethod
+    def _outcome(item) -> str:
+        if item["error"]:
+            return "error"
+        if item["deferred"]:
+            return "deferred"
+        if item["added"]:
+            return "added"
+        if not item["streams"]:
+            return "no_streams"
+        if not item["candidates"]:
+            return "nothing_new"
+        if item["cached_hits"]:
+            return "already_cached"
+        return "not_added"
+
+    def end_item(self):
+        item, self._item = self._item, None
+        if item is None:
+            return
+        if not item["deferred"]:
+            self.totals["items"] += 1
+        stages = item["stages"]
+        self._rows.append((
+            item["item_id"], item["season"],
+            int((time.perf_counter() - item["started"]) * 1000),
+            int(stages["fetch"] * 1000), int((stages["rd_check"] + stages["rd_add"]) * 1000),
+            item["streams"], item["candidates"], item["cached_hits"], item["added"], self._outcome(item),
+        ))
+        if len(self._rows) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        rows, self._rows = self._rows, []
+        if self.run_id is not None:
+            save_run_items(self.run_id, rows)
+
+    def finish_pass(self, stopped: bool = False) -> dict:
+        """Write the pass totals; returns them with "duration" (seconds) added."""
+        self.end_item()
+        self.flush()
+        self.totals["stages"] = {k: round(v, 3) for k, v in self.totals["stages"].items()}
+        self.totals["duration"] = time.perf_counter() - self._started
+        finish_run(self.run_id, self.totals, stopped)
+        return self.totals
+
+
+def summary_line(number: int, totals: dict) -> str:
+    failures = sum(totals["failures"].values())
+    return (f"[INFO] Pass {number}: {totals['items']} items in {format_duration(totals['duration'])}, "
+            f"{totals['streams']} streams, {totals['candidates']} candidates, "
+            f"{totals['cached_hits']}/{totals['rd_checks']} already on RD, {totals['added']} added, {failures} failures.")
+
+
+def _items_per_min(run) -> float:
+    duration = (run["finished_at"] or 0) - run["started_at"]
+    return run["items"] * 60.0 / duration if duration > 0 else 0.0
+
+
+def report(limit: int = 20, slowest: int = 10):
+    """Print recent runs, hit rates, stage split, slowest titles and throughput regressions."""
+    runs = get_recent_runs(limit)
+    if not runs:
+        print("No runs recorded yet.")
+        return
+    print(f"Last {len(runs)} run(s), newest first:")
+    print(f"{'started':<17} {'mode':<9} {'dur':>7} {'items':>6} {'/min':>7} {'streams':>8} {'cand':>6} "
+          f"{'RD hit':>7} {'added':>6} {'fail':>5}")
+    rates = [_items_per_min(run) for run in runs]
+    for run, rate in zip(runs, rates):
+        hit = f"{run['cached_hits'] * 100 / run['rd_checks']:.0f}%" if run["rd_checks"] else "—"
+        started = time.strftime("%Y-%m-%d %H:%M", time.localtime(run["started_at"]))
+        mode = (run["mode"] or "") + ("*" if run["stopped"] else "")
+        print(f"{started:<17} {mode:<9} {format_duration(run['finished_at'] - run['started_at']):>7} "
+              f"{run['items']:>6} {rate:>7.1f} {run['streams']:>8} {run['candidates']:>6} {hit:>7} "
+              f"{run['added']:>6} {sum(run['failures'].values()):>5}")
+    if any(run["stopped"] for run in runs):
+        print("(* stopped before the end of the pass)")
+
+    latest = runs[0]
+    total = sum(latest["stages"].values())
+    if total:
+        split = ", ".join(f"{k} {v * 100 / total:.0f}%" for k, v in latest["stages"].items() if v)
+        print(f"\nTime by stage (latest run): {split}")
+    if latest["failures"]:
+        print("Failures (latest run): " + ", ".join(f"{k} {v}" for k, v in sorted(latest["failures"].items())))
+
+    run_ids = [run["id"] for run in runs]
+    outcomes = get_outcome_counts(run_ids)
+    if outcomes:
+        done = sum(outcomes.values())
+        print("Outcomes: " + ", ".join(f"{k} {v * 100 / done:.0f}%" for k, v in sorted(outcomes.items(), key=lambda x: -x[1])))
+
+    rows = get_slowest_items(run_ids, slowest)
+    if rows:
+        print("\nSlowest titles (average over the runs above):")
+        for item_id, season, count, avg_ms, max_ms in rows:
+            label = item_id if season is None else f"{item_id} S{season}"
+            print(f"  {label:<16} avg {avg_ms / 1000:6.1f}s  max {max_ms / 1000:6.1f}s  ({count} run(s))")
+
+    previous = [r for r, run in zip(rates[1:], runs[1:]) if run["items"] and not run["stopped"]]
+    if latest["items"] and previous:
+        baseline = statistics.median(previous)
+        if baseline and rates[0] < baseline * REGRESSION_RATIO:
+            print(f"\n[WARN] Latest run: {rates[0]:.1f} items/min vs a median of {baseline:.1f} before "
+                  f"({(rates[0] / baseline - 1) * 100:+.0f}%).")
+        elif baseline:
+            print(f"\nThroughput: {rates[0]:.1f} items/min (median before: {baseline:.1f}).")
@@ -0,0 +1,165 @@
+"""
+Per-source schedules for the "scheduled" run mode. Each input source (the Movies
+box, a series, a bulk input, an IMDb list, the addon catalog) is re-read on its
+own cadence; sources that are due are read together into the shared work queue.
+
+Config ("source_schedules"): keys are a source key (list:<url>, catalog:<url>,
+series:<tt>, bulk:<input>, movies) or a kind (list, catalog, series, bulk, movies);
+the exact key wins. Values are a schedule or {"schedule": ..., "priority": n}:
+
+    "source_schedules": {
+        "catalog": {"schedule": "every 1h", "priority": 0},
+        "list": "0 6 * * *",
+        "series": {"schedule": "7d", "priority": 2},
+        "series:tt0944947": "1d"
+    }
+
+A schedule is an interval ("30m", "1h", "1d", "every 2h", or minutes as a number)
+or a five-field cron expression (minute hour day month weekday; *, */n, a-b,
+a-b/n and lists; weekday 0 = Sunday). Sources without one use repeat_minutes.
+Lower priority values are processed first; last runs are kept in the database.
+"""
+import re
+import time
+from datetime import datetime, timedelta
+
+from services.database import get_source_runs, save_source_run
+
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+_INTERVAL = re.compile(r"^(?:every\s+)?(\d+(?:\.\d+)?)\s*([smhdw]?)$")
+# (min, max) per cron field
+_CRON_FIELDS = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]
+# Item priorities (sources.PRIORITY_*) fit below one step of source priority
+PRIORITY_STEP = 10
+
+
+class IntervalSchedule:
+    def __init__(self, seconds: float, spec: str = ""):
+        if seconds <= 0:
+            raise ValueError(f"Schedule interval must be positive: {spec!r}")
+        self.seconds = seconds
+        self.spec = spec
+
+    def next_after(self, last_run: float) -> float:
+        return last_run + self.seconds
+
+
+class CronSchedule:
+    def __init__(self, spec: str):
+        fields = spec.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron schedule needs 5 fields: {spec!r}")
+        self.spec = spec
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            _cron_field(f, lo, hi, spec) for f, (lo, hi) in zip(fields, _CRON_FIELDS)
+        )
+        # Cron semantics: if both day fields are restricted, either may match
+        self._any_day = fields[2] == "*" or fields[4] == "*"
+
+    def _day_matches(self, dt: datetime) -> bool:
+        dom = dt.day in self.days
+        dow = (dt.weekday() + 1) % 7 in self.weekdays
+        return (dom and dow) if self._any_day else (dom or dow)
+
+    def next_after(self, last_run: float) -> float:
+        """First matching minute strictly after last_run (local time)."""
+        dt = datetime.fromtimestamp(last_run).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = dt + timedelta(days=366 * 5)
+        while dt < limit:
+            if dt.month not in self.months:
+                dt = (dt.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+                continue
+            if not self._day_matches(dt):
+                dt = dt.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if dt.hour not in self.hours:
+                dt = dt.replace(minute=0) + timedelta(hours=1)
+                continue
+            if dt.minute not in self.minutes:
+                dt += timedelta(minutes=1)
+                continue
+            return dt.timestamp()
+        raise ValueError(f"Cron schedule never matches: {self.spec!r}")
+
+
+def _cron_field(field: str, lo: int, hi: int, spec: str) -> set:
+    values = set()
+    for part in field.split(","):
+        base, _, step = part.partition("/")
+        if base == "*":
+            start, end = lo, hi
+        elif "-" in base:
+            start, end = (int(x) for x in base.split("-", 1))
+        else:
+            start = end = int(base)
+            if step:
+                end = hi
+        if start < lo or end > hi or start > end:
+            raise ValueError(f"Cron field {field!r} out of range {lo}-{hi}: {spec!r}")
+        values.update(range(start, end + 1, int(step) if step else 1))
+    return values
+
+
+def parse_schedule(spec):
+    """IntervalSchedule or CronSchedule from a config value. ValueError if invalid."""
+    if isinstance(spec, (int, float)) and not isinstance(spec, bool):
+        return IntervalSchedule(float(spec) * 60, str(spec))
+    text = str(spec).strip().lower()
+    m = _INTERVAL.match(text)
+    if m:
+        return IntervalSchedule(float(m.group(1)) * _UNITS[m.group(2) or "m"], text)
+    return CronSchedule(text)
+
+
+def source_kind(key: str) -> str:
+    return key.split(":", 1)[0]
+
+
+class Scheduler:
+    """Due times for a fixed set of source keys, from config and the stored last runs."""
+
+    def __init__(self, keys, config: dict):
+        schedules = config.get("source_schedules") or {}
+        default = max(1, int(config.get("repeat_minutes", 60) or 60))
+        self.entries = {}
+        for key in keys:
+            entry = schedules.get(key, schedules.get(source_kind(key), default))
+            if not isinstance(entry, dict):
+                entry = {"schedule": entry}
+            try:
+                schedule = parse_schedule(entry.get("schedule", default))
+                # A cron that is valid field by field can still never match (e.g. Feb 31)
+                schedule.next_after(time.time())
+            except ValueError as e:
+                print(f"[WARN] {e}; using every {default} min for {key}")
+                schedule = IntervalSchedule(default * 60)
+            self.entries[key] = (schedule, int(entry.get("priority", 0) or 0))
+        self.last_runs = get_source_runs(list(self.entries))
+
+    def priority(self, key: str) -> int:
+        return self.entries[key][1]
+
+    def next_run(self, key: str) -> float:
+        """When the source is next due (0 = never read, due now)."""
+        last = self.last_runs.get(key)
+        return 0.0 if last is None else self.entries[key][0].next_after(last)
+
+    def due(self, now: float = None) -> list:
+        now = time.time() if now is None else now
+        return [key for key in self.entries if self.next_run(key) <= now]
+
+    def next_due(self):
+        """(timestamp, key) of the earliest upcoming source, or (None, None) if there are none."""
+        if not self.entries:
+            return None, None
+        key = min(self.entries, key=self.next_run)
+        return self.next_run(key), key
+
+    def mark_run(self, key: str, when: float = None):
+        when = time.time() if when is None else when
+        self.last_runs[key] = when
+        save_source_run(key, when)
+
+
+def queue_priority(source_priority: int, item_priority: int) -> int:
+    return source_priority * PRIORITY_STEP + item_priority
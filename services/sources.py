@@ -0,0 +1,247 @@
+"""
+Input sources as generators feeding one work queue, so warming starts on the first
+ID instead of after every list, catalog and series expansion has been read.
+
+Work items (consumed by services.app):
+    ("movie", imdb_id)
+    ("season", series_id, season, [episode, ...], last_season)
+
+Bulk inputs (files, stdin, URLs of plain text) take one entry per line:
+    tt0133093             movie (or series with default_kind="series")
+    series:tt0944947      every episode of a series
+    tt0944947:1:3         one episode (consecutive lines of a season are grouped)
+IMDb URLs work in place of IDs; blank lines and # comments are skipped.
+"""
+import gzip
+import io
+import itertools
+import queue
+import re
+import sys
+import threading
+
+from services import http
+from services.imdb_list_titles import iter_imdb_ids_from_list, extract_titles_from_list
+from services.imdb_search import parse_imdb_id, resolve_imdb_ids
+from services.imdb_series_episodes import get_all_episodes, get_series_id
+from services.planner import group_episode_jobs
+
+# Queue priorities: new list/catalog items first, then UI entries, then re-checks
+PRIORITY_NEW = 0
+PRIORITY_MANUAL = 1
+PRIORITY_RECHECK = 2
+# Work items buffered ahead of the consumer (producer blocks when full)
+WORK_QUEUE_SIZE = 256
+
+
+def unique(items, key=None):
+    """Yield items without repeats, keeping first-seen order."""
+    seen = set()
+    for item in items:
+        k = key(item) if key else item
+        if k in seen:
+            continue
+        seen.add(k)
+        yield item
+
+
+def iter_lines(value):
+    """Stripped non-empty lines of a UI text value (str) or list."""
+    lines = value if isinstance(value, list) else (value or "").splitlines()
+    for line in lines:
+        line = line.strip()
+        if line:
+            yield line
+
+
+def iter_movie_ids(lines, resolver_workers=4, negative_ttl_hours=72, index_dir="imdb_index"):
+    """
+    IMDb IDs from Movies box lines: IDs are yielded as read; plain titles are
+    resolved together (concurrently, via the resolver cache) after the IDs.
+    """
+    titles = []
+    for line in lines:
+        imdb = parse_imdb_id(line)
+        if imdb:
+            yield imdb
+        else:
+            titles.append(line)
+    if titles:
+        print(f"[INFO] Resolving {len(titles)} movie title(s) to IMDb IDs...")
+        resolved = resolve_imdb_ids(titles, max_workers=resolver_workers, negative_ttl_hours=negative_ttl_hours, index_dir=index_dir)
+        print(f"[INFO] Resolved {len(resolved)}/{len(titles)} title(s).")
+        yield from resolved
+
+
+def iter_list_ids(url, ttl_hours=6, resolver_workers=4, negative_ttl_hours=72, index_dir="imdb_index", status=None):
+    """
+    IMDb IDs of an IMDb list as its pages arrive; falls back to resolving the list's titles.
+    status, if given, receives "complete": True only if every page was read (the title
+    fallback never counts as complete).
+    """
+    print("[INFO] Reading IMDb list:", url)
+    status = {} if status is None else status
+    status["complete"] = False
+    count = 0
+    try:
+        for imdb in iter_imdb_ids_from_list(url, ttl_hours=ttl_hours, status=status):
+            count += 1
+            yield imdb
+    except Exception as e:
+        print("IMDb list ID parse error:", e)
+        status["complete"] = False
+    if count:
+        print(f"[INFO] Found IMDb IDs: {count}")
+        return
+    status["complete"] = False
+    titles = extract_titles_from_list(url)
+    print(f"[INFO] Found titles (fallback): {len(titles)}")
+    if titles:
+        yield from resolve_imdb_ids(titles, max_workers=resolver_workers, negative_ttl_hours=negative_ttl_hours, index_dir=index_dir)
+
+
+def iter_season_jobs(series_input, ttl_hours=24, index_dir="imdb_index", index_max_age_days=30):
+    """Season work items of one series (IMDb ID or URL), in season order; last one flagged."""
+    print(f"[INFO] Fetching episodes for series: {series_input}")
+    series_id = get_series_id(series_input)
+    if not series_id:
+        print("  [WARN] Invalid series ID/URL, skipping.")
+        return
+    eps = get_all_episodes(series_input, ttl_hours=ttl_hours, index_dir=index_dir, index_max_age_days=index_max_age_days)
+    if not eps:
+        print("  [WARN] No episodes found, skipping.")
+        return
+    print(f"  [INFO] Found {len(eps)} episodes.")
+    groups = group_episode_jobs((series_id, row["season"], row["episode"]) for row in eps)
+    for i, (sid, season, episodes) in enumerate(groups):
+        yield "season", sid, season, episodes, i == len(groups) - 1
+
+
+_BULK_LINE = re.compile(r"^(?:(movie|series):)?(tt\d{7,10})(?::(\d{1,4}):(\d{1,5}))?$", re.I)
+# Invalid bulk lines reported individually before switching to a count
+MAX_REPORTED_INVALID = 10
+
+
+def parse_bulk_line(line, default_kind="movie"):
+    """
+    (item_id, kind) for one bulk input line: (tt, "movie"), (tt, "series") or
+    ((series_id, season, episode), "episode"). None for blank/comment lines;
+    raises ValueError for malformed ones.
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    if line.lower().startswith(("http://", "https://")):
+        imdb = parse_imdb_id(line)
+        if not imdb:
+            raise ValueError("URL without an IMDb ID")
+        return imdb, default_kind
+    m = _BULK_LINE.match(line.replace(" ", ""))
+    if not m:
+        raise ValueError("expected tt..., series:tt... or tt...:season:episode")
+    kind, imdb, season, episode = m.groups()
+    imdb = imdb.lower()
+    if season is not None:
+        if kind and kind.lower() == "movie":
+            raise ValueError("movie entries cannot have season/episode")
+        return (imdb, int(season), int(episode)), "episode"
+    return imdb, (kind.lower() if kind else default_kind)
+
+
+def iter_bulk_lines(source):
+    """Text lines of a bulk input: "-" (stdin), an http(s) URL, or a file path (.gz ok)."""
+    if source == "-":
+        yield from sys.stdin
+        return
+    if source.lower().startswith(("http://", "https://")):
+        r = http.get(source, timeout=30, stream=True)
+        r.raise_for_status()
+        try:
+            for line in r.iter_lines(decode_unicode=True):
+                yield line.decode("utf-8", "replace") if isinstance(line, bytes) else line
+        finally:
+            r.close()
+        return
+    opener = gzip.open if source.endswith(".gz") else io.open
+    with opener(source, "rt", encoding="utf-8", errors="replace") as f:
+        yield from f
+
+
+def iter_bulk_items(sources, default_kind="movie"):
+    """
+    (item_id, kind) entries of every bulk input, streamed line by line, in order.
+    Invalid lines are reported (first few individually) and skipped.
+    """
+    for source in sources:
+        label = "stdin" if source == "-" else source
+        print(f"[INFO] Reading bulk input: {label}")
+        count = invalid = 0
+        try:
+            for number, line in enumerate(iter_bulk_lines(source), start=1):
+                try:
+                    item = parse_bulk_line(line, default_kind)
+                except ValueError as e:
+                    invalid += 1
+                    if invalid <= MAX_REPORTED_INVALID:
+                        print(f"  [WARN] {label}:{number}: {e}: {line.strip()[:80]!r}")
+                    continue
+                if item:
+                    count += 1
+                    yield item
+        except Exception as e:
+            print(f"[ERROR] Failed to read bulk input {label}: {e}")
+        print(f"[INFO] Bulk input {label}: {count} entries, {invalid} invalid line(s) skipped.")
+
+
+class WorkQueue:
+    """
+    Runs a producer generator of (priority, work_item) on a background thread into a
+    bounded priority queue; iterating the WorkQueue yields work items as they arrive,
+    lowest priority value first among those buffered. stop_check() ends both sides.
+    """
+
+    def __init__(self, producer, stop_check=None, maxsize=WORK_QUEUE_SIZE):
+        self._producer = producer
+        self._stop_check = stop_check or (lambda: False)
+        self._queue = queue.PriorityQueue(maxsize=max(1, maxsize))
+        self._seq = itertools.count()
+        self.produced = 0
+
+    def _put(self, priority, item):
+        entry = (priority, next(self._seq), item)
+        while not self._stop_check():
+            try:
+                self._queue.put(entry, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self):
+        try:
+            for priority, item in self._producer:
+                if not self._put(priority, item):
+                    break
+                self.produced += 1
+        except Exception as e:
+            print(f"[ERROR] Input source failed: {e}")
+        finally:
+            close = getattr(self._producer, "close", None)
+            if close:
+                close()
+            self._put(sys.maxsize, None)
+
+    def qsize(self):
+        """Work items buffered and not yet consumed."""
+        return self._queue.qsize()
+
+    def __iter__(self):
+        threading.Thread(target=self._run, daemon=True).start()
+        while not self._stop_check():
+            try:
+                _, _, item = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if item is None:
+                return
+            yield item
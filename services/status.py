@@ -0,0 +1,166 @@
+"""
+Live run status published by services.app and polled by the UI (panel + tray).
+All updates are cheap counter bumps under one lock; rates are computed over a
+sliding window only when a snapshot is taken.
+"""
+import threading
+import time
+from collections import deque
+
+# Window for items/min and RD calls/min
+RATE_WINDOW_SECONDS = 300
+
+
+def format_duration(seconds):
+    if seconds is None:
+        return "—"
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m"
+    return f"{seconds // 3600}h{(seconds % 3600) // 60:02d}m"
+
+
+class RunStatus:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.running = False
+            self.current_item = ""
+            self.pass_number = 0
+            self.started_at = None
+            self.items_done = 0
+            self.items_queued = 0
+            self.sources_done = False
+            self.rd_cached_hits = 0
+            self.memo_hits = 0
+            self.added = 0
+            self.errors = {}
+            self._item_times = deque()
+            self._rd_times = deque()
+            self._depths = {}
+
+    def start_pass(self, number):
+        with self._lock:
+            self.running = True
+            self.pass_number = number
+            self.started_at = self.started_at or time.time()
+            self.items_done = 0
+            self.items_queued = 0
+            self.sources_done = False
+
+    def set_running(self, running):
+        with self._lock:
+            self.running = running
+            if not running:
+                self.current_item = ""
+
+    def set_item(self, text):
+        with self._lock:
+            self.current_item = text
+
+    def item_queued(self):
+        with self._lock:
+            self.items_queued += 1
+
+    def item_done(self):
+        with self._lock:
+            self.items_done += 1
+            self._item_times.append(time.time())
+
+    def mark_sources_done(self):
+        with self._lock:
+            self.sources_done = True
+
+    def rd_call(self, cached=False):
+        with self._lock:
+            self._rd_times.append(time.time())
+            if cached:
+                self.rd_cached_hits += 1
+
+    def magnet_added(self):
+        with self._lock:
+            self.added += 1
+
+    def set_memo_hits(self, hits):
+        with self._lock:
+            self.memo_hits = hits
+
+    def error(self, stage):
+        with self._lock:
+            self.errors[stage] = self.errors.get(stage, 0) + 1
+
+    def set_depth(self, stage, depth):
+        """depth: int or a zero-arg callable (e.g. a queue's qsize), read at snapshot time."""
+        with self._lock:
+            if depth is None:
+                self._depths.pop(stage, None)
+            else:
+                self._depths[stage] = depth
+
+    @staticmethod
+    def _rate(times, now):
+        while times and now - times[0] > RATE_WINDOW_SECONDS:
+            times.popleft()
+        if not times:
+            return 0.0
+        span = min(RATE_WINDOW_SECONDS, max(60.0, now - times[0]))
+        return len(times) * 60.0 / span
+
+    def snapshot(self) -> dict:
+        now = time.time()
+        with self._lock:
+            items_per_min = self._rate(self._item_times, now)
+            remaining = max(0, self.items_queued - self.items_done)
+            depths = {}
+            for stage, depth in self._depths.items():
+                try:
+                    depths[stage] = depth() if callable(depth) else depth
+                except Exception:
+                    depths[stage] = 0
+            return {
+                "running": self.running,
+                "current_item": self.current_item,
+                "pass": self.pass_number,
+                "items_done": self.items_done,
+                "items_remaining": remaining,
+                "remaining_known": self.sources_done,
+                "items_per_min": items_per_min,
+                "eta_seconds": remaining * 60.0 / items_per_min if items_per_min and remaining else None,
+                "rd_calls_per_min": self._rate(self._rd_times, now),
+                "rd_cached_hits": self.rd_cached_hits,
+                "memo_hits": self.memo_hits,
+                "added": self.added,
+                "errors": dict(self.errors),
+                "queue_depths": depths,
+            }
+
+    def summary(self) -> str:
+        """One-line summary (tray tooltip)."""
+        s = self.snapshot()
+        if not s["running"]:
+            return "Idle"
+        more = "" if s["remaining_known"] else "+"
+        return (f"Running — {s['items_done']} done, {s['items_remaining']}{more} left, "
+                f"{s['items_per_min']:.1f}/min, ETA {format_duration(s['eta_seconds'])}")
+
+    def lines(self) -> list:
+        """Compact multi-line view (GUI panel)."""
+        s = self.snapshot()
+        state = f"Running (pass {s['pass']})" if s["running"] else "Idle"
+        more = "" if s["remaining_known"] else "+"
+        errors = sum(s["errors"].values())
+        error_detail = ", ".join(f"{k} {v}" for k, v in sorted(s["errors"].items()))
+        depths = " · ".join(f"{k} {v}" for k, v in s["queue_depths"].items()) or "—"
+        return [
+            f"{state}: {s['current_item'] or '—'}",
+            f"Items: {s['items_done']} done · {s['items_remaining']}{more} left · "
+            f"{s['items_per_min']:.1f}/min · ETA {format_duration(s['eta_seconds'])}",
+            f"Real-Debrid: {s['rd_calls_per_min']:.1f} calls/min · {s['rd_cached_hits']} already cached · "
+            f"{s['added']} added · memo hits {s['memo_hits']}",
+            f"Queues: {depths} · Errors: {errors}" + (f" ({error_detail})" if error_detail else ""),
+        ]
@@ -1,115 +1,227 @@
-import requests
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+from services import http
+from services.database import get_tmdb_mappings, save_tmdb_mappings
+
+CATALOG_WORKERS = 4
+META_WORKERS = 8
+# Addon answers without an IMDb ID are retried after this long
+TMDB_NEGATIVE_TTL_HOURS = 72
+
+
+def _check_manifest(manifest):
+    if "catalogs" not in manifest:
+        print("[ERROR] Manifest does not contain 'catalogs'")
+        return None
+    return manifest
 
 
 def fetch_manifest(manifest_url):
     """Fetch and validate the Stremio addon manifest."""
     try:
-        response = requests.get(manifest_url, timeout=10)
+        response = http.get(manifest_url, timeout=10)
         response.raise_for_status()
-        manifest = response.json()
-        
-        if "catalogs" not in manifest:
-            print("[ERROR] Manifest does not contain 'catalogs'")
-            return None
-        
-        return manifest
+        return _check_manifest(response.json())
     except Exception as e:
         print(f"[ERROR] Failed to fetch manifest: {e}")
         return None
 
 
-def extract_catalog_ids(manifest_url, max_pages=5, stop_check=None, select_catalog_func=None):
+def _select_catalogs(catalogs, catalog_ids=None, select_catalog_func=None):
+    """
+    Pick catalogs: by id from catalog_ids if given, else ask select_catalog_func
+    (may return one catalog or a list) when there are several, else the first one.
+    Returns a list (empty if the user cancelled).
+    """
+    if catalog_ids:
+        wanted = set(catalog_ids)
+        chosen = [c for c in catalogs if c.get("id") in wanted]
+        if chosen:
+            return chosen
+        print("[WARN] None of the configured catalog IDs are in the manifest.")
+
+    if len(catalogs) > 1 and select_catalog_func:
+        print(f"[INFO] Manifest has {len(catalogs)} catalogs. Asking user to select...")
+        selected = select_catalog_func(catalogs)
+        if not selected:
+            print("[WARN] User cancelled catalog selection.")
+            return []
+        selected = selected if isinstance(selected, list) else [selected]
+        print(f"[INFO] User selected catalog(s): {', '.join(c.get('name', 'Unknown') for c in selected)}")
+        return selected
+
+    return catalogs[:1]
+
+
+def _catalog_url(base_url, catalog, skip):
+    return f"{base_url}/catalog/{catalog.get('type', 'movie')}/{catalog.get('id')}.json?skip={skip}"
+
+
+def _fetch_catalog_page(base_url, catalog, skip):
+    response = http.get(_catalog_url(base_url, catalog, skip), timeout=10)
+    response.raise_for_status()
+    return response.json().get("metas", [])
+
+
+def _meta_imdb_id(data):
+    meta = data.get("meta") or {}
+    for value in (meta.get("imdb_id"), meta.get("imdbId"), meta.get("id")):
+        if isinstance(value, str) and value.startswith("tt"):
+            return value
+    return None
+
+
+def _fetch_meta_imdb_id(base_url, tmdb_id, media_type):
+    """IMDb ID for a tmdb:... item from the addon's meta endpoint (None if it has none)."""
+    response = http.get(f"{base_url}/meta/{media_type}/{tmdb_id}.json", timeout=10)
+    response.raise_for_status()
+    return _meta_imdb_id(response.json())
+
+
+def resolve_tmdb_ids(base_url, items, stop_check=None, negative_ttl_hours=TMDB_NEGATIVE_TTL_HOURS):
+    """
+    Map [(tmdb_id, type)] to IMDb IDs: persistent mapping cache first, then the addon's
+    meta endpoint for the rest (concurrently). Returns {(tmdb_id, type): tt... or None}.
+    Lookup errors are left unresolved and not cached.
+    """
+    keys = list(dict.fromkeys(items))
+    resolved = {}
+    now = time.time()
+    for key, (imdb_id, resolved_at) in get_tmdb_mappings(keys).items():
+        if imdb_id or now - resolved_at < negative_ttl_hours * 3600:
+            resolved[key] = imdb_id
+    missing = [k for k in keys if k not in resolved]
+    if not missing or (stop_check and stop_check()):
+        return resolved
+
+    print(f"[INFO] Resolving {len(missing)} TMDB ID(s) via addon meta ({len(keys) - len(missing)} cached)...")
+
+    def lookup(key):
+        if stop_check and stop_check():
+            return key, None, False
+        try:
+            return key, _fetch_meta_imdb_id(base_url, key[0], key[1]), True
+        except Exception as e:
+            print(f"[WARN] Addon meta lookup failed for {key[0]}: {e}")
+            return key, None, False
+
+    fresh = {}
+    with ThreadPoolExecutor(max_workers=META_WORKERS) as pool:
+        for key, imdb_id, ok in pool.map(lookup, missing):
+            if ok:
+                fresh[key] = imdb_id
+    save_tmdb_mappings(fresh)
+    resolved.update(fresh)
+    return resolved
+
+
+def _meta_item(meta, media_type):
+    """(imdb_id or None, type, tmdb_id or None) for one catalog meta; None if it has neither."""
+    item_id = meta.get("id", "")
+    imdb_id = meta.get("imdb_id") or meta.get("imdbId")
+    if isinstance(imdb_id, str) and imdb_id.startswith("tt"):
+        return imdb_id, media_type, None
+    if item_id.startswith("tt"):
+        return item_id, media_type, None
+    if item_id.startswith("tmdb:"):
+        return None, meta.get("type", media_type), item_id
+    return None
+
+
+def iter_catalog_items(manifest_url, max_pages=5, stop_check=None, select_catalog_func=None, catalog_ids=None,
+                       status=None):
     """
-    Fetch catalog from Stremio addon and extract IMDb/TMDB IDs.
-    Returns a list of IDs (tt... for IMDb,tmdb:... for TMDB).
-    max_pages: Maximum number of pages to fetch (default 5)
+    Yield (imdb_id, type) from the selected catalogs of a Stremio addon, type being
+    "movie" or "series", in catalog/page order as pages arrive (all catalogs and pages
+    are fetched concurrently). tmdb:... IDs are resolved to IMDb IDs page by page;
+    items without one are dropped.
+    max_pages: Maximum number of pages to fetch per catalog (default 5)
     stop_check: Callback function that returns True if we should stop early
-    select_catalog_func: Function(catalogs) -> selected_catalog (or None)
+    select_catalog_func: Function(catalogs) -> selected catalog, list of catalogs, or None
+    catalog_ids: Catalog IDs to use without asking (e.g. saved from an earlier selection)
+    status: if given, receives "complete": True only if every selected page was read
+            and every tmdb ID lookup answered
     """
+    status = {} if status is None else status
+    status["complete"] = False
     if stop_check and stop_check():
-        return []
+        return
 
     manifest = fetch_manifest(manifest_url)
     if not manifest:
-        return []
-    
+        return
+
     catalogs = manifest.get("catalogs", [])
     if not catalogs:
         print("[ERROR] No catalogs found in manifest")
-        return []
-    
-    # Filter only movie/series catalogs if needed, but lets keep it generic
-    # If multiple catalogs and select function provided, ask user
-    catalog = catalogs[0]
-    
-    if len(catalogs) > 1 and select_catalog_func:
-        print(f"[INFO] Manifest has {len(catalogs)} catalogs. Asking user to select...")
-        selected = select_catalog_func(catalogs)
-        if selected:
-            catalog = selected
-            print(f"[INFO] User selected catalog: {catalog.get('name', 'Unknown')}")
-        else:
-            print("[WARN] User cancelled catalog selection.")
-            return []
+        return
+
+    selected = _select_catalogs(catalogs, catalog_ids, select_catalog_func)
+    if not selected or (stop_check and stop_check()):
+        return
 
-    if stop_check and stop_check():
-        return []
-
-    catalog_id = catalog.get("id")
-    catalog_type = catalog.get("type", "movie")
-    page_size = catalog.get("pageSize", 100)
-    
-    print(f"[INFO] Using catalog: {catalog_id} (type: {catalog_type})")
-    
     # Compute base URL (remove /manifest.json)
     base_url = manifest_url.replace("/manifest.json", "")
-    
-    # Fetch catalog items with pagination
-    all_ids = []
-    skip = 0
-    pages_fetched = 0
-    
-    while pages_fetched < max_pages:
-        if stop_check and stop_check():
-            print("[INFO] Stop requested during catalog fetch.")
-            break
 
-        catalog_url = f"{base_url}/catalog/{catalog_type}/{catalog_id}.json?skip={skip}"
-        print(f"[INFO] Fetching catalog page {pages_fetched+1}/{max_pages} (skip={skip})...")
-        
-        try:
-            response = requests.get(catalog_url, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            metas = data.get("metas", [])
-            if not metas:
-                print("[INFO] No more items in catalog")
+    jobs = []
+    for catalog in selected:
+        print(f"[INFO] Using catalog: {catalog.get('id')} (type: {catalog.get('type', 'movie')})")
+        page_size = catalog.get("pageSize", 100)
+        for page in range(max(1, int(max_pages))):
+            jobs.append((catalog, page, page * page_size))
+
+    print(f"[INFO] Fetching {len(jobs)} catalog page(s) from {len(selected)} catalog(s)...")
+    seen = set()
+    total = 0
+    unresolved = 0
+    complete = True
+    done_catalogs = set()
+    pool = ThreadPoolExecutor(max_workers=CATALOG_WORKERS)
+    try:
+        futures = [pool.submit(_fetch_catalog_page, base_url, c, skip) for c, _, skip in jobs]
+        for (catalog, page, skip), fut in zip(jobs, futures):
+            key = id(catalog)
+            if key in done_catalogs:
+                fut.cancel()
+                continue
+            if stop_check and stop_check():
+                print("[INFO] Stop requested during catalog fetch.")
+                complete = False
                 break
-            
-            # Extract IDs from metas
-            for meta in metas:
-                item_id = meta.get("id", "")
-                
-                # Extract TMDB or IMDb ID
-                if item_id.startswith("tmdb:"):
-                    # TMDB ID
-                    all_ids.append(item_id)
-                elif item_id.startswith("tt"):
-                    # IMDb ID
-                    all_ids.append(item_id)
-            
-            print(f"[INFO] Found {len(metas)} items in this page, total collected: {len(all_ids)}")
-            pages_fetched += 1
-            
-            # Move to next page
-            skip += page_size
-            time.sleep(0.5)  # Be nice to the addon server
-            
-        except Exception as e:
-            print(f"[ERROR] Failed to fetch catalog page: {e}")
-            break
-    
-    print(f"[INFO] Total IDs extracted from addon: {len(all_ids)}")
-    return all_ids
+            try:
+                metas = fut.result()
+            except Exception as e:
+                print(f"[ERROR] Failed to fetch catalog page (skip={skip}): {e}")
+                done_catalogs.add(key)
+                complete = False
+                continue
+            if not metas:
+                print(f"[INFO] No more items in catalog {catalog.get('id')}")
+                done_catalogs.add(key)
+                continue
+            raw = [item for item in (_meta_item(m, catalog.get("type", "movie")) for m in metas) if item]
+            tmdb_keys = [(tmdb_id, media_type) for _, media_type, tmdb_id in raw if tmdb_id]
+            mapping = resolve_tmdb_ids(base_url, tmdb_keys, stop_check=stop_check) if tmdb_keys else {}
+            for imdb_id, media_type, tmdb_id in raw:
+                if tmdb_id:
+                    if (tmdb_id, media_type) not in mapping:
+                        # Lookup failed (not cached): the item may still be in the catalog
+                        complete = False
+                    imdb_id = mapping.get((tmdb_id, media_type))
+                    if not imdb_id:
+                        unresolved += 1
+                        continue
+                kind = "series" if media_type in ("series", "tv") else "movie"
+                if (imdb_id, kind) not in seen:
+                    seen.add((imdb_id, kind))
+                    total += 1
+                    yield imdb_id, kind
+            print(f"[INFO] Catalog {catalog.get('id')} page {page + 1}: {len(metas)} items, total collected: {total}")
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    if unresolved:
+        print(f"[INFO] Skipped {unresolved} TMDB item(s) without an IMDb ID.")
+    print(f"[INFO] Total IDs extracted from addon: {total}")
+    status["complete"] = complete
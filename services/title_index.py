@@ -0,0 +1,207 @@
+"""
+Character-trigram inverted index over normalized titles. A query is shortlisted
+to a few hundred titles sharing the most (rarest) trigrams with it, so fuzzy
+scoring only runs on the shortlist instead of the whole title pool.
+
+Stdlib only; used by the offline resolver in services.imdb_search. The episode
+matcher in _episode_fetcher runs standalone and keeps an in-memory fork of it.
+
+Persisted as five files next to each other:
+
+    <path>.json      format version and trigram -> (start, count) offsets
+    <path>.bin       postings (uint32 title positions)
+    <path>.grams     trigrams per title (uint16)
+    <path>.titles    string table: uint64 count, count+1 uint64 offsets, UTF-8 data
+    <path>.payloads  string table of JSON-encoded payloads
+
+Everything but the trigram offsets is memory-mapped on load, so titles and
+payloads are only decoded when a search returns them.
+"""
+import difflib
+import json
+import mmap
+import os
+import re
+import struct
+from array import array
+from collections import Counter
+
+try:
+    from rapidfuzz import fuzz as _rf_fuzz
+except ImportError:
+    _rf_fuzz = None
+
+FORMAT_VERSION = 2
+# Trigrams shared by more titles than this are skipped when rarer ones exist
+MAX_POSTINGS = 20000
+
+
+def normalize(s: str) -> str:
+    """Same normalization as the episode matcher's normalize_title."""
+    if not isinstance(s, str):
+        return ""
+    s = s.lower().strip()
+    s = re.sub(r'“|”|’|‚|‘|"|\'', ' ', s)
+    s = re.sub(r'&', ' and ', s)
+    s = re.sub(r'\bpart\b', 'pt', s)
+    s = re.sub(r'[^a-z0-9\s]', ' ', s)
+    s = re.sub(r'\s+', ' ', s)
+    return s.strip()
+
+
+def trigrams(norm: str) -> set:
+    padded = f"  {norm} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _map(path: str) -> memoryview:
+    """Read-only memory map of a file (an empty view for an empty file)."""
+    with open(path, "rb") as f:
+        if not os.fstat(f.fileno()).st_size:
+            return memoryview(b"")
+        return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+def _write_atomic(path: str, write):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+class StringTable:
+    """Read-only sequence of strings over a mapped table: uint64 count, count+1 offsets, UTF-8 data."""
+
+    def __init__(self, buf: memoryview, decode=None):
+        (count,) = struct.unpack_from("<Q", buf, 0)
+        self._offsets = buf[8:8 + 8 * (count + 1)].cast("Q")
+        self._data = buf[8 + 8 * (count + 1):]
+        self._count = count
+        self._decode = decode
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i: int):
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        value = bytes(self._data[self._offsets[i]:self._offsets[i + 1]]).decode("utf-8")
+        return self._decode(value) if self._decode else value
+
+    @staticmethod
+    def write(f, strings):
+        encoded = [s.encode("utf-8") for s in strings]
+        offsets = array("Q", [0])
+        for data in encoded:
+            offsets.append(offsets[-1] + len(data))
+        f.write(struct.pack("<Q", len(encoded)))
+        offsets.tofile(f)
+        for data in encoded:
+            f.write(data)
+
+
+class TrigramIndex:
+    """
+    titles[i] is a normalized title; payloads[i] is caller data (e.g. [tconst, year]).
+    Both are lists when built, memory-mapped StringTables when loaded.
+    """
+
+    def __init__(self, titles, payloads=None, postings=None, offsets=None, gram_counts=None):
+        self.titles = titles if isinstance(titles, StringTable) else list(titles)
+        if payloads is None:
+            payloads = [None] * len(self.titles)
+        self.payloads = payloads if isinstance(payloads, StringTable) else list(payloads)
+        if postings is None:
+            postings, offsets, gram_counts = self._build(self.titles)
+        self._postings = postings
+        self._offsets = offsets
+        self._gram_counts = gram_counts
+
+    @staticmethod
+    def _build(titles):
+        lists = {}
+        gram_counts = array("H")
+        for pos, title in enumerate(titles):
+            grams = trigrams(title)
+            gram_counts.append(min(len(grams), 0xFFFF))
+            for g in grams:
+                lists.setdefault(g, []).append(pos)
+        postings = array("I")
+        offsets = {}
+        for g, positions in lists.items():
+            offsets[g] = (len(postings), len(positions))
+            postings.extend(positions)
+        return postings, offsets, gram_counts
+
+    def _posting(self, gram):
+        start, count = self._offsets[gram]
+        return self._postings[start:start + count]
+
+    def shortlist(self, query: str, limit: int = 300) -> list:
+        """Positions of the titles sharing the most trigrams with query (normalized), best first."""
+        q = trigrams(normalize(query))
+        grams = sorted((g for g in q if g in self._offsets), key=lambda g: self._offsets[g][1])
+        if not grams:
+            return []
+        rare = [g for g in grams if self._offsets[g][1] <= MAX_POSTINGS] or grams[:1]
+        counts = Counter()
+        for g in rare:
+            counts.update(self._posting(g))
+        qn = len(q)
+        # Most shared trigrams first, then re-rank by Jaccard: shared / (|q| + |title| - shared)
+        top = counts.most_common(limit * 4)
+        top.sort(key=lambda kv: -kv[1] / (qn + self._gram_counts[kv[0]] - kv[1]))
+        return [pos for pos, _ in top[:limit]]
+
+    def search(self, query: str, limit: int = 10, shortlist: int = 300, scorer=None):
+        """
+        Fuzzy search: [(position, score 0-100)] best first. scorer(a, b) -> 0-100
+        defaults to an edit-distance ratio (rapidfuzz if installed, else difflib).
+        """
+        qn = normalize(query)
+        positions = self.shortlist(qn, shortlist)
+        if scorer is None and _rf_fuzz is not None:
+            scorer = _rf_fuzz.ratio
+        if scorer is None:
+            # difflib caches analysis of seq2, so keep the query there
+            matcher = difflib.SequenceMatcher(None)
+            matcher.set_seq2(qn)
+            scored = []
+            for pos in positions:
+                matcher.set_seq1(self.titles[pos])
+                scored.append((pos, matcher.ratio() * 100))
+        else:
+            scored = [(pos, scorer(qn, self.titles[pos])) for pos in positions]
+        scored.sort(key=lambda x: -x[1])
+        return scored[:limit]
+
+    def save(self, path: str):
+        """Write the .bin/.grams/.titles/.payloads files, then <path>.json (written last: it marks a complete index)."""
+        _write_atomic(path + ".bin", lambda f: f.write(self._postings))
+        _write_atomic(path + ".grams", lambda f: f.write(self._gram_counts))
+        _write_atomic(path + ".titles", lambda f: StringTable.write(f, self.titles))
+        _write_atomic(path + ".payloads", lambda f: StringTable.write(
+            f, (json.dumps(p, separators=(",", ":")) for p in self.payloads)))
+        meta = {"version": FORMAT_VERSION, "offsets": self._offsets}
+        _write_atomic(path + ".json", lambda f: f.write(json.dumps(meta, separators=(",", ":")).encode("utf-8")))
+
+    @classmethod
+    def load(cls, path: str):
+        """Load a saved index (memory-mapped). None if missing or outdated."""
+        files = [path + ext for ext in (".json", ".bin", ".grams", ".titles", ".payloads")]
+        if not all(os.path.exists(f) for f in files):
+            return None
+        with open(path + ".json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != FORMAT_VERSION:
+            return None
+        offsets = {g: tuple(v) for g, v in meta["offsets"].items()}
+        return cls(
+            StringTable(_map(path + ".titles")),
+            StringTable(_map(path + ".payloads"), json.loads),
+            _map(path + ".bin").cast("I"),
+            offsets,
+            _map(path + ".grams").cast("H"),
+        )
@@ -1,6 +1,6 @@
-import requests
+from services import http
 
-BASE_URL = "https://torrentio.strem.fun"
+BASE_URL = http.base_url("TORRENTIO", "https://torrentio.strem.fun")
 CONFIG = "sort=qualitysize"
 
 HEADERS = {
@@ -8,28 +8,100 @@ HEADERS = {
     "Accept": "application/json"
 }
 
+# Torrentio quality groups excluded below each minimum resolution
+QUALITY_EXCLUDES = {
+    720: ["480p", "other", "unknown"],
+    1080: ["720p"],
+    2160: ["1080p"],
+}
+# Never wanted (also dropped by filters.is_blacklisted)
+ALWAYS_EXCLUDED = ["scr", "cam"]
+DEFAULT_LIMIT = 10
+
+
+def build_config(config: dict) -> str:
+    """
+    Torrentio options path built from settings, so filtering happens server-side:
+    qualityfilter from min_resolution (+ "torrentio_exclude"), providers from
+    "torrentio_providers", and "torrentio_limit" results per quality (0 = no limit).
+    """
+    options = []
+    providers = config.get("torrentio_providers") or []
+    if isinstance(providers, str):
+        providers = [p.strip() for p in providers.split(",") if p.strip()]
+    if providers:
+        options.append("providers=" + ",".join(providers))
+    options.append("sort=qualitysize")
+
+    excluded = list(ALWAYS_EXCLUDED)
+    min_resolution = int(config.get("min_resolution", 720) or 0)
+    for resolution, qualities in sorted(QUALITY_EXCLUDES.items()):
+        if min_resolution >= resolution:
+            excluded.extend(qualities)
+    excluded.extend(config.get("torrentio_exclude") or [])
+    options.append("qualityfilter=" + ",".join(dict.fromkeys(excluded)))
+
+    limit = config.get("torrentio_limit", DEFAULT_LIMIT)
+    if limit:
+        options.append(f"limit={int(limit)}")
+    return "|".join(options)
 
-def get_movie_streams(imdb_id: str):
-    url = f"{BASE_URL}/{CONFIG}/stream/movie/{imdb_id}.json"
+
+def get_movie_streams(imdb_id: str, options: str = CONFIG):
+    """Streams for a movie; None if Torrentio could not be read (not the same as no streams)."""
+    url = f"{BASE_URL}/{options}/stream/movie/{imdb_id}.json"
     try:
-        response = requests.get(url, headers=HEADERS, timeout=10)
+        response = http.get(url, headers=HEADERS, timeout=10)
         response.raise_for_status()
         data = response.json()
         return data.get("streams", [])
+    except http.CircuitOpenError:
+        raise
     except Exception as e:
         print("Torrentio error:", e)
-        return []
+        return None   # UNKNOWN
 
 
-def get_episode_streams(series_imdb_id: str, season: int, episode: int):
-    """Get streams for one TV episode. Stremio uses series_id:season:episode."""
+def get_episode_streams(series_imdb_id: str, season: int, episode: int, options: str = CONFIG):
+    """Get streams for one TV episode (None on error). Stremio uses series_id:season:episode."""
     video_id = f"{series_imdb_id}:{season}:{episode}"
-    url = f"{BASE_URL}/{CONFIG}/stream/series/{video_id}.json"
+    url = f"{BASE_URL}/{options}/stream/series/{video_id}.json"
     try:
-        response = requests.get(url, headers=HEADERS, timeout=10)
+        response = http.get(url, headers=HEADERS, timeout=10)
         response.raise_for_status()
         data = response.json()
         return data.get("streams", [])
+    except http.CircuitOpenError:
+        raise
+    except Exception as e:
+        print("Torrentio series error:", e)
+        return None   # UNKNOWN
+
+
+# Async variants for the "async" engine; `client` is a services.async_http.AsyncHTTP
+
+
+async def get_movie_streams_async(client, imdb_id: str, options: str = CONFIG):
+    url = f"{BASE_URL}/{options}/stream/movie/{imdb_id}.json"
+    try:
+        response = await client.get(url, headers=HEADERS, timeout=10)
+        response.raise_for_status()
+        return response.json().get("streams", [])
+    except http.CircuitOpenError:
+        raise
+    except Exception as e:
+        print("Torrentio error:", e)
+        return None   # UNKNOWN
+
+
+async def get_episode_streams_async(client, series_imdb_id: str, season: int, episode: int, options: str = CONFIG):
+    url = f"{BASE_URL}/{options}/stream/series/{series_imdb_id}:{season}:{episode}.json"
+    try:
+        response = await client.get(url, headers=HEADERS, timeout=10)
+        response.raise_for_status()
+        return response.json().get("streams", [])
+    except http.CircuitOpenError:
+        raise
     except Exception as e:
         print("Torrentio series error:", e)
-        return []
+        return None   # UNKNOWN
@@ -7,6 +7,8 @@ import sys
 import traceback
 import webbrowser
 import ctypes
+import multiprocessing
+from collections import deque
 
 try:
     # Fix for Windows Taskbar Icon
@@ -17,7 +19,8 @@ except Exception:
 
 # Wrap everything in try-except to catch initialization errors
 try:
-    from services.app import start_app, request_stop, APP_VERSION
+    from services.app import start_app, request_stop, APP_VERSION, STATUS
+    from services.log_file import LineLog, LOG_FILE, LOG_MAX_MB, LOG_BACKUPS
 except Exception as e:
     print(f"Error importing services.app: {e}", flush=True)
     traceback.print_exc()
@@ -69,19 +72,51 @@ class ToolTip:
 
 
 class TextRedirector:
-    def __init__(self, widget):
+    """
+    stdout/stderr sink for the log box. Writes from any thread go into a bounded ring
+    (oldest text dropped if the UI falls behind); the Tk loop flushes it in batches
+    every FLUSH_MS and trims the widget to max_lines. Everything is also sent to the
+    rotating log file, if given.
+    """
+    FLUSH_MS = 200
+    RING_SIZE = 5000
+
+    def __init__(self, widget, max_lines=2000, file_log=None):
         self.widget = widget
+        self.max_lines = max_lines
+        self.file_log = file_log
+        self._ring = deque(maxlen=self.RING_SIZE)
+        self._dropped = 0
+        self._lock = threading.Lock()
+        self.widget.after(self.FLUSH_MS, self._flush)
 
     def write(self, text):
-        # Schedule the update on the main thread to be thread-safe
-        self.widget.after(0, self._append, text)
-
-    def _append(self, text):
+        if not text:
+            return
+        with self._lock:
+            if len(self._ring) == self._ring.maxlen:
+                self._dropped += 1
+            self._ring.append(text)
+        if self.file_log:
+            self.file_log.write(text)
+
+    def _flush(self):
+        with self._lock:
+            chunks, self._ring = self._ring, deque(maxlen=self.RING_SIZE)
+            dropped, self._dropped = self._dropped, 0
         try:
-            self.widget.insert(tk.END, text)
-            self.widget.see(tk.END)
+            if chunks:
+                text = "".join(chunks)
+                if dropped:
+                    text = f"[... {dropped} log fragment(s) skipped ...]\n" + text
+                self.widget.insert(tk.END, text)
+                lines = int(self.widget.index("end-1c").split(".")[0])
+                if lines > self.max_lines:
+                    self.widget.delete("1.0", f"{lines - self.max_lines + 1}.0")
+                self.widget.see(tk.END)
         except Exception:
             pass
+        self.widget.after(self.FLUSH_MS, self._flush)
 
     def flush(self):
         pass
@@ -99,460 +134,501 @@ def save_config(cfg):
         json.dump(cfg, f, indent=4)
 
 
-config = load_config()
-
-
-
-# -------------------------
-# Window
-# -------------------------
+def main():
+    """Build the window and run the Tk main loop."""
+    config = load_config()
 
-root = tk.Tk()
-root.title(f"CacheWarmer v{APP_VERSION}")
-if os.path.exists("cloud.ico"):
-    try:
-        root.iconbitmap("cloud.ico")
-    except Exception:
-        pass
-root.minsize(560, 700)
 
-# Center window on screen (cross-platform)
-root.update_idletasks()
-width = 600
-height = 800
-x = (root.winfo_screenwidth() // 2) - (width // 2)
-y = (root.winfo_screenheight() // 2) - (height // 2)
-root.geometry(f'{width}x{height}+{x}+{y}')
 
-# Main padded frame so content doesn't touch edges
-main = tk.Frame(root, padx=20, pady=14)
-main.pack(fill=tk.BOTH, expand=True)
-main.columnconfigure(1, weight=1)
+    # -------------------------
+    # Window
+    # -------------------------
 
-# -------------------------
-# Fields
-# -------------------------
-
-row = 0
-
-tk.Label(main, text="Real-Debrid API Key").grid(row=row, column=0, sticky="w")
-api_entry = tk.Entry(main, width=62)
-api_entry.grid(row=row, column=1)
-api_entry.insert(0, config.get("real_debrid_api_key", ""))
-row += 1
-
-tk.Label(main, text="Delay Between Movies (sec)").grid(row=row, column=0, sticky="w")
-delay_entry = tk.Entry(main)
-delay_entry.grid(row=row, column=1)
-delay_entry.insert(0, str(config.get("delay_between_movies", 5)))
-row += 1
-
-tk.Label(main, text="Minimum Seeders").grid(row=row, column=0, sticky="w")
-seed_entry = tk.Entry(main)
-seed_entry.grid(row=row, column=1)
-seed_entry.insert(0, str(config.get("min_seeders", 5)))
-row += 1
-
-tk.Label(main, text="Minimum Resolution").grid(row=row, column=0, sticky="w")
-res_var = tk.StringVar(value=str(config.get("min_resolution", 720)))
-res_menu = tk.OptionMenu(main, res_var, "720", "1080", "2160")
-res_menu.grid(row=row, column=1)
-row += 1
-
-tk.Label(main, text="Max Per Quality").grid(row=row, column=0, sticky="w")
-maxpq_entry = tk.Entry(main)
-maxpq_entry.grid(row=row, column=1)
-maxpq_entry.insert(0, str(config.get("max_per_quality", 1)))
-row += 1
-
-pack_var = tk.BooleanVar(value=config.get("allow_packs_fallback", True))
-pack_check = tk.Checkbutton(main, text="Allow Pack Fallback", variable=pack_var)
-pack_check.grid(row=row, columnspan=2)
-row += 1
+    root = tk.Tk()
+    root.title(f"CacheWarmer v{APP_VERSION}")
+    if os.path.exists("cloud.ico"):
+        try:
+            root.iconbitmap("cloud.ico")
+        except Exception:
+            pass
+    root.minsize(560, 700)
+
+    # Center window on screen (cross-platform)
+    root.update_idletasks()
+    width = 600
+    height = 800
+    x = (root.winfo_screenwidth() // 2) - (width // 2)
+    y = (root.winfo_screenheight() // 2) - (height // 2)
+    root.geometry(f'{width}x{height}+{x}+{y}')
+
+    # Main padded frame so content doesn't touch edges
+    main = tk.Frame(root, padx=20, pady=14)
+    main.pack(fill=tk.BOTH, expand=True)
+    main.columnconfigure(1, weight=1)
+
+    # -------------------------
+    # Fields
+    # -------------------------
+
+    row = 0
+
+    tk.Label(main, text="Real-Debrid API Key").grid(row=row, column=0, sticky="w")
+    api_entry = tk.Entry(main, width=62)
+    api_entry.grid(row=row, column=1)
+    api_entry.insert(0, config.get("real_debrid_api_key", ""))
+    row += 1
+
+    tk.Label(main, text="Delay Between Movies (sec)").grid(row=row, column=0, sticky="w")
+    delay_entry = tk.Entry(main)
+    delay_entry.grid(row=row, column=1)
+    delay_entry.insert(0, str(config.get("delay_between_movies", 5)))
+    row += 1
+
+    tk.Label(main, text="Minimum Seeders").grid(row=row, column=0, sticky="w")
+    seed_entry = tk.Entry(main)
+    seed_entry.grid(row=row, column=1)
+    seed_entry.insert(0, str(config.get("min_seeders", 5)))
+    row += 1
+
+    tk.Label(main, text="Minimum Resolution").grid(row=row, column=0, sticky="w")
+    res_var = tk.StringVar(value=str(config.get("min_resolution", 720)))
+    res_menu = tk.OptionMenu(main, res_var, "720", "1080", "2160")
+    res_menu.grid(row=row, column=1)
+    row += 1
+
+    tk.Label(main, text="Max Per Quality").grid(row=row, column=0, sticky="w")
+    maxpq_entry = tk.Entry(main)
+    maxpq_entry.grid(row=row, column=1)
+    maxpq_entry.insert(0, str(config.get("max_per_quality", 1)))
+    row += 1
+
+    pack_var = tk.BooleanVar(value=config.get("allow_packs_fallback", True))
+    pack_check = tk.Checkbutton(main, text="Allow Pack Fallback", variable=pack_var)
+    pack_check.grid(row=row, columnspan=2)
+    row += 1
+
+    season_pack_var = tk.BooleanVar(value=config.get("season_pack_first", True))
+    season_pack_check = tk.Checkbutton(main, text="Season Packs First (series)", variable=season_pack_var)
+    season_pack_check.grid(row=row, columnspan=2)
+    row += 1
+
+    # -------------------------
+    # Run mode
+    # -------------------------
+    RUN_MODE_VALUES = {"One-shot": "oneshot", "Loop forever": "loop", "Repeat every X min": "interval", "Per-source schedule": "scheduled"}
+    RUN_MODE_LABELS = tuple(RUN_MODE_VALUES)
+    RUN_MODE_REVERSE = {v: k for k, v in RUN_MODE_VALUES.items()}
+    tk.Label(main, text="Run mode").grid(row=row, column=0, sticky="w")
+    run_mode_var = tk.StringVar(value=RUN_MODE_REVERSE.get(config.get("run_mode", "oneshot"), "One-shot"))
+    run_mode_menu = tk.OptionMenu(main, run_mode_var, *RUN_MODE_LABELS)
+    run_mode_menu.grid(row=row, column=1)
+    row += 1
+
+    tk.Label(main, text="Repeat interval (min)").grid(row=row, column=0, sticky="w")
+    repeat_minutes_entry = tk.Entry(main, width=6)
+    repeat_minutes_entry.grid(row=row, column=1)
+    repeat_minutes_entry.insert(0, str(config.get("repeat_minutes", 60)))
+    row += 1
+
+    # -------------------------
+    # TMDB Discover+ Addon
+    # -------------------------
+
+    tk.Label(main, text="TMDB Discover+ Base URLs\n(Click to open / Right-click copy)").grid(row=row, column=0, sticky="nw")
+    link_frame = tk.Frame(main)
+    link_frame.grid(row=row, column=1, sticky="w")
+
+    def open_url(url):
+        webbrowser.open(url)
+
+    def copy_url(url):
+        root.clipboard_clear()
+        root.clipboard_append(url)
+        root.update()
+        messagebox.showinfo("Copied", "URL copied to clipboard!")
+
+    def make_link_label(parent, text, url):
+        lbl = tk.Label(parent, text=text, fg="blue", cursor="hand2", font=("TkDefaultFont", 9, "underline"))
+        lbl.bind("<Button-1>", lambda e: open_url(url))
+        lbl.bind("<Button-3>", lambda e: copy_url(url))
+        return lbl
+
+    link1 = make_link_label(link_frame, "Link 1: baby-beamup.club", "https://84f50d1c22e7-tmdb-discover-plus.baby-beamup.club/")
+    link1.pack(anchor="w")
+
+    link2 = make_link_label(link_frame, "Link 2: ElfHosted", "https://tmdb-discover-plus.elfhosted.com/")
+    link2.pack(anchor="w")
+    row += 1
+
+    tk.Label(main, text="TMDB Discover+ Manifest URL").grid(row=row, column=0, sticky="nw")
+    tmdb_manifest_text = tk.Text(main, height=4, width=50)
+    tmdb_manifest_text.grid(row=row, column=1, columnspan=2, sticky="ew", pady=2)
+    tmdb_manifest_text.insert("1.0", config.get("tmdb_manifest_url", ""))
+    row += 1
+
+    tk.Label(main, text="TMDB Catalog Pages to Fetch").grid(row=row, column=0, sticky="w")
+    tmdb_pages_entry = tk.Entry(main, width=10)
+    tmdb_pages_entry.grid(row=row, column=1, sticky="w")
+    tmdb_pages_entry.insert(0, str(config.get("tmdb_catalog_pages", 5)))
+    row += 1
+
+    # -------------------------
+    # IMDb List URL(s)
+    # -------------------------
+
+    tk.Label(main, text="IMDb List URL(s)").grid(row=row, column=0, sticky="nw")
+    imdb_urls_text = tk.Text(main, height=3, width=50)
+    imdb_urls_text.grid(row=row, column=1, columnspan=2, sticky="ew", pady=2)
+    row += 1
+
+    # -------------------------
+    # Movies (IMDb IDs)
+    # -------------------------
+
+    tk.Label(main, text="Movies (IMDb IDs)").grid(row=row, column=0, sticky="nw")
+    movies_text = tk.Text(main, height=4, width=50)
+    movies_text.grid(row=row, column=1, columnspan=2, sticky="ew", pady=2)
+    row += 1
+
+    # -------------------------
+    # Series (IMDb IDs or URLs) — cache all episodes
+    # -------------------------
+
+    tk.Label(main, text="Series (IMDb IDs/URLs)").grid(row=row, column=0, sticky="nw")
+    series_text = tk.Text(main, height=2, width=50)
+    series_text.grid(row=row, column=1, columnspan=2, sticky="ew", pady=2)
+    row += 1
+
+    # -------------------------
+    # Buttons (centered row)
+    # -------------------------
+
+    def save_clicked():
+        try:
+            repeat_m = int(repeat_minutes_entry.get())
+        except (ValueError, TypeError):
+            repeat_m = 60
+        try:
+            tmdb_pages = int(tmdb_pages_entry.get())
+        except (ValueError, TypeError):
+            tmdb_pages = 5
+        # Merge into the existing file so settings without a UI field survive a save
+        cfg = load_config()
+        cfg.update({
+            "real_debrid_api_key": api_entry.get().strip(),
+            "delay_between_movies": int(delay_entry.get()),
+            "min_seeders": int(seed_entry.get()),
+            "min_resolution": int(res_var.get()),
+            "max_per_quality": int(maxpq_entry.get()),
+            "allow_packs_fallback": pack_var.get(),
+            "season_pack_first": season_pack_var.get(),
+            "run_mode": RUN_MODE_VALUES.get(run_mode_var.get(), "oneshot"),
+            "repeat_minutes": repeat_m,
+            "tmdb_manifest_url": tmdb_manifest_text.get("1.0", tk.END).strip(),
+            "tmdb_catalog_pages": tmdb_pages,
+        })
+
+        save_config(cfg)
+        messagebox.showinfo("Saved", "Settings saved!")
+
+
+    def start_clicked():
+        # Validate API Key
+        api_key = api_entry.get().strip()
+        if not api_key:
+            messagebox.showerror("Error", "Real-Debrid API Key is required!")
+            return
 
-# -------------------------
-# Run mode
-# -------------------------
-RUN_MODE_LABELS = ("One-shot", "Loop forever", "Repeat every X min")
-RUN_MODE_VALUES = {"One-shot": "oneshot", "Loop forever": "loop", "Repeat every X min": "interval"}
-RUN_MODE_REVERSE = {v: k for k, v in RUN_MODE_VALUES.items()}
-tk.Label(main, text="Run mode").grid(row=row, column=0, sticky="w")
-run_mode_var = tk.StringVar(value=RUN_MODE_REVERSE.get(config.get("run_mode", "oneshot"), "One-shot"))
-run_mode_menu = tk.OptionMenu(main, run_mode_var, *RUN_MODE_LABELS)
-run_mode_menu.grid(row=row, column=1)
-row += 1
-
-tk.Label(main, text="Repeat interval (min)").grid(row=row, column=0, sticky="w")
-repeat_minutes_entry = tk.Entry(main, width=6)
-repeat_minutes_entry.grid(row=row, column=1)
-repeat_minutes_entry.insert(0, str(config.get("repeat_minutes", 60)))
-row += 1
+        # Get Inputs
+        imdb_urls = imdb_urls_text.get("1.0", tk.END).strip()
+        movies = movies_text.get("1.0", tk.END).strip()
+        series = series_text.get("1.0", tk.END).strip()
+        tmdb_manifest_url = tmdb_manifest_text.get("1.0", tk.END).strip()
 
-# -------------------------
-# TMDB Discover+ Addon
-# -------------------------
+        # Validate Inputs
+        if not imdb_urls and not movies and not series and not tmdb_manifest_url:
+            messagebox.showerror("Error", "Please provide at least one input:\n- TMDB Discover+ Manifest URL\n- IMDb List URL\n- Movie ID/Title\n- Series ID/URL")
+            return
 
-tk.Label(main, text="TMDB Discover+ Base URLs\n(Click to open / Right-click copy)").grid(row=row, column=0, sticky="nw")
-link_frame = tk.Frame(main)
-link_frame.grid(row=row, column=1, sticky="w")
+        # Cross-validation: IDs in URL box?
+        for line in imdb_urls.splitlines():
+            line = line.strip()
+            if not line: continue
+            # Detect simple ID like tt1234567 inside URL box
+            if line.lower().startswith("tt") and "imdb.com" not in line.lower():
+                messagebox.showerror("Input Error", f"Found ID in List URL box: '{line}'\nPlease paste IDs in the Movies or Series box, and only List URLs here.")
+                return
+
+        # Cross-validation: List URLs in ID box?
+        for line in (movies + "\n" + series).splitlines():
+            line = line.strip()
+            if "imdb.com/list" in line.lower():
+                messagebox.showerror("Input Error", f"Found List URL in Movies/Series box: '{line}'\nPlease move it to the 'IMDb List URL(s)' box.")
+                return
+
+        log_box.delete("1.0", tk.END)
+        try:
+            repeat_m = int(repeat_minutes_entry.get())
+        except (ValueError, TypeError):
+            repeat_m = 60
+        try:
+            tmdb_pages = int(tmdb_pages_entry.get())
+        except (ValueError, TypeError):
+            tmdb_pages = 5
+        messagebox.showinfo("Started", "Cache Warmer running in background.")
 
-def open_url(url):
-    webbrowser.open(url)
+        # Helper for catalog selection on main thread
+        def select_catalog_ui(catalogs):
+            import queue
+            q = queue.Queue()
 
-def copy_url(url):
-    root.clipboard_clear()
-    root.clipboard_append(url)
-    root.update()
-    messagebox.showinfo("Copied", "URL copied to clipboard!")
+            def ask():
+                try:
+                    # Create a top-level window for selection
+                    top = tk.Toplevel(root)
+                    top.title("Select Catalogs")
+                    top.geometry("400x300")
+
+                    # Center it
+                    x = root.winfo_x() + (root.winfo_width() // 2) - 200
+                    y = root.winfo_y() + (root.winfo_height() // 2) - 150
+                    top.geometry(f"+{x}+{y}")
+                    top.grab_set() # Modal
+
+                    tk.Label(top, text="Select one or more catalogs to fetch:", font=("Arial", 10, "bold")).pack(pady=10)
+
+                    lb = tk.Listbox(top, selectmode=tk.MULTIPLE, width=50, height=10)
+                    lb.pack(pady=5, padx=10, fill=tk.BOTH, expand=True)
+
+                    for cat in catalogs:
+                        name = cat.get("name", "Unknown")
+                        cat_id = cat.get("id", "")
+                        cat_type = cat.get("type", "")
+                        lb.insert(tk.END, f"{name} ({cat_type}) - {cat_id}")
+
+                    def on_select():
+                        sel = lb.curselection()
+                        if not sel:
+                            return
+                        q.put([catalogs[i] for i in sel])
+                        top.destroy()
+
+                    tk.Button(top, text="Select", command=on_select).pack(pady=10)
+                    top.protocol("WM_DELETE_WINDOW", lambda: (q.put(None), top.destroy()))
+
+                    top.wait_window()
+                except Exception as e:
+                    print(f"Error in selection UI: {e}")
+                    q.put(None)
+
+            root.after(0, ask)
+            # Block background thread until user selects
+            return q.get()
+
+        kwargs = {
+            "imdb_list_urls": imdb_urls or None,
+            "movies": movies or None,
+            "series_list": series or None,
+            "tmdb_manifest_url": tmdb_manifest_url or None,
+            "tmdb_catalog_pages": tmdb_pages,
+            "run_mode": RUN_MODE_VALUES.get(run_mode_var.get(), "oneshot"),
+            "repeat_minutes": repeat_m,
+            "api_key": api_key,
+            "select_catalog_func": select_catalog_ui,
+        }
+
+        start_btn.config(state="disabled")
+
+        def run_wrapper():
+            try:
+                start_app(**kwargs)
+            finally:
+                # Re-enable start button on main thread
+                root.after(0, lambda: start_btn.config(state="normal"))
 
-def make_link_label(parent, text, url):
-    lbl = tk.Label(parent, text=text, fg="blue", cursor="hand2", font=("TkDefaultFont", 9, "underline"))
-    lbl.bind("<Button-1>", lambda e: open_url(url))
-    lbl.bind("<Button-3>", lambda e: copy_url(url))
-    return lbl
+        threading.Thread(target=run_wrapper, daemon=True).start()
 
-link1 = make_link_label(link_frame, "Link 1: baby-beamup.club", "https://84f50d1c22e7-tmdb-discover-plus.baby-beamup.club/")
-link1.pack(anchor="w")
 
-link2 = make_link_label(link_frame, "Link 2: ElfHosted", "https://tmdb-discover-plus.elfhosted.com/")
-link2.pack(anchor="w")
-row += 1
+    def stop_clicked():
+        request_stop()
+        messagebox.showinfo("Stopped", "Stopping Cache Warmer...")
 
-tk.Label(main, text="TMDB Discover+ Manifest URL").grid(row=row, column=0, sticky="nw")
-tmdb_manifest_text = tk.Text(main, height=4, width=50)
-tmdb_manifest_text.grid(row=row, column=1, columnspan=2, sticky="ew", pady=2)
-tmdb_manifest_text.insert("1.0", config.get("tmdb_manifest_url", ""))
-row += 1
+    btn_row = tk.Frame(main)
+    btn_row.grid(row=row, column=0, columnspan=3, pady=(6, 8))
+    btn_row.columnconfigure(0, weight=1)
+    btn_row.columnconfigure(1, weight=0)
+    btn_row.columnconfigure(2, weight=1)
+    btn_inner = tk.Frame(btn_row)
+    btn_inner.grid(row=0, column=1)
+    tk.Button(btn_inner, text="Save Settings", command=save_clicked).pack(side=tk.LEFT, padx=6)
+    start_btn = tk.Button(btn_inner, text="Start Cache Warmer", command=start_clicked)
+    start_btn.pack(side=tk.LEFT, padx=6)
 
-tk.Label(main, text="TMDB Catalog Pages to Fetch").grid(row=row, column=0, sticky="w")
-tmdb_pages_entry = tk.Entry(main, width=10)
-tmdb_pages_entry.grid(row=row, column=1, sticky="w")
-tmdb_pages_entry.insert(0, str(config.get("tmdb_catalog_pages", 5)))
-row += 1
+    tk.Button(btn_inner, text="Stop", command=stop_clicked).pack(side=tk.LEFT, padx=6)
+    row += 1
 
-# -------------------------
-# IMDb List URL(s)
-# -------------------------
+    # -------------------------
+    # Status panel (refreshed from services.app.STATUS)
+    # -------------------------
 
-tk.Label(main, text="IMDb List URL(s)").grid(row=row, column=0, sticky="nw")
-imdb_urls_text = tk.Text(main, height=3, width=50)
-imdb_urls_text.grid(row=row, column=1, columnspan=2, sticky="ew", pady=2)
-row += 1
+    STATUS_REFRESH_MS = 1000
+    status_label = tk.Label(main, text="Idle", justify=tk.LEFT, anchor="w", font=("Consolas", 9), fg="#444444")
+    status_label.grid(row=row, column=0, columnspan=3, sticky="ew", pady=(8, 0))
+    row += 1
 
-# -------------------------
-# Movies (IMDb IDs)
-# -------------------------
 
-tk.Label(main, text="Movies (IMDb IDs)").grid(row=row, column=0, sticky="nw")
-movies_text = tk.Text(main, height=4, width=50)
-movies_text.grid(row=row, column=1, columnspan=2, sticky="ew", pady=2)
-row += 1
-
-# -------------------------
-# Series (IMDb IDs or URLs) — cache all episodes
-# -------------------------
+    def _update_status_panel():
+        try:
+            status_label.config(text="\n".join(STATUS.lines()))
+        except Exception:
+            pass
+        root.after(STATUS_REFRESH_MS, _update_status_panel)
 
-tk.Label(main, text="Series (IMDb IDs/URLs)").grid(row=row, column=0, sticky="nw")
-series_text = tk.Text(main, height=2, width=50)
-series_text.grid(row=row, column=1, columnspan=2, sticky="ew", pady=2)
-row += 1
 
-# -------------------------
-# Buttons (centered row)
-# -------------------------
+    root.after(STATUS_REFRESH_MS, _update_status_panel)
 
-def save_clicked():
-    try:
-        repeat_m = int(repeat_minutes_entry.get())
-    except (ValueError, TypeError):
-        repeat_m = 60
-    try:
-        tmdb_pages = int(tmdb_pages_entry.get())
-    except (ValueError, TypeError):
-        tmdb_pages = 5
-    cfg = {
-        "real_debrid_api_key": api_entry.get().strip(),
-        "delay_between_movies": int(delay_entry.get()),
-        "min_seeders": int(seed_entry.get()),
-        "min_resolution": int(res_var.get()),
-        "max_per_quality": int(maxpq_entry.get()),
-        "allow_packs_fallback": pack_var.get(),
-        "run_mode": RUN_MODE_VALUES.get(run_mode_var.get(), "oneshot"),
-        "repeat_minutes": repeat_m,
-        "tmdb_manifest_url": tmdb_manifest_text.get("1.0", tk.END).strip(),
-        "tmdb_catalog_pages": tmdb_pages,
-    }
-
-    save_config(cfg)
-    messagebox.showinfo("Saved", "Settings saved!")
-
-
-def start_clicked():
-    # Validate API Key
-    api_key = api_entry.get().strip()
-    if not api_key:
-        messagebox.showerror("Error", "Real-Debrid API Key is required!")
-        return
-
-    # Get Inputs
-    imdb_urls = imdb_urls_text.get("1.0", tk.END).strip()
-    movies = movies_text.get("1.0", tk.END).strip()
-    series = series_text.get("1.0", tk.END).strip()
-    tmdb_manifest_url = tmdb_manifest_text.get("1.0", tk.END).strip()
-
-    # Validate Inputs
-    if not imdb_urls and not movies and not series and not tmdb_manifest_url:
-        messagebox.showerror("Error", "Please provide at least one input:\n- TMDB Discover+ Manifest URL\n- IMDb List URL\n- Movie ID/Title\n- Series ID/URL")
-        return
-
-    # Cross-validation: IDs in URL box?
-    for line in imdb_urls.splitlines():
-        line = line.strip()
-        if not line: continue
-        # Detect simple ID like tt1234567 inside URL box
-        if line.lower().startswith("tt") and "imdb.com" not in line.lower():
-            messagebox.showerror("Input Error", f"Found ID in List URL box: '{line}'\nPlease paste IDs in the Movies or Series box, and only List URLs here.")
-            return
+    # -------------------------
+    # Logs
+    # -------------------------
 
-    # Cross-validation: List URLs in ID box?
-    for line in (movies + "\n" + series).splitlines():
-        line = line.strip()
-        if "imdb.com/list" in line.lower():
-            messagebox.showerror("Input Error", f"Found List URL in Movies/Series box: '{line}'\nPlease move it to the 'IMDb List URL(s)' box.")
-            return
+    log_box = tk.Text(main, height=15, width=70)
+    log_box.grid(row=row, column=0, columnspan=3, pady=(10, 20), sticky="nsew")
+    main.rowconfigure(row, weight=1)
 
-    log_box.delete("1.0", tk.END)
-    try:
-        repeat_m = int(repeat_minutes_entry.get())
-    except (ValueError, TypeError):
-        repeat_m = 60
+    # Full log goes to a rotating file; the widget keeps only the last lines
     try:
-        tmdb_pages = int(tmdb_pages_entry.get())
-    except (ValueError, TypeError):
-        tmdb_pages = 5
-    messagebox.showinfo("Started", "Cache Warmer running in background.")
-    
-    # Helper for catalog selection on main thread
-    def select_catalog_ui(catalogs):
-        import queue
-        q = queue.Queue()
-        
-        def ask():
+        file_log = LineLog(config.get("log_file", LOG_FILE), config.get("log_max_mb", LOG_MAX_MB), config.get("log_backups", LOG_BACKUPS))
+    except Exception:
+        file_log = None
+    log_sink = TextRedirector(log_box, max_lines=config.get("log_max_lines", 2000), file_log=file_log)
+    sys.stdout = log_sink
+    sys.stderr = log_sink
+
+    # -------------------------
+    # Tooltips
+    # -------------------------
+
+    ToolTip(api_entry, "Your Real-Debrid API token")
+    ToolTip(delay_entry, "Seconds to wait between movies")
+    ToolTip(seed_entry, "Minimum seeders required")
+    ToolTip(res_menu, "Lowest allowed resolution")
+    ToolTip(maxpq_entry, "How many torrents per quality")
+    ToolTip(pack_check, "Allow pack torrents if no singles exist")
+    ToolTip(season_pack_check, "Probe one episode per season, try season packs first, and skip the rest of a season once it is cached")
+    ToolTip(run_mode_menu, "One-shot: run once and exit. Loop: repeat forever. Interval: run once, wait X min, repeat. "
+                           "Schedule: re-read each source on its own cadence (source_schedules in config.json).")
+    ToolTip(repeat_minutes_entry, "Minutes to wait between runs when Run mode is 'interval'")
+    ToolTip(link1, "https://84f50d1c22e7-tmdb-discover-plus.baby-beamup.club/")
+    ToolTip(link2, "https://tmdb-discover-plus.elfhosted.com/")
+    ToolTip(tmdb_manifest_text, "Paste TMDB Discover+ manifest URL (e.g. https://addon.example.com/manifest.json)")
+    ToolTip(tmdb_pages_entry, "Number of catalog pages to fetch (each page ~20 items, default: 5 pages = ~100 items)")
+    ToolTip(imdb_urls_text, "Paste one or more IMDb list URLs (e.g. https://www.imdb.com/list/ls091520106/) — one per line")
+    ToolTip(movies_text, "Paste IMDb IDs (tt...) or titles — one per line; combined with lists above")
+    ToolTip(series_text, "Paste series IMDb IDs or URLs (e.g. tt0944947 or https://www.imdb.com/title/tt0944947/) — one per line; caches all seasons & episodes")
+
+    # -------------------------
+    # Tray icon (minimize to tray, Show / Start / Stop / Exit)
+    # -------------------------
+    tray_icon = None
+    SHOWN_MINIMIZE_MESSAGE = False
+
+
+    def _tray_show_window():
+        root.deiconify()
+        root.lift()
+        root.focus_force()
+
+
+    def _tray_quit():
+        if tray_icon:
             try:
-                # Create a top-level window for selection
-                top = tk.Toplevel(root)
-                top.title("Select Catalog")
-                top.geometry("400x300")
-                
-                # Center it
-                x = root.winfo_x() + (root.winfo_width() // 2) - 200
-                y = root.winfo_y() + (root.winfo_height() // 2) - 150
-                top.geometry(f"+{x}+{y}")
-                top.grab_set() # Modal
-                
-                tk.Label(top, text="Please select a catalog to fetch:", font=("Arial", 10, "bold")).pack(pady=10)
-                
-                lb = tk.Listbox(top, selectmode=tk.SINGLE, width=50, height=10)
-                lb.pack(pady=5, padx=10, fill=tk.BOTH, expand=True)
-                
-                for cat in catalogs:
-                    name = cat.get("name", "Unknown")
-                    cat_id = cat.get("id", "")
-                    cat_type = cat.get("type", "")
-                    lb.insert(tk.END, f"{name} ({cat_type}) - {cat_id}")
-                
-                def on_select():
-                    sel = lb.curselection()
-                    if not sel:
-                        return
-                    idx = sel[0]
-                    q.put(catalogs[idx])
-                    top.destroy()
-                
-                tk.Button(top, text="Select", command=on_select).pack(pady=10)
-                top.protocol("WM_DELETE_WINDOW", lambda: (q.put(None), top.destroy()))
-                
-                top.wait_window()
-            except Exception as e:
-                print(f"Error in selection UI: {e}")
-                q.put(None)
-
-        root.after(0, ask)
-        # Block background thread until user selects
-        return q.get()
-
-    kwargs = {
-        "imdb_list_urls": imdb_urls or None,
-        "movies": movies or None,
-        "series_list": series or None,
-        "tmdb_manifest_url": tmdb_manifest_url or None,
-        "tmdb_catalog_pages": tmdb_pages,
-        "run_mode": RUN_MODE_VALUES.get(run_mode_var.get(), "oneshot"),
-        "repeat_minutes": repeat_m,
-        "api_key": api_key,
-        "select_catalog_func": select_catalog_ui,
-    }
-
-    start_btn.config(state="disabled")
-
-    def run_wrapper():
-        try:
-            start_app(**kwargs)
-        finally:
-            # Re-enable start button on main thread
-            root.after(0, lambda: start_btn.config(state="normal"))
-
-    threading.Thread(target=run_wrapper, daemon=True).start()
-
-
-def stop_clicked():
-    request_stop()
-    messagebox.showinfo("Stopped", "Stopping Cache Warmer...")
-
-btn_row = tk.Frame(main)
-btn_row.grid(row=row, column=0, columnspan=3, pady=(6, 8))
-btn_row.columnconfigure(0, weight=1)
-btn_row.columnconfigure(1, weight=0)
-btn_row.columnconfigure(2, weight=1)
-btn_inner = tk.Frame(btn_row)
-btn_inner.grid(row=0, column=1)
-tk.Button(btn_inner, text="Save Settings", command=save_clicked).pack(side=tk.LEFT, padx=6)
-start_btn = tk.Button(btn_inner, text="Start Cache Warmer", command=start_clicked)
-start_btn.pack(side=tk.LEFT, padx=6)
+                tray_icon.stop()
+            except Exception:
+                pass
+        root.quit()
 
-tk.Button(btn_inner, text="Stop", command=stop_clicked).pack(side=tk.LEFT, padx=6)
-row += 1
 
-# -------------------------
-# Logs
-# -------------------------
-
-log_box = tk.Text(main, height=15, width=70)
-log_box.grid(row=row, column=0, columnspan=3, pady=(10, 20), sticky="nsew")
-main.rowconfigure(row, weight=1)
-
-sys.stdout = TextRedirector(log_box)
-sys.stderr = TextRedirector(log_box)
-
-# -------------------------
-# Tooltips
-# -------------------------
-
-ToolTip(api_entry, "Your Real-Debrid API token")
-ToolTip(delay_entry, "Seconds to wait between movies")
-ToolTip(seed_entry, "Minimum seeders required")
-ToolTip(res_menu, "Lowest allowed resolution")
-ToolTip(maxpq_entry, "How many torrents per quality")
-ToolTip(pack_check, "Allow pack torrents if no singles exist")
-ToolTip(run_mode_menu, "One-shot: run once and exit. Loop: repeat forever. Interval: run once, wait X min, repeat.")
-ToolTip(repeat_minutes_entry, "Minutes to wait between runs when Run mode is 'interval'")
-ToolTip(link1, "https://84f50d1c22e7-tmdb-discover-plus.baby-beamup.club/")
-ToolTip(link2, "https://tmdb-discover-plus.elfhosted.com/")
-ToolTip(tmdb_manifest_text, "Paste TMDB Discover+ manifest URL (e.g. https://addon.example.com/manifest.json)")
-ToolTip(tmdb_pages_entry, "Number of catalog pages to fetch (each page ~20 items, default: 5 pages = ~100 items)")
-ToolTip(imdb_urls_text, "Paste one or more IMDb list URLs (e.g. https://www.imdb.com/list/ls091520106/) — one per line")
-ToolTip(movies_text, "Paste IMDb IDs (tt...) or titles — one per line; combined with lists above")
-ToolTip(series_text, "Paste series IMDb IDs or URLs (e.g. tt0944947 or https://www.imdb.com/title/tt0944947/) — one per line; caches all seasons & episodes")
-
-# -------------------------
-# Tray icon (minimize to tray, Show / Start / Stop / Exit)
-# -------------------------
-tray_icon = None
-SHOWN_MINIMIZE_MESSAGE = False
-
-
-def _tray_show_window():
-    root.deiconify()
-    root.lift()
-    root.focus_force()
-
-
-def _tray_quit():
-    if tray_icon:
+    def _update_tray_tooltip():
+        if not TRAY_AVAILABLE or not tray_icon:
+            return
         try:
-            tray_icon.stop()
+            tip = f"CacheWarmer — {STATUS.summary()}"
+            if len(tip) > 128:
+                tip = tip[:125] + "..."
+            tray_icon.title = tip
         except Exception:
             pass
-    root.quit()
-
-
-def _update_tray_tooltip():
-    if not TRAY_AVAILABLE or not tray_icon:
-        return
-    try:
-        from services.app import TRAY_RUNNING, TRAY_CURRENT_ITEM
-        status = "Running" if TRAY_RUNNING else "Idle"
-        item = (TRAY_CURRENT_ITEM or "").strip()
-        if item:
-            tip = f"CacheWarmer — {status} — {item}"
-        else:
-            tip = f"CacheWarmer — {status}"
-        if len(tip) > 128:
-            tip = tip[:125] + "..."
-        tray_icon.title = tip
-    except Exception:
-        pass
-    root.after(2000, _update_tray_tooltip)
-
-
-def _setup_tray():
-    global tray_icon
-    if not TRAY_AVAILABLE:
-        return
-    try:
-        def make_icon_image():
-            if os.path.exists("cloud.ico"):
-                try:
-                    return Image.open("cloud.ico")
-                except Exception:
-                    pass
-            w, h = 64, 64
-            img = Image.new("RGBA", (w, h), (40, 44, 52, 255))
-            draw = ImageDraw.Draw(img)
-            draw.rectangle((8, 8, w - 8, h - 8), outline=(97, 175, 239), width=3)
-            draw.rectangle((16, 16, w - 16, h - 16), fill=(97, 175, 239, 80))
-            return img
-
-        menu = pystray.Menu(
-            pystray.MenuItem("Show", lambda *a: root.after(0, _tray_show_window), default=True),
-            pystray.MenuItem("Start", lambda *a: root.after(0, start_clicked)),
-            pystray.MenuItem("Stop", lambda *a: root.after(0, stop_clicked)),
-            pystray.MenuItem("Exit", lambda *a: root.after(0, _tray_quit)),
-        )
-        icon_image = make_icon_image()
-        tray_icon = pystray.Icon("CacheWarmer", icon_image, "CacheWarmer — Idle", menu)
         root.after(2000, _update_tray_tooltip)
-        threading.Thread(target=tray_icon.run, daemon=True).start()
-    except Exception as e:
-        sys.stderr.write(f"Tray setup failed: {e}\n")
-        tray_icon = None
 
 
-def _on_close():
-    global SHOWN_MINIMIZE_MESSAGE
-    root.withdraw()
-    
-    if TRAY_AVAILABLE and tray_icon and not SHOWN_MINIMIZE_MESSAGE:
+    def _setup_tray():
+        nonlocal tray_icon
+        if not TRAY_AVAILABLE:
+            return
         try:
-            tray_icon.notify(
-                "I'm operating covertly in the tray... 🕶️\nRight-click icon to Exit.",
-                "CacheWarmer Minimized"
+            def make_icon_image():
+                if os.path.exists("cloud.ico"):
+                    try:
+                        return Image.open("cloud.ico")
+                    except Exception:
+                        pass
+                w, h = 64, 64
+                img = Image.new("RGBA", (w, h), (40, 44, 52, 255))
+                draw = ImageDraw.Draw(img)
+                draw.rectangle((8, 8, w - 8, h - 8), outline=(97, 175, 239), width=3)
+                draw.rectangle((16, 16, w - 16, h - 16), fill=(97, 175, 239, 80))
+                return img
+
+            menu = pystray.Menu(
+                pystray.MenuItem("Show", lambda *a: root.after(0, _tray_show_window), default=True),
+                pystray.MenuItem("Start", lambda *a: root.after(0, start_clicked)),
+                pystray.MenuItem("Stop", lambda *a: root.after(0, stop_clicked)),
+                pystray.MenuItem("Exit", lambda *a: root.after(0, _tray_quit)),
             )
-            SHOWN_MINIMIZE_MESSAGE = True
-        except Exception:
-            pass
+            icon_image = make_icon_image()
+            tray_icon = pystray.Icon("CacheWarmer", icon_image, "CacheWarmer — Idle", menu)
+            root.after(2000, _update_tray_tooltip)
+            threading.Thread(target=tray_icon.run, daemon=True).start()
+        except Exception as e:
+            sys.stderr.write(f"Tray setup failed: {e}\n")
+            tray_icon = None
 
 
-if TRAY_AVAILABLE:
-    root.protocol("WM_DELETE_WINDOW", _on_close)
-    # <Iconify> binding removed as it causes crashes on Windows
+    def _on_close():
+        nonlocal SHOWN_MINIMIZE_MESSAGE
+        root.withdraw()
 
-_setup_tray()
+        if TRAY_AVAILABLE and tray_icon and not SHOWN_MINIMIZE_MESSAGE:
+            try:
+                tray_icon.notify(
+                    "I'm operating covertly in the tray... 🕶️\nRight-click icon to Exit.",
+                    "CacheWarmer Minimized"
+                )
+                SHOWN_MINIMIZE_MESSAGE = True
+            except Exception:
+                pass
 
 
-try:
-    root.mainloop()
-except Exception as e:
-    print(f"Error in mainloop: {e}")
-    traceback.print_exc()
-    sys.exit(1)
+    if TRAY_AVAILABLE:
+        root.protocol("WM_DELETE_WINDOW", _on_close)
+        # <Iconify> binding removed as it causes crashes on Windows
+
+    _setup_tray()
+
+
+    try:
+        root.mainloop()
+    except Exception as e:
+        print(f"Error in mainloop: {e}")
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        if file_log:
+            file_log.close()
+
+
+# The window is only built when run as a script: worker processes started with spawn
+# (services.parse_pool) re-import this module and must not open it.
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    main()